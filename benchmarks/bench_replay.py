@@ -0,0 +1,110 @@
+"""
+Parse, markdown and extraction time of WebCrawler on recorded pages, replayed from a HAR
+archive with ReplayCrawlerStrategy, so that runs are comparable and need no network.
+Without --archive, a synthetic archive of news-like articles is generated.
+
+    PYTHONPATH=. python benchmarks/bench_replay.py --runs 3
+    PYTHONPATH=. python benchmarks/bench_replay.py --record crawl.har https://www.nbcnews.com/business
+    PYTHONPATH=. python benchmarks/bench_replay.py --archive crawl.har --pipeline
+"""
+import os
+import argparse
+import statistics
+import tempfile
+import time
+
+from crawl4ai import database
+from crawl4ai.crawler_strategy import HTTPCrawlerStrategy, RecordingCrawlerStrategy, ReplayCrawlerStrategy
+from crawl4ai.replay_crawler_strategy import HarArchive
+from crawl4ai.scheduler import DomainScheduler
+from crawl4ai.web_crawler import WebCrawler
+
+STAGES = ("fetch", "parse", "markdown", "chunking", "extraction", "cache_write")
+
+ARTICLE = """<html><head><title>Story {n}</title><meta name="description" content="Story {n}"></head>
+<body><nav>{nav}</nav><article><h1>Markets rally as investors weigh new data ({n})</h1>
+{paragraphs}{images}</article><footer>{nav}</footer></body></html>"""
+
+
+def synthetic_archive(path: str, pages: int):
+    archive = HarArchive(path)
+    nav = "".join(f'<a href="https://example.com/section/{i}">Section {i}</a>' for i in range(40))
+    for n in range(pages):
+        archive.add(
+            f"https://example.com/news/{n}",
+            ARTICLE.format(
+                n=n,
+                nav=nav,
+                paragraphs=("<p>" + f"Stocks closed higher on day {n} after a volatile session. " * 25 + "</p>") * 20,
+                images="".join(f'<img src="https://example.com/img/{n}-{i}.jpg" alt="photo {i}" width="600" height="400">' for i in range(10)),
+            ),
+        )
+    archive.save()
+
+
+def record(path: str, urls):
+    recorder = RecordingCrawlerStrategy(HTTPCrawlerStrategy(), path)
+    crawler = WebCrawler(crawler_strategy=recorder)
+    for url in urls:
+        result = crawler.run(url, bypass_cache=True, verbose=False)
+        print(f"{'recorded' if result.success else 'failed':<10}{url}")
+    recorder.save()
+
+
+def bench(archive_path: str, runs: int, pipeline: bool) -> dict:
+    strategy = ReplayCrawlerStrategy(archive_path)
+    urls = strategy.archive.urls()
+    # Replayed pages cost the sites nothing, so no politeness limits
+    crawler = WebCrawler(crawler_strategy=strategy, scheduler=DomainScheduler(max_concurrency=64, rate=0))
+    crawler.ready = True
+    stage_times = {stage: [] for stage in STAGES}
+    walls = []
+    for _ in range(runs):
+        t = time.perf_counter()
+        if pipeline:
+            results = list(crawler.run_pipeline(urls, bypass_cache=True, verbose=False))
+        else:
+            results = [crawler.run(url, bypass_cache=True, verbose=False) for url in urls]
+        walls.append(time.perf_counter() - t)
+        for result in results:
+            if result.timings:
+                for stage in STAGES:
+                    stage_times[stage].append(getattr(result.timings, stage))
+    return {
+        "pages": len(urls),
+        "wall": statistics.median(walls),
+        "stages": {stage: statistics.mean(times) * 1000 if times else 0.0 for stage, times in stage_times.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--archive", help="HAR archive to replay (default: a generated one)")
+    parser.add_argument("--pages", type=int, default=50, help="pages of the generated archive")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--pipeline", action="store_true", help="crawl with run_pipeline instead of sequential run calls")
+    parser.add_argument("--record", metavar="ARCHIVE", help="record the given URLs over HTTP into ARCHIVE and exit")
+    parser.add_argument("urls", nargs="*")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # Keep the user's cache out of it
+        database.DB_PATH = os.path.join(tmpdir, "crawl4ai.db")
+        database.init_db()
+        if args.record:
+            record(args.record, args.urls)
+            return
+        archive = args.archive
+        if archive is None:
+            archive = os.path.join(tmpdir, "synthetic.har")
+            synthetic_archive(archive, args.pages)
+
+        result = bench(archive, args.runs, args.pipeline)
+        print(f"{result['pages']} pages, median wall time {result['wall']:.3f} s ({result['pages'] / result['wall']:.1f} pages/s)")
+        print(f"{'stage':<14}{'mean per page (ms)':>20}")
+        for stage, ms in result["stages"].items():
+            print(f"{stage:<14}{ms:>20.2f}")
+
+
+if __name__ == "__main__":
+    main()
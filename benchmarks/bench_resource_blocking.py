@@ -0,0 +1,106 @@
+"""
+Page-load time and bandwidth of LocalSeleniumCrawlerStrategy with and without resource
+blocking, on a local fixture site: a news-like article with images, web fonts, a video
+and an "ad" script that pulls in more images. Needs Chrome.
+
+    PYTHONPATH=. python benchmarks/bench_resource_blocking.py --runs 10
+"""
+import argparse
+import statistics
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from crawl4ai.crawler_strategy import LocalSeleniumCrawlerStrategy
+
+IMAGES = 30
+SUBRESOURCE_DELAY = 0.02
+
+ARTICLE = """<html><head><title>Fixture article</title>
+<style>@font-face {{ font-family: Serif; src: url(/fonts/serif.woff2); }} body {{ font-family: Serif; }}</style>
+<script src="/ads/tracker.js"></script>
+</head><body><article><h1>Markets rally as investors weigh new data</h1>
+{paragraphs}
+{images}
+<video src="/media/clip.mp4" autoplay muted></video>
+</article></body></html>"""
+
+TRACKER = "for (let i = 0; i < 10; i++) { new Image().src = '/ads/pixel' + i + '.gif'; }"
+
+SIZES = {".jpg": 100_000, ".gif": 2_000, ".woff2": 50_000, ".mp4": 1_000_000}
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    lock = threading.Lock()
+    bytes_sent = 0
+    requests = 0
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/article.html":
+            body = ARTICLE.format(
+                paragraphs=("<p>" + "Stocks closed higher on Tuesday after a volatile session. " * 20 + "</p>") * 10,
+                images="".join(f'<img src="/img/{i}.jpg" width="600" height="400" alt="photo {i}">' for i in range(IMAGES)),
+            ).encode("utf-8")
+            content_type = "text/html; charset=utf-8"
+        elif path.endswith(".js"):
+            body, content_type = TRACKER.encode("utf-8"), "application/javascript"
+        else:
+            extension = path[path.rfind("."):]
+            body, content_type = b"\0" * SIZES.get(extension, 1_000), "application/octet-stream"
+            time.sleep(SUBRESOURCE_DELAY)
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+        with self.lock:
+            FixtureHandler.bytes_sent += len(body)
+            FixtureHandler.requests += 1
+
+    def log_message(self, *args):
+        pass
+
+
+def bench(url: str, profile: str, runs: int) -> dict:
+    strategy = LocalSeleniumCrawlerStrategy(blocked_resources=profile, pool_size=1)
+    try:
+        # The first crawl pays for starting Chrome, so it is not measured
+        strategy.crawl(f"{url}?warmup")
+        FixtureHandler.bytes_sent = FixtureHandler.requests = 0
+        times = []
+        for run in range(runs):
+            t = time.perf_counter()
+            strategy.crawl(f"{url}?run={run}")
+            times.append(time.perf_counter() - t)
+        return {
+            "median": statistics.median(times),
+            "requests": FixtureHandler.requests / runs,
+            "kilobytes": FixtureHandler.bytes_sent / runs / 1000,
+        }
+    finally:
+        strategy.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--profiles", nargs="+", default=["none", "images,fonts,media", "all,*/ads/*"])
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/article.html"
+    try:
+        print(f"{'profile':<24}{'median load (s)':>18}{'requests/page':>16}{'KB/page':>12}")
+        for profile in args.profiles:
+            result = bench(url, profile, args.runs)
+            print(f"{profile:<24}{result['median']:>18.3f}{result['requests']:>16.1f}{result['kilobytes']:>12.1f}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
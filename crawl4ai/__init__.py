@@ -1 +1,9 @@
-from .web_crawler import WebCrawler
\ No newline at end of file
+# WebCrawler is imported on first access so that importing a light submodule
+# (e.g. crawl4ai.database) does not load the whole crawler.
+def __getattr__(name):
+    if name == "WebCrawler":
+        from .web_crawler import WebCrawler
+        return WebCrawler
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+__all__ = ["WebCrawler"]
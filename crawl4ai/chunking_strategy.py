@@ -2,8 +2,6 @@ from abc import ABC, abstractmethod
 import re
 from collections import Counter
 import string
-from .model_loader import load_nltk_punkt
-from .utils import *
 
 # Define the abstract base class for chunking strategies
 class ChunkingStrategy(ABC):
@@ -14,6 +12,13 @@ class ChunkingStrategy(ABC):
         Abstract method to chunk the given text.
         """
         pass
+
+    def fingerprint(self) -> str:
+        """
+        Hash of the chunking strategy's class and options, used to key cached extractions.
+        """
+        from .utils import config_fingerprint
+        return config_fingerprint(self)
     
 # Regex-based chunking
 class RegexChunking(ChunkingStrategy):
@@ -34,6 +39,7 @@ class RegexChunking(ChunkingStrategy):
 # NLP-based sentence chunking 
 class NlpSentenceChunking(ChunkingStrategy):
     def __init__(self, **kwargs):
+        from .model_loader import load_nltk_punkt
         load_nltk_punkt()
         pass
 
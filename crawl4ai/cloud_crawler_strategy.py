@@ -0,0 +1,227 @@
+import asyncio
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Tuple, Union
+import httpx
+
+from .config import *
+from .crawler_strategy import CrawlerStrategy
+from .deadline import Deadline, DeadlineExceeded
+from .utils import sanitize_input_encode
+
+httpx_logger = logging.getLogger('httpx')
+httpx_logger.setLevel(logging.WARNING)
+
+
+class CloudCrawlerStrategy(CrawlerStrategy):
+    """
+    Crawls through a remote crawl service, i.e. the `/crawl` endpoint of a server running
+    main.py, at `base_url`.
+
+    URLs are sent in batches: a crawl waits up to `batch_window` seconds for other
+    crawls (from any thread or event loop) to join its call, and a call carries at most
+    `batch_size` URLs. At most `max_concurrency` calls are in flight, over a pool of
+    keep-alive connections. Each URL gets its own page back from the batch response, or
+    its own error if the service could not crawl it. `crawl_many` sends a list of URLs
+    in as few calls as possible.
+
+    The HTTP client runs on an event loop owned by the strategy in a background thread,
+    so that batches form across threads and async callers alike.
+    """
+
+    def __init__(self, use_cached_html=False, base_url: str = None, **kwargs):
+        super().__init__()
+        self.use_cached_html = use_cached_html
+        self.base_url = (base_url or CLOUD_CRAWLER_URL).rstrip("/")
+        self.verbose = kwargs.get("verbose", False)
+        self.batch_size = max(kwargs.get("batch_size", CLOUD_BATCH_SIZE), 1)
+        self.batch_window = kwargs.get("batch_window", CLOUD_BATCH_WINDOW)
+        self.max_concurrency = max(kwargs.get("max_concurrency", CLOUD_MAX_CONCURRENCY), 1)
+        self.timeout = kwargs.get("timeout", CLOUD_TIMEOUT)
+        self.access_token = kwargs.get("access_token", CLOUD_ACCESS_TOKEN)
+        self.user_agent = kwargs.get("user_agent")
+
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        # Only touched from the strategy's loop
+        self._client = None
+        self._slots = None
+        # (screenshot, user agent) -> URLs waiting for a call, with their futures and deadlines,
+        # and the timer that sends them
+        self._pending: Dict[Tuple[bool, Optional[str]], list] = {}
+        self._timers = {}
+
+    # Running coroutines on the strategy's loop
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="cloud-crawler-loop", daemon=True).start()
+            return self._loop
+
+    def _run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+
+    async def _arun(self, coro):
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()))
+
+    # CrawlerStrategy interface
+
+    def crawl(self, url: str, **kwargs) -> str:
+        html, _ = self.fetch(url, **kwargs)
+        return html
+
+    async def acrawl(self, url: str, **kwargs) -> str:
+        html, _ = await self.afetch(url, **kwargs)
+        return html
+
+    def fetch(self, url: str, screenshot: bool = False, **kwargs) -> Tuple[str, Optional[str]]:
+        return self._run(self._submit(url, screenshot, kwargs.get("user_agent"), kwargs.get("deadline")))
+
+    async def afetch(self, url: str, screenshot: bool = False, **kwargs) -> Tuple[str, Optional[str]]:
+        return await self._arun(self._submit(url, screenshot, kwargs.get("user_agent"), kwargs.get("deadline")))
+
+    def crawl_many(self, urls: List[str], **kwargs) -> List[Union[str, Exception]]:
+        """
+        Crawl `urls` in batches of `batch_size`, `max_concurrency` calls at a time. Returns
+        the HTML of each URL in order, or the exception its crawl failed with.
+        """
+        return self._run(self._crawl_many(list(urls), kwargs.get("user_agent")))
+
+    async def acrawl_many(self, urls: List[str], **kwargs) -> List[Union[str, Exception]]:
+        return await self._arun(self._crawl_many(list(urls), kwargs.get("user_agent")))
+
+    def take_screenshot(self, *args, **kwargs):
+        raise NotImplementedError("CloudCrawlerStrategy takes screenshots remotely: call fetch with screenshot=True")
+
+    def update_user_agent(self, user_agent: str):
+        self.user_agent = user_agent
+
+    def set_hook(self, hook_type: str, hook: Callable):
+        # The browser runs on the remote service, out of reach of hooks
+        pass
+
+    def quit(self):
+        if self._loop is not None:
+            self._run(self._close())
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = None
+
+    # Batching, on the strategy's loop
+
+    async def _crawl_many(self, urls: List[str], user_agent: str = None) -> List[Union[str, Exception]]:
+        # Submitted together, so batches fill up at once instead of waiting for the window
+        results = await asyncio.gather(*(self._submit(url, False, user_agent) for url in urls), return_exceptions=True)
+        return [result if isinstance(result, BaseException) else result[0] for result in results]
+
+    async def _submit(self, url: str, screenshot: bool = False, user_agent: str = None, deadline: Deadline = None) -> Tuple[str, Optional[str]]:
+        if deadline is not None:
+            deadline.check("page load")
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency),
+            )
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+
+        key = (bool(screenshot), user_agent or self.user_agent)
+        future = asyncio.get_running_loop().create_future()
+        batch = self._pending.setdefault(key, [])
+        batch.append((url, future, deadline))
+        if len(batch) >= self.batch_size:
+            self._flush(key)
+        elif len(batch) == 1:
+            self._timers[key] = asyncio.get_running_loop().call_later(self.batch_window, self._flush, key)
+        return await future
+
+    def _flush(self, key):
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(key, None)
+        if batch:
+            asyncio.ensure_future(self._post(key, batch))
+
+    async def _post(self, key, batch: list):
+        error = "the call was cancelled"
+        try:
+            await self._post_batch(key, batch)
+        except Exception as e:
+            error = sanitize_input_encode(str(e)) or type(e).__name__
+        finally:
+            # Whatever went wrong, no caller may be left waiting on its future
+            for url, future, _ in batch:
+                if not future.done():
+                    future.set_exception(Exception(f"Failed to crawl {url}: {error}"))
+
+    async def _post_batch(self, key, batch: list):
+        screenshot, user_agent = key
+        results, error, retryable = {}, None, True
+        async with self._slots:
+            # URLs may have waited for a slot behind busy calls: those out of time, or no
+            # longer awaited, are not sent
+            for url, future, deadline in batch:
+                if not future.done() and deadline is not None and deadline.expired():
+                    future.set_exception(DeadlineExceeded("page load"))
+            batch = [(url, future, deadline) for url, future, deadline in batch if not future.done()]
+            if not batch:
+                return
+
+            # The same URL asked for twice in a batch is crawled once
+            urls = list(dict.fromkeys(url for url, _, _ in batch))
+            fields = ["html", "screenshot"] if screenshot else ["html"]
+            payload = {
+                "urls": urls,
+                "include_raw_html": True,
+                "bypass_cache": True,
+                "extract_blocks": False,
+                "screenshot": screenshot,
+                "fields": fields,
+                "verbose": False,
+            }
+            if user_agent:
+                payload["user_agent"] = user_agent
+            headers = {"access-token": self.access_token} if self.access_token else {}
+            # The call may not outlive the shortest deadline of the URLs it carries
+            timeout = min([self.timeout] + [deadline.cap(self.timeout) for _, _, deadline in batch if deadline is not None])
+
+            if self.verbose:
+                print(f"[LOG] ☁️ Crawling {len(urls)} URL(s) with CloudCrawlerStrategy...")
+            try:
+                response = await self._client.post(f"{self.base_url}/crawl", json=payload, headers=headers, timeout=timeout)
+                if response.status_code == 200:
+                    results = {result["url"]: result for result in response.json()["results"]}
+                else:
+                    error = f"HTTP {response.status_code} from {self.base_url}"
+                    # Rejected calls (bad request, auth) fail the same way when retried
+                    retryable = response.status_code == 429 or response.status_code >= 500
+            except Exception as e:
+                # Includes responses that are not the expected JSON
+                error = sanitize_input_encode(str(e)) or type(e).__name__
+                if isinstance(e, httpx.TimeoutException):
+                    error = "timed out"
+
+        for url, future, deadline in batch:
+            if future.done():
+                continue
+            result = results.get(url)
+            if error is not None and deadline is not None and deadline.expired():
+                future.set_exception(DeadlineExceeded("page load"))
+            elif error is not None:
+                failure = Exception(f"Failed to crawl {url}: {error}")
+                failure.retryable = retryable
+                future.set_exception(failure)
+            elif result is None:
+                future.set_exception(Exception(f"Failed to crawl {url}: missing from the response of {self.base_url}"))
+            elif not result.get("success", True):
+                future.set_exception(Exception(f"Failed to crawl {url}: {result.get('error_message') or 'remote crawl failed'}"))
+            else:
+                future.set_result((sanitize_input_encode(result.get("html") or ""), result.get("screenshot")))
+
+    async def _close(self):
+        for key in list(self._pending):
+            self._flush(key)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -38,3 +38,86 @@ IMAGE_DESCRIPTION_MIN_WORD_THRESHOLD = 1
 # If image format is in jpg, png or webp
 # If image is in the first half of the total images extracted from the page
 IMAGE_SCORE_THRESHOLD = 2
+
+# Number of Chrome instances LocalSeleniumCrawlerStrategy keeps in its driver pool, and the
+# number of page loads a driver serves before it is quit and replaced with a fresh one
+DRIVER_POOL_SIZE = int(os.getenv("CRAWL4AI_DRIVER_POOL_SIZE", 4))
+DRIVER_MAX_PAGES = int(os.getenv("CRAWL4AI_DRIVER_MAX_PAGES", 100))
+# Number of browsers WebCrawler.warmup() starts in the background before the first crawl
+DRIVER_PREWARM_COUNT = int(os.getenv("CRAWL4AI_DRIVER_PREWARM_COUNT", 1))
+
+# Number of isolated browser contexts (one tab each) PlaywrightCrawlerStrategy renders at once
+# inside its single Chromium process; this caps its memory use. Contexts are reused for
+# DRIVER_MAX_PAGES page loads before being replaced.
+PLAYWRIGHT_MAX_CONTEXTS = int(os.getenv("CRAWL4AI_PLAYWRIGHT_MAX_CONTEXTS", 30))
+
+# HTTPCrawlerStrategy: connection pool limits, request timeout in seconds, and the minimum
+# amount of visible text (in characters) a page needs before it is trusted without a browser
+HTTP_MAX_CONNECTIONS = int(os.getenv("CRAWL4AI_HTTP_MAX_CONNECTIONS", 100))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("CRAWL4AI_HTTP_MAX_KEEPALIVE_CONNECTIONS", 20))
+HTTP_TIMEOUT = float(os.getenv("CRAWL4AI_HTTP_TIMEOUT", 30))
+JS_DETECTION_MIN_TEXT_LENGTH = 200
+
+# CloudCrawlerStrategy: base URL of the remote crawl service (a server running main.py), the
+# access token sent to skip its rate limit, how many URLs go in one /crawl call, how many calls
+# run at once, how long (seconds) a URL waits for others to share its call, and the call timeout
+CLOUD_CRAWLER_URL = os.getenv("CRAWL4AI_CLOUD_URL", "http://crawl4ai.uccode.io")
+CLOUD_ACCESS_TOKEN = os.getenv("CRAWL4AI_CLOUD_ACCESS_TOKEN")
+CLOUD_BATCH_SIZE = int(os.getenv("CRAWL4AI_CLOUD_BATCH_SIZE", 10))
+CLOUD_MAX_CONCURRENCY = int(os.getenv("CRAWL4AI_CLOUD_MAX_CONCURRENCY", 4))
+CLOUD_BATCH_WINDOW = float(os.getenv("CRAWL4AI_CLOUD_BATCH_WINDOW", 0.05))
+CLOUD_TIMEOUT = float(os.getenv("CRAWL4AI_CLOUD_TIMEOUT", 300))
+
+# Politeness limits applied per domain by the DomainScheduler in front of the crawler strategy:
+# requests in flight at once, and requests per second (0 disables the rate limit)
+DOMAIN_MAX_CONCURRENCY = int(os.getenv("CRAWL4AI_DOMAIN_MAX_CONCURRENCY", 2))
+DOMAIN_RATE_LIMIT = float(os.getenv("CRAWL4AI_DOMAIN_RATE_LIMIT", 2))
+
+# Seconds a cached page is served before it is revalidated (0 keeps cached pages forever),
+# and per-domain overrides, e.g. {"nbcnews.com": 600}; overrides also cover subdomains
+CACHE_TTL = float(os.getenv("CRAWL4AI_CACHE_TTL", 0))
+DOMAIN_CACHE_TTL = {}
+
+# Crawl job queue: seconds a worker owns a claimed task before another worker may take it
+# over, attempts before a task is marked failed, and tasks claimed per round trip
+JOB_LEASE_SECONDS = float(os.getenv("CRAWL4AI_JOB_LEASE_SECONDS", 300))
+JOB_MAX_ATTEMPTS = int(os.getenv("CRAWL4AI_JOB_MAX_ATTEMPTS", 3))
+JOB_BATCH_SIZE = int(os.getenv("CRAWL4AI_JOB_BATCH_SIZE", 10))
+
+# Retries of failed page loads (attempts include the first one), with exponential backoff and
+# full jitter between them, and the per-domain circuit breaker: consecutive failures before a
+# domain is skipped, and seconds it is skipped for before one trial request is let through
+RETRY_MAX_ATTEMPTS = int(os.getenv("CRAWL4AI_RETRY_MAX_ATTEMPTS", 3))
+RETRY_BASE_DELAY = float(os.getenv("CRAWL4AI_RETRY_BASE_DELAY", 1))
+RETRY_MAX_DELAY = float(os.getenv("CRAWL4AI_RETRY_MAX_DELAY", 30))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CRAWL4AI_CIRCUIT_FAILURE_THRESHOLD", 5))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv("CRAWL4AI_CIRCUIT_RESET_TIMEOUT", 60))
+
+# Longest a browser waits for a page to load when the crawl has no deadline (Selenium's default)
+SELENIUM_PAGE_LOAD_TIMEOUT = float(os.getenv("CRAWL4AI_SELENIUM_PAGE_LOAD_TIMEOUT", 300))
+
+# Subresources the browser does not load, as a comma-separated list of profiles (images,
+# fonts, media, trackers, all) and/or URL patterns; see resource_blocking.py. "none" loads all.
+RESOURCE_BLOCKING = os.getenv("CRAWL4AI_RESOURCE_BLOCKING", "none")
+
+# Default wait after a browser page load: the page counts as ready once its DOM went this many
+# milliseconds without a mutation, or after WAIT_TIMEOUT seconds if it never settles
+WAIT_DOM_QUIET_MS = int(os.getenv("CRAWL4AI_WAIT_DOM_QUIET_MS", 250))
+WAIT_TIMEOUT = float(os.getenv("CRAWL4AI_WAIT_TIMEOUT", 10))
+
+# Screenshots of browser crawls: "full" (whole page), "viewport", "clip" (whole page cut at
+# SCREENSHOT_MAX_HEIGHT pixels) or "thumbnail" (viewport scaled to SCREENSHOT_THUMBNAIL_WIDTH
+# pixels wide), encoded by the browser as "jpeg", "webp" or "png"
+SCREENSHOT_MODE = os.getenv("CRAWL4AI_SCREENSHOT_MODE", "full")
+SCREENSHOT_FORMAT = os.getenv("CRAWL4AI_SCREENSHOT_FORMAT", "jpeg")
+SCREENSHOT_QUALITY = int(os.getenv("CRAWL4AI_SCREENSHOT_QUALITY", 85))
+SCREENSHOT_MAX_HEIGHT = int(os.getenv("CRAWL4AI_SCREENSHOT_MAX_HEIGHT", 4000))
+SCREENSHOT_THUMBNAIL_WIDTH = int(os.getenv("CRAWL4AI_SCREENSHOT_THUMBNAIL_WIDTH", 320))
+
+# Raw HTML of browser crawls, kept in a sharded, compressed store (see html_store.py) under
+# ~/.crawl4ai/html unless set. Least recently used pages are evicted beyond HTML_STORE_MAX_BYTES
+# of compressed data (0 = no limit). Compression is "zstd" when the zstandard package is
+# installed, zlib otherwise.
+HTML_STORE_PATH = os.getenv("CRAWL4AI_HTML_STORE_PATH", "")
+HTML_STORE_MAX_BYTES = int(os.getenv("CRAWL4AI_HTML_STORE_MAX_BYTES", 1024 ** 3))
+HTML_STORE_COMPRESSION = os.getenv("CRAWL4AI_HTML_STORE_COMPRESSION", "zstd")
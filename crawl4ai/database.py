@@ -1,12 +1,22 @@
 import os
 from pathlib import Path
 import sqlite3
+import time
 from typing import Optional, Tuple
 
 DB_PATH = os.path.join(Path.home(), ".crawl4ai")
 os.makedirs(DB_PATH, exist_ok=True)
 DB_PATH = os.path.join(DB_PATH, "crawl4ai.db")
 
+# Columns added after the first release, with their definitions, added to existing databases by init_db
+NEW_COLUMNS = {
+    "content_hash": 'TEXT DEFAULT ""',
+    "markdown_hash": 'TEXT DEFAULT ""',
+    "fetched_at": "REAL DEFAULT 0",
+    "etag": 'TEXT DEFAULT ""',
+    "last_modified": 'TEXT DEFAULT ""',
+}
+
 def init_db():
     global DB_PATH
     conn = sqlite3.connect(DB_PATH)
@@ -22,7 +32,48 @@ def init_db():
             media TEXT DEFAULT "{}",
             links TEXT DEFAULT "{}",
             metadata TEXT DEFAULT "{}",
-            screenshot TEXT DEFAULT ""
+            screenshot TEXT DEFAULT "",
+            content_hash TEXT DEFAULT "",
+            markdown_hash TEXT DEFAULT "",
+            fetched_at REAL DEFAULT 0,
+            etag TEXT DEFAULT "",
+            last_modified TEXT DEFAULT ""
+        )
+    ''')
+    # Databases created by older versions lack the newer columns
+    columns = {row[1] for row in cursor.execute('PRAGMA table_info(crawled_data)')}
+    for column, definition in NEW_COLUMNS.items():
+        if column not in columns:
+            cursor.execute(f'ALTER TABLE crawled_data ADD COLUMN {column} {definition}')
+    # Cleaned HTML, markdown, media, links and metadata of a page per processing
+    # configuration (word count threshold, CSS selector, ...), valid for the HTML
+    # whose hash is content_hash
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS processed_content (
+            url TEXT,
+            params_hash TEXT,
+            content_hash TEXT,
+            cleaned_html TEXT,
+            markdown TEXT,
+            media TEXT,
+            links TEXT,
+            metadata TEXT,
+            markdown_hash TEXT,
+            created_at REAL,
+            PRIMARY KEY (url, params_hash)
+        )
+    ''')
+    # Extracted content of a page per extraction configuration, so that several
+    # extractions of the same markdown can coexist
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS extraction_results (
+            markdown_hash TEXT,
+            strategy TEXT,
+            strategy_hash TEXT,
+            chunking_hash TEXT,
+            extracted_content TEXT,
+            created_at REAL,
+            PRIMARY KEY (markdown_hash, strategy, strategy_hash, chunking_hash)
         )
     ''')
     conn.commit()
@@ -43,12 +94,12 @@ def check_db_path():
     if not DB_PATH:
         raise ValueError("Database path is not set or is empty.")
 
-def get_cached_url(url: str) -> Optional[Tuple[str, str, str, str, str, str, str, bool, str]]:
+def get_cached_url(url: str) -> Optional[Tuple[str, str, str, str, str, bool, str, str, str, str, str, str, float, str, str]]:
     check_db_path()
     try:
         conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
-        cursor.execute('SELECT url, html, cleaned_html, markdown, extracted_content, success, media, links, metadata, screenshot FROM crawled_data WHERE url = ?', (url,))
+        cursor.execute('SELECT url, html, cleaned_html, markdown, extracted_content, success, media, links, metadata, screenshot, content_hash, markdown_hash, fetched_at, etag, last_modified FROM crawled_data WHERE url = ?', (url,))
         result = cursor.fetchone()
         conn.close()
         return result
@@ -56,14 +107,14 @@ def get_cached_url(url: str) -> Optional[Tuple[str, str, str, str, str, str, str
         print(f"Error retrieving cached URL: {e}")
         return None
 
-def cache_url(url: str, html: str, cleaned_html: str, markdown: str, extracted_content: str, success: bool, media : str = "{}", links : str = "{}", metadata : str = "{}", screenshot: str = ""):
+def cache_url(url: str, html: str, cleaned_html: str, markdown: str, extracted_content: str, success: bool, media : str = "{}", links : str = "{}", metadata : str = "{}", screenshot: str = "", content_hash: str = "", markdown_hash: str = "", etag: str = "", last_modified: str = "", fetched_at: float = None):
     check_db_path()
     try:
         conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
         cursor.execute('''
-            INSERT INTO crawled_data (url, html, cleaned_html, markdown, extracted_content, success, media, links, metadata, screenshot)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            INSERT INTO crawled_data (url, html, cleaned_html, markdown, extracted_content, success, media, links, metadata, screenshot, content_hash, markdown_hash, fetched_at, etag, last_modified)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ON CONFLICT(url) DO UPDATE SET
                 html = excluded.html,
                 cleaned_html = excluded.cleaned_html,
@@ -73,13 +124,139 @@ def cache_url(url: str, html: str, cleaned_html: str, markdown: str, extracted_c
                 media = excluded.media,      
                 links = excluded.links,    
                 metadata = excluded.metadata,      
-                screenshot = excluded.screenshot
-        ''', (url, html, cleaned_html, markdown, extracted_content, success, media, links, metadata, screenshot))
+                screenshot = excluded.screenshot,
+                content_hash = excluded.content_hash,
+                markdown_hash = excluded.markdown_hash,
+                fetched_at = excluded.fetched_at,
+                etag = excluded.etag,
+                last_modified = excluded.last_modified
+        ''', (url, html, cleaned_html, markdown, extracted_content, success, media, links, metadata, screenshot, content_hash, markdown_hash, fetched_at or time.time(), etag, last_modified))
         conn.commit()
         conn.close()
     except Exception as e:
         print(f"Error caching URL: {e}")
 
+async def aget_cached_url(url: str) -> Optional[Tuple[str, str, str, str, str, bool, str, str, str, str, str, str, float, str, str]]:
+    check_db_path()
+    try:
+        import aiosqlite
+        async with aiosqlite.connect(DB_PATH) as conn:
+            async with conn.execute('SELECT url, html, cleaned_html, markdown, extracted_content, success, media, links, metadata, screenshot, content_hash, markdown_hash, fetched_at, etag, last_modified FROM crawled_data WHERE url = ?', (url,)) as cursor:
+                return await cursor.fetchone()
+    except Exception as e:
+        print(f"Error retrieving cached URL: {e}")
+        return None
+
+async def acache_url(url: str, html: str, cleaned_html: str, markdown: str, extracted_content: str, success: bool, media : str = "{}", links : str = "{}", metadata : str = "{}", screenshot: str = "", content_hash: str = "", markdown_hash: str = "", etag: str = "", last_modified: str = "", fetched_at: float = None):
+    check_db_path()
+    try:
+        import aiosqlite
+        async with aiosqlite.connect(DB_PATH) as conn:
+            await conn.execute('''
+                INSERT INTO crawled_data (url, html, cleaned_html, markdown, extracted_content, success, media, links, metadata, screenshot, content_hash, markdown_hash, fetched_at, etag, last_modified)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    html = excluded.html,
+                    cleaned_html = excluded.cleaned_html,
+                    markdown = excluded.markdown,
+                    extracted_content = excluded.extracted_content,
+                    success = excluded.success,
+                    media = excluded.media,
+                    links = excluded.links,
+                    metadata = excluded.metadata,
+                    screenshot = excluded.screenshot,
+                    content_hash = excluded.content_hash,
+                    markdown_hash = excluded.markdown_hash,
+                    fetched_at = excluded.fetched_at,
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified
+            ''', (url, html, cleaned_html, markdown, extracted_content, success, media, links, metadata, screenshot, content_hash, markdown_hash, fetched_at or time.time(), etag, last_modified))
+            await conn.commit()
+    except Exception as e:
+        print(f"Error caching URL: {e}")
+
+def touch_cached_url(url: str, etag: str = "", last_modified: str = "", screenshot: str = None):
+    """
+    Mark a cached page as fetched now, e.g. after a revalidation showed it did not change,
+    without rewriting its content. The screenshot is only updated when one is given.
+    """
+    check_db_path()
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+        cursor.execute(
+            'UPDATE crawled_data SET fetched_at = ?, etag = ?, last_modified = ?, screenshot = COALESCE(?, screenshot) WHERE url = ?',
+            (time.time(), etag, last_modified, screenshot, url)
+        )
+        conn.commit()
+        conn.close()
+    except Exception as e:
+        print(f"Error updating cached URL: {e}")
+
+def get_processed(url: str, params_hash: str) -> Optional[Tuple[str, str, str, str, str, str, str]]:
+    """
+    (content_hash, cleaned_html, markdown, media, links, metadata, markdown_hash) of the
+    last processing of `url` with the parameters hashed to `params_hash`.
+    """
+    check_db_path()
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+        cursor.execute(
+            'SELECT content_hash, cleaned_html, markdown, media, links, metadata, markdown_hash FROM processed_content WHERE url = ? AND params_hash = ?',
+            (url, params_hash)
+        )
+        result = cursor.fetchone()
+        conn.close()
+        return result
+    except Exception as e:
+        print(f"Error retrieving processed content: {e}")
+        return None
+
+def cache_processed(url: str, params_hash: str, content_hash: str, cleaned_html: str, markdown: str, media: str, links: str, metadata: str, markdown_hash: str):
+    check_db_path()
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT OR REPLACE INTO processed_content (url, params_hash, content_hash, cleaned_html, markdown, media, links, metadata, markdown_hash, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (url, params_hash, content_hash, cleaned_html, markdown, media, links, metadata, markdown_hash, time.time()))
+        conn.commit()
+        conn.close()
+    except Exception as e:
+        print(f"Error caching processed content: {e}")
+
+def get_extraction(markdown_hash: str, strategy: str, strategy_hash: str, chunking_hash: str) -> Optional[str]:
+    check_db_path()
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+        cursor.execute(
+            'SELECT extracted_content FROM extraction_results WHERE markdown_hash = ? AND strategy = ? AND strategy_hash = ? AND chunking_hash = ?',
+            (markdown_hash, strategy, strategy_hash, chunking_hash)
+        )
+        result = cursor.fetchone()
+        conn.close()
+        return result[0] if result else None
+    except Exception as e:
+        print(f"Error retrieving cached extraction: {e}")
+        return None
+
+def cache_extraction(markdown_hash: str, strategy: str, strategy_hash: str, chunking_hash: str, extracted_content: str):
+    check_db_path()
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT OR REPLACE INTO extraction_results (markdown_hash, strategy, strategy_hash, chunking_hash, extracted_content, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (markdown_hash, strategy, strategy_hash, chunking_hash, extracted_content, time.time()))
+        conn.commit()
+        conn.close()
+    except Exception as e:
+        print(f"Error caching extraction: {e}")
+
 def get_total_count() -> int:
     check_db_path()
     try:
@@ -99,6 +276,8 @@ def clear_db():
         conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
         cursor.execute('DELETE FROM crawled_data')
+        cursor.execute('DELETE FROM processed_content')
+        cursor.execute('DELETE FROM extraction_results')
         conn.commit()
         conn.close()
     except Exception as e:
@@ -110,6 +289,8 @@ def flush_db():
         conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
         cursor.execute('DROP TABLE crawled_data')
+        cursor.execute('DROP TABLE IF EXISTS processed_content')
+        cursor.execute('DROP TABLE IF EXISTS extraction_results')
         conn.commit()
         conn.close()
     except Exception as e:
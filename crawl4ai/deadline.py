@@ -0,0 +1,60 @@
+import time
+from typing import List, Optional
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Raised when a crawl ran out of time before it had anything to return.
+    """
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.msg = f"Deadline exceeded during {stage}"
+        # The budget is gone, so there is no time left for another attempt either
+        self.retryable = False
+        super().__init__(self.msg)
+
+
+class Deadline:
+    """
+    Time budget of one crawl, shared by every stage (page load, waits, JavaScript,
+    screenshot, extraction). Stages cap their own timeouts with `cap`, and a stage that
+    is cut short or skipped because the budget ran out records itself with `skip`, so
+    that the crawl can return what it has as a partial result.
+
+    A Deadline built with `timeout=None` never expires. The expiry is wall-clock time,
+    so a Deadline can be sent to a worker process.
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.expires_at = time.time() + timeout if timeout is not None else None
+        self.skipped: List[str] = []
+
+    def remaining(self) -> Optional[float]:
+        """
+        Seconds left, or None for an unbounded deadline.
+        """
+        if self.expires_at is None:
+            return None
+        return max(self.expires_at - time.time(), 0.0)
+
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.time() >= self.expires_at
+
+    def cap(self, seconds: float) -> float:
+        """
+        `seconds`, or the time left if that is shorter.
+        """
+        remaining = self.remaining()
+        return seconds if remaining is None else min(seconds, remaining)
+
+    def skip(self, stage: str):
+        if stage not in self.skipped:
+            self.skipped.append(stage)
+
+    def check(self, stage: str):
+        """
+        Raise DeadlineExceeded if the budget ran out before `stage` could start.
+        """
+        if self.expired():
+            raise DeadlineExceeded(stage)
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from typing import Any, List, Dict, Optional, Union
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 import json, time
 # from optimum.intel import IPEXModel
 from .prompts import *
@@ -16,12 +16,23 @@ class ExtractionStrategy(ABC):
     """
     Abstract base class for all extraction strategies.
     """
+
+    # Attributes that do not change what the strategy extracts
+    FINGERPRINT_EXCLUDE = ("DEL", "name", "verbose", "api_token", "timer", "device", "default_batch_size")
     
     def __init__(self, **kwargs):
         self.DEL = "<|DEL|>"
         self.name = self.__class__.__name__
         self.verbose = kwargs.get("verbose", False)
 
+    def fingerprint(self) -> str:
+        """
+        Hash of the strategy's class and options, used to key its cached results.
+        Strategies whose output depends on state that is not a plain attribute should
+        override it.
+        """
+        return config_fingerprint(self, self.FINGERPRINT_EXCLUDE)
+
     @abstractmethod
     def extract(self, url: str, html: str, *q, **kwargs) -> List[Dict[str, Any]]:
         """
@@ -33,19 +44,25 @@ class ExtractionStrategy(ABC):
         """
         pass
     
-    def run(self, url: str, sections: List[str], *q, **kwargs) -> List[Dict[str, Any]]:
+    def run(self, url: str, sections: List[str], *q, deadline = None, **kwargs) -> List[Dict[str, Any]]:
         """
         Process sections of text in parallel by default.
 
         :param url: The URL of the webpage.
         :param sections: List of sections (strings) to process.
+        :param deadline: Optional Deadline; sections not done when it expires are dropped.
         :return: A list of processed JSON blocks.
         """
         extracted_content = []
-        with ThreadPoolExecutor() as executor:
+        executor = ThreadPoolExecutor()
+        try:
             futures = [executor.submit(self.extract, url, section, **kwargs) for section in sections]
-            for future in as_completed(futures):
+            for future in as_completed(futures, timeout=deadline.remaining() if deadline else None):
                 extracted_content.extend(future.result())
+        except FuturesTimeoutError:
+            deadline.skip("extraction")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
         return extracted_content    
     
 class NoExtractionStrategy(ExtractionStrategy):
@@ -178,9 +195,10 @@ class LLMExtractionStrategy(ExtractionStrategy):
         return sections
 
 
-    def run(self, url: str, sections: List[str]) -> List[Dict[str, Any]]:
+    def run(self, url: str, sections: List[str], deadline = None) -> List[Dict[str, Any]]:
         """
         Process sections sequentially with a delay for rate limiting issues, specifically for LLMExtractionStrategy.
+        Sections not done when the optional `deadline` expires are dropped.
         """
         
         merged_sections = self._merge(
@@ -191,6 +209,9 @@ class LLMExtractionStrategy(ExtractionStrategy):
         if self.provider.startswith("groq/"):
             # Sequential processing with a delay
             for ix, section in enumerate(merged_sections):
+                if deadline is not None and deadline.expired():
+                    deadline.skip("extraction")
+                    break
                 extract_func = partial(self.extract, url)
                 extracted_content.extend(extract_func(ix, sanitize_input_encode(section)))
                 time.sleep(0.5)  # 500 ms delay between each processing
@@ -200,11 +221,12 @@ class LLMExtractionStrategy(ExtractionStrategy):
             # for ix, section in enumerate(merged_sections):
             #     extracted_content.append(extract_func(ix, section))            
             
-            with ThreadPoolExecutor(max_workers=4) as executor:
-                extract_func = partial(self.extract, url)
-                futures = [executor.submit(extract_func, ix, sanitize_input_encode(section)) for ix, section in enumerate(merged_sections)]
-                
-                for future in as_completed(futures):
+            executor = ThreadPoolExecutor(max_workers=4)
+            extract_func = partial(self.extract, url)
+            futures = [executor.submit(extract_func, ix, sanitize_input_encode(section)) for ix, section in enumerate(merged_sections)]
+            
+            try:
+                for future in as_completed(futures, timeout=deadline.remaining() if deadline else None):
                     try:
                         extracted_content.extend(future.result())
                     except Exception as e:
@@ -217,6 +239,11 @@ class LLMExtractionStrategy(ExtractionStrategy):
                             "tags": ["error"],
                             "content": str(e)
                         })
+            except FuturesTimeoutError:
+                # Out of time: keep the sections that are done, drop the others
+                deadline.skip("extraction")
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
 
         
         return extracted_content        
@@ -0,0 +1,243 @@
+import os
+import time
+import zlib
+import sqlite3
+import hashlib
+import tempfile
+from pathlib import Path
+from typing import Optional
+from .config import *
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# File extension of each codec, so that a store can read what it wrote with another one
+CODECS = {"zstd": ".zst", "zlib": ".zz"}
+
+# After an eviction the store is brought down to this fraction of its budget, so that it
+# does not evict again on the next write
+EVICT_TO = 0.9
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return zlib.compress(data, 6)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+class HtmlStore:
+    """
+    Raw HTML of crawled pages, stored on disk by content hash.
+
+    Each distinct page body is compressed once into a file sharded over two directory
+    levels (`ab/cd/abcd...`), so identical pages share a file and no directory grows
+    past a few hundred entries. A SQLite index next to the files maps URLs to content
+    hashes and tracks the size and last use of every file, and their running total:
+    once the compressed data exceeds `max_bytes` (0 = no limit), the least recently
+    used files are evicted.
+    Files are written to a temporary name and renamed into place, so readers and
+    concurrent writers never see a partial file.
+    """
+
+    def __init__(self, path: str = None, max_bytes: int = HTML_STORE_MAX_BYTES, compression: str = HTML_STORE_COMPRESSION):
+        if compression not in CODECS:
+            raise ValueError(f"Unknown compression {compression!r}, expected one of {', '.join(CODECS)}")
+        if compression == "zstd" and not ZSTD_AVAILABLE:
+            compression = "zlib"
+        self.path = path or HTML_STORE_PATH or os.path.join(Path.home(), ".crawl4ai", "html")
+        self.max_bytes = max_bytes
+        self.compression = compression
+        os.makedirs(self.path, exist_ok=True)
+        self.index_path = os.path.join(self.path, "index.db")
+        self._init_index()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.index_path, timeout=30)
+
+    def _init_index(self):
+        conn = self._connect()
+        # WAL lets crawl threads read the index while another one is writing
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, digest TEXT NOT NULL)')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS blobs (
+                digest TEXT PRIMARY KEY,
+                codec TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_pages_digest ON pages (digest)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_blobs_lru ON blobs (accessed_at)')
+        # Running total of the blob sizes, so that checking the budget on every write does
+        # not sum the whole table. Triggers keep it exact whichever process changes blobs;
+        # an index created before it gets the total computed once.
+        conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+        conn.execute("INSERT OR IGNORE INTO meta (key, value) SELECT 'total_bytes', COALESCE(SUM(size), 0) FROM blobs")
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS blobs_total_insert AFTER INSERT ON blobs BEGIN
+                UPDATE meta SET value = value + NEW.size WHERE key = 'total_bytes';
+            END
+        ''')
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS blobs_total_delete AFTER DELETE ON blobs BEGIN
+                UPDATE meta SET value = value - OLD.size WHERE key = 'total_bytes';
+            END
+        ''')
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS blobs_total_update AFTER UPDATE OF size ON blobs BEGIN
+                UPDATE meta SET value = value + NEW.size - OLD.size WHERE key = 'total_bytes';
+            END
+        ''')
+        conn.commit()
+        conn.close()
+
+    def _blob_path(self, digest: str, codec: str) -> str:
+        return os.path.join(self.path, digest[:2], digest[2:4], digest + CODECS[codec])
+
+    def put(self, url: str, html: str) -> str:
+        """
+        Store `html` as the page of `url` and return its content hash.
+        """
+        data = html.encode("utf-8")
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        now = time.time()
+
+        conn = self._connect()
+        try:
+            known = conn.execute('SELECT codec FROM blobs WHERE digest = ?', (digest,)).fetchone()
+            if known is None or not os.path.exists(self._blob_path(digest, known[0])):
+                size = self._write(digest, _compress(data, self.compression))
+                # An upsert rather than INSERT OR REPLACE, whose implicit delete would not
+                # fire the trigger that keeps the total
+                conn.execute('''
+                    INSERT INTO blobs (digest, codec, size, accessed_at) VALUES (?, ?, ?, ?)
+                    ON CONFLICT (digest) DO UPDATE SET codec = excluded.codec, size = excluded.size, accessed_at = excluded.accessed_at
+                ''', (digest, self.compression, size, now))
+            else:
+                conn.execute('UPDATE blobs SET accessed_at = ? WHERE digest = ?', (now, digest))
+            previous = conn.execute('SELECT digest FROM pages WHERE url = ?', (url,)).fetchone()
+            conn.execute('INSERT OR REPLACE INTO pages (url, digest) VALUES (?, ?)', (url, digest))
+            if previous and previous[0] != digest:
+                self._drop_unreferenced(conn, previous[0])
+            conn.commit()
+            if self.max_bytes > 0:
+                self._evict(conn)
+        finally:
+            conn.close()
+        return digest
+
+    def get(self, url: str) -> Optional[str]:
+        """
+        The stored page of `url`, or None if there is none (or it was evicted).
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                'SELECT blobs.digest, blobs.codec FROM pages JOIN blobs ON blobs.digest = pages.digest WHERE pages.url = ?',
+                (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            digest, codec = row
+            try:
+                with open(self._blob_path(digest, codec), "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                # Evicted by another process between the lookup and the read
+                return None
+            conn.execute('UPDATE blobs SET accessed_at = ? WHERE digest = ?', (time.time(), digest))
+            conn.commit()
+            return _decompress(data, codec).decode("utf-8")
+        finally:
+            conn.close()
+
+    def delete(self, url: str):
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT digest FROM pages WHERE url = ?', (url,)).fetchone()
+            if row:
+                conn.execute('DELETE FROM pages WHERE url = ?', (url,))
+                self._drop_unreferenced(conn, row[0])
+                conn.commit()
+        finally:
+            conn.close()
+
+    def total_bytes(self) -> int:
+        """
+        Size of the compressed pages on disk, not counting the index.
+        """
+        conn = self._connect()
+        try:
+            return self._total_bytes(conn)
+        finally:
+            conn.close()
+
+    def clear(self):
+        conn = self._connect()
+        try:
+            for digest, codec in conn.execute('SELECT digest, codec FROM blobs').fetchall():
+                self._unlink(digest, codec)
+            conn.execute('DELETE FROM pages')
+            conn.execute('DELETE FROM blobs')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _write(self, digest: str, data: bytes) -> int:
+        path = self._blob_path(digest, self.compression)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return len(data)
+
+    def _unlink(self, digest: str, codec: str):
+        try:
+            os.unlink(self._blob_path(digest, codec))
+        except FileNotFoundError:
+            pass
+
+    def _drop_unreferenced(self, conn: sqlite3.Connection, digest: str):
+        if conn.execute('SELECT 1 FROM pages WHERE digest = ? LIMIT 1', (digest,)).fetchone():
+            return
+        row = conn.execute('SELECT codec FROM blobs WHERE digest = ?', (digest,)).fetchone()
+        conn.execute('DELETE FROM blobs WHERE digest = ?', (digest,))
+        if row:
+            self._unlink(digest, row[0])
+
+    def _total_bytes(self, conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT value FROM meta WHERE key = 'total_bytes'").fetchone()[0]
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = self._total_bytes(conn)
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * EVICT_TO
+        evicted = []
+        for digest, codec, size in conn.execute('SELECT digest, codec, size FROM blobs ORDER BY accessed_at'):
+            if total <= target:
+                break
+            evicted.append((digest, codec))
+            total -= size
+        conn.executemany('DELETE FROM pages WHERE digest = ?', [(digest,) for digest, _ in evicted])
+        conn.executemany('DELETE FROM blobs WHERE digest = ?', [(digest,) for digest, _ in evicted])
+        conn.commit()
+        for digest, codec in evicted:
+            self._unlink(digest, codec)
@@ -0,0 +1,235 @@
+from .config import *
+from .crawler_strategy import CrawlerStrategy
+from .utils import sanitize_input_encode, needs_javascript
+from .deadline import Deadline, DeadlineExceeded
+from typing import Callable, Optional, Tuple
+import asyncio
+import logging
+import threading
+import httpx
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+httpx_logger = logging.getLogger('httpx')
+httpx_logger.setLevel(logging.WARNING)
+
+
+class HTTPCrawlerStrategy(CrawlerStrategy):
+    """
+    Fetches pages with a plain HTTP client instead of a browser: pooled keep-alive
+    connections, HTTP/2 when the `h2` package is installed, and gzip/deflate (plus
+    brotli/zstd when available) response compression.
+
+    Pages that look like they need JavaScript to render (see `needs_javascript`), or that
+    the server refuses to serve to a non-browser client, are handed to `fallback_strategy`,
+    a LocalSeleniumCrawlerStrategy created on first use unless one is given. Screenshots
+    always go through the fallback, since there is nothing to capture without a browser.
+
+    Pass a `validators` dict to `crawl` to revalidate a cached copy with a conditional
+    GET: its "if_none_match" and "if_modified_since" entries become request headers. On a
+    304 the crawl returns None and sets `validators["not_modified"]`; otherwise the ETag
+    and Last-Modified headers of the response are stored under "etag" and "last_modified".
+
+    `user_agent` and `headers` keyword arguments of `crawl` apply to that request only.
+    """
+
+    supports_request_overrides = True
+
+    DEFAULT_HEADERS = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "en-US,en;q=0.9",
+    }
+
+    def __init__(self, fallback_strategy: CrawlerStrategy = None, use_fallback: bool = True, **kwargs):
+        super().__init__()
+        self.verbose = kwargs.get("verbose", False)
+        self.use_fallback = use_fallback
+        self._fallback = fallback_strategy
+        self._fallback_kwargs = {key: value for key, value in kwargs.items() if key not in ("timeout", "max_connections", "max_keepalive_connections", "min_text_length", "headers")}
+        self._fallback_hooks = {}
+        self._fallback_lock = threading.Lock()
+        self.min_text_length = kwargs.get("min_text_length", JS_DETECTION_MIN_TEXT_LENGTH)
+        self.headers = {**self.DEFAULT_HEADERS, **(kwargs.get("headers") or {})}
+        if kwargs.get("user_agent"):
+            self.headers["User-Agent"] = kwargs["user_agent"]
+        self.timeout = kwargs.get("timeout", HTTP_TIMEOUT)
+        self.client_options = {
+            "http2": HTTP2_AVAILABLE,
+            "follow_redirects": True,
+            "timeout": self.timeout,
+            "limits": httpx.Limits(
+                max_connections=kwargs.get("max_connections", HTTP_MAX_CONNECTIONS),
+                max_keepalive_connections=kwargs.get("max_keepalive_connections", HTTP_MAX_KEEPALIVE_CONNECTIONS),
+            ),
+        }
+        self.client = httpx.Client(headers=self.headers, **self.client_options)
+        # An AsyncClient is bound to the event loop it was first used on, and the loop of
+        # each asyncio.run is closed before its connections could be. So async requests go
+        # through one AsyncClient on an event loop owned by the strategy, in a background
+        # thread, which `quit` closes.
+        self._async_client = None
+        self._loop = None
+        self._loop_lock = threading.Lock()
+
+    @property
+    def fallback(self) -> CrawlerStrategy:
+        with self._fallback_lock:
+            if self._fallback is None:
+                from .selenium_crawler_strategy import LocalSeleniumCrawlerStrategy
+                self._fallback = LocalSeleniumCrawlerStrategy(**self._fallback_kwargs)
+                for hook_type, hook in self._fallback_hooks.items():
+                    self._fallback.set_hook(hook_type, hook)
+            return self._fallback
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="http-crawler-loop", daemon=True).start()
+            return self._loop
+
+    async def _aget(self, url: str, **kwargs) -> httpx.Response:
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._client_get(url, **kwargs), self._ensure_loop()))
+
+    async def _client_get(self, url: str, **kwargs) -> httpx.Response:
+        # On the strategy's loop
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(headers=self.headers, **self.client_options)
+        return await self._async_client.get(url, **kwargs)
+
+    async def _close_async_client(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+    def _should_fall_back(self, url: str, response: httpx.Response) -> bool:
+        if not self.use_fallback or response.status_code in (404, 410):
+            return False
+        if response.status_code in (401, 403, 429) or response.status_code >= 500:
+            reason = f"HTTP {response.status_code}"
+        elif needs_javascript(response.text, self.min_text_length):
+            reason = "page needs JavaScript"
+        else:
+            return False
+        if self.verbose:
+            print(f"[LOG] 🔁 Falling back to the browser for {url} ({reason})")
+        return True
+
+    def _request_headers(self, validators: Optional[dict], user_agent: str = None, headers: dict = None) -> dict:
+        # Per-request headers on top of the client's defaults
+        headers = dict(headers or {})
+        if user_agent:
+            headers["User-Agent"] = user_agent
+        if validators and validators.get("if_none_match"):
+            headers["If-None-Match"] = validators["if_none_match"]
+        if validators and validators.get("if_modified_since"):
+            headers["If-Modified-Since"] = validators["if_modified_since"]
+        return headers
+
+    def _not_modified(self, url: str, response: httpx.Response, validators: Optional[dict]) -> bool:
+        if validators is None or response.status_code != 304:
+            return False
+        validators["not_modified"] = True
+        if self.verbose:
+            print(f"[LOG] ✅ {url} not modified since the last crawl")
+        return True
+
+    def _record_validators(self, response: httpx.Response, validators: Optional[dict]):
+        # Pages rendered by the fallback browser keep no validators: they describe the HTTP response
+        if validators is not None:
+            validators["etag"] = response.headers.get("ETag", "") if response is not None else ""
+            validators["last_modified"] = response.headers.get("Last-Modified", "") if response is not None else ""
+
+    def _request_timeout(self, deadline: Optional[Deadline]) -> float:
+        if deadline is None:
+            return self.timeout
+        deadline.check("page load")
+        return deadline.cap(self.timeout)
+
+    def _raise_for_error(self, url: str, error: httpx.HTTPError, deadline: Optional[Deadline]):
+        if isinstance(error, httpx.TimeoutException) and deadline is not None and deadline.expired():
+            raise DeadlineExceeded("page load")
+        raise Exception(f"Failed to crawl {url}: {sanitize_input_encode(str(error))}")
+
+    def crawl(self, url: str, validators: dict = None, **kwargs) -> Optional[str]:
+        if self.verbose:
+            print(f"[LOG] 🕸️ Crawling {url} using HTTPCrawlerStrategy...")
+        deadline = kwargs.get("deadline")
+        try:
+            headers = self._request_headers(validators, kwargs.get("user_agent"), kwargs.get("headers"))
+            response = self.client.get(url, headers=headers, timeout=self._request_timeout(deadline))
+        except httpx.HTTPError as e:
+            self._raise_for_error(url, e, deadline)
+        if self._not_modified(url, response, validators):
+            return None
+        if self._should_fall_back(url, response):
+            self._record_validators(None, validators)
+            return self.fallback.crawl(url, **kwargs)
+        self._record_validators(response, validators)
+        return sanitize_input_encode(response.text)
+
+    async def acrawl(self, url: str, validators: dict = None, **kwargs) -> Optional[str]:
+        if self.verbose:
+            print(f"[LOG] 🕸️ Crawling {url} using HTTPCrawlerStrategy...")
+        deadline = kwargs.get("deadline")
+        try:
+            headers = self._request_headers(validators, kwargs.get("user_agent"), kwargs.get("headers"))
+            response = await self._aget(url, headers=headers, timeout=self._request_timeout(deadline))
+        except httpx.HTTPError as e:
+            self._raise_for_error(url, e, deadline)
+        if self._not_modified(url, response, validators):
+            return None
+        if self._should_fall_back(url, response):
+            self._record_validators(None, validators)
+            html, _ = await self.fallback.afetch(url, **kwargs)
+            return html
+        self._record_validators(response, validators)
+        return sanitize_input_encode(response.text)
+
+    def fetch(self, url: str, screenshot: bool = False, **kwargs) -> Tuple[str, Optional[str]]:
+        if screenshot:
+            return self.fallback.fetch(url, screenshot, **kwargs)
+        try:
+            return self.crawl(url, **kwargs), None
+        finally:
+            self.release()
+
+    async def afetch(self, url: str, screenshot: bool = False, **kwargs) -> Tuple[str, Optional[str]]:
+        if screenshot:
+            return await self.fallback.afetch(url, screenshot, **kwargs)
+        return await self.acrawl(url, **kwargs), None
+
+    def take_screenshot(self, **kwargs) -> str:
+        return self.fallback.take_screenshot(**kwargs)
+
+    def update_user_agent(self, user_agent: str):
+        self.headers["User-Agent"] = user_agent
+        self.client.headers["User-Agent"] = user_agent
+        if self._async_client is not None:
+            self._async_client.headers["User-Agent"] = user_agent
+        if self._fallback is not None:
+            self._fallback.update_user_agent(user_agent)
+
+    def set_hook(self, hook_type: str, hook: Callable):
+        # Hooks act on the browser, so they only ever run for pages that fall back to it
+        if self._fallback is not None:
+            self._fallback.set_hook(hook_type, hook)
+        self._fallback_hooks[hook_type] = hook
+
+    def release(self):
+        if self._fallback is not None:
+            self._fallback.release()
+
+    def quit(self):
+        self.client.close()
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._close_async_client(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = None
+        if self._fallback is not None and hasattr(self._fallback, "quit"):
+            self._fallback.quit()
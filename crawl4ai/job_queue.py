@@ -0,0 +1,227 @@
+import os
+import json
+import time
+import socket
+import sqlite3
+from typing import Iterable, List, Optional, Tuple
+from .config import *
+from . import database
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+FAILED = "failed"
+STATES = (PENDING, IN_FLIGHT, DONE, FAILED)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class JobQueue:
+    """
+    Durable crawl jobs stored in SQLite, next to the page cache by default.
+
+    A job is a set of URLs, each tracked as a task that is pending, in flight, done or
+    failed. Workers claim tasks in batches under a lease, which they renew while they
+    work: a task whose lease expired (because its worker died) is handed out again, and
+    a task that failed is retried, until it has been attempted `max_attempts` times. Several worker processes can share
+    a job, and a job survives restarts, so it can be resumed where it stopped.
+    """
+
+    def __init__(self, db_path: str = None, lease_seconds: float = JOB_LEASE_SECONDS, max_attempts: int = JOB_MAX_ATTEMPTS):
+        self.db_path = db_path or database.DB_PATH
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(max_attempts, 1)
+        self._init_tables()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode, so that claims can take the write lock up front with BEGIN IMMEDIATE
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute('PRAGMA busy_timeout = 30000')
+        return conn
+
+    def _init_tables(self):
+        conn = self._connect()
+        # WAL lets workers read job status while another one is claiming
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS crawl_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT DEFAULT "",
+                params TEXT DEFAULT "{}",
+                created_at REAL
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS crawl_tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id INTEGER NOT NULL,
+                url TEXT NOT NULL,
+                state TEXT DEFAULT "pending",
+                attempts INTEGER DEFAULT 0,
+                worker_id TEXT DEFAULT "",
+                lease_expires_at REAL DEFAULT 0,
+                error_message TEXT DEFAULT "",
+                updated_at REAL,
+                UNIQUE (job_id, url)
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_crawl_tasks_claim ON crawl_tasks (job_id, state, lease_expires_at)')
+        conn.close()
+
+    def create_job(self, urls: Iterable[str], name: str = "", params: dict = None) -> int:
+        """
+        Create a job for `urls` (duplicates are ignored) and return its id. `params` is
+        stored as JSON for workers to read back, e.g. the crawl options of the job.
+        """
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            cursor = conn.execute('INSERT INTO crawl_jobs (name, params, created_at) VALUES (?, ?, ?)', (name, json.dumps(params or {}), time.time()))
+            job_id = cursor.lastrowid
+            self._insert_tasks(conn, job_id, urls)
+            conn.execute('COMMIT')
+            return job_id
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def add_urls(self, job_id: int, urls: Iterable[str]):
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            self._insert_tasks(conn, job_id, urls)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def _insert_tasks(self, conn: sqlite3.Connection, job_id: int, urls: Iterable[str]):
+        now = time.time()
+        conn.executemany(
+            'INSERT OR IGNORE INTO crawl_tasks (job_id, url, updated_at) VALUES (?, ?, ?)',
+            ((job_id, url, now) for url in urls)
+        )
+
+    def get_job(self, job_id: int) -> Optional[dict]:
+        conn = self._connect()
+        row = conn.execute('SELECT id, name, params, created_at FROM crawl_jobs WHERE id = ?', (job_id,)).fetchone()
+        conn.close()
+        if row is None:
+            return None
+        return {"id": row[0], "name": row[1], "params": json.loads(row[2] or "{}"), "created_at": row[3]}
+
+    def claim(self, job_id: int, worker_id: str = None, batch_size: int = JOB_BATCH_SIZE) -> List[Tuple[int, str]]:
+        """
+        Lease up to `batch_size` tasks of `job_id` to `worker_id` and return them as
+        (task_id, url) tuples. Pending tasks and in-flight tasks whose lease expired are
+        both eligible, except that an expired task out of attempts is marked failed, so
+        that a URL that kills its worker is not retried forever. Returns an empty list
+        when nothing is left to claim.
+        """
+        worker_id = worker_id or default_worker_id()
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute('''
+                UPDATE crawl_tasks SET state = ?, error_message = ?, lease_expires_at = 0, updated_at = ?
+                WHERE job_id = ? AND state = ? AND lease_expires_at < ? AND attempts >= ?
+            ''', (FAILED, "Lease expired: the worker stopped before finishing the task", now, job_id, IN_FLIGHT, now, self.max_attempts))
+            tasks = conn.execute('''
+                SELECT id, url FROM crawl_tasks
+                WHERE job_id = ? AND (state = ? OR (state = ? AND lease_expires_at < ?))
+                ORDER BY id LIMIT ?
+            ''', (job_id, PENDING, IN_FLIGHT, now, max(batch_size, 1))).fetchall()
+            conn.executemany('''
+                UPDATE crawl_tasks SET state = ?, worker_id = ?, lease_expires_at = ?, attempts = attempts + 1, updated_at = ?
+                WHERE id = ?
+            ''', [(IN_FLIGHT, worker_id, now + self.lease_seconds, now, task_id) for task_id, _ in tasks])
+            conn.execute('COMMIT')
+            return tasks
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def renew(self, task_ids: List[int], worker_id: str = None):
+        """
+        Extend the lease of tasks that `worker_id` is still working on.
+        """
+        worker_id = worker_id or default_worker_id()
+        now = time.time()
+        conn = self._connect()
+        conn.executemany(
+            'UPDATE crawl_tasks SET lease_expires_at = ?, updated_at = ? WHERE id = ? AND state = ? AND worker_id = ?',
+            [(now + self.lease_seconds, now, task_id, IN_FLIGHT, worker_id) for task_id in task_ids]
+        )
+        conn.close()
+
+    def complete(self, task_id: int, worker_id: str = None):
+        worker_id = worker_id or default_worker_id()
+        conn = self._connect()
+        # A worker whose lease was taken over must not overwrite the new owner's state
+        conn.execute(
+            'UPDATE crawl_tasks SET state = ?, error_message = "", updated_at = ? WHERE id = ? AND state = ? AND worker_id = ?',
+            (DONE, time.time(), task_id, IN_FLIGHT, worker_id)
+        )
+        conn.close()
+
+    def fail(self, task_id: int, error_message: str = "", worker_id: str = None):
+        """
+        Record a failed attempt: the task goes back to pending until it has been
+        attempted `max_attempts` times, after which it is marked failed.
+        """
+        worker_id = worker_id or default_worker_id()
+        conn = self._connect()
+        conn.execute('''
+            UPDATE crawl_tasks
+            SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END, error_message = ?, lease_expires_at = 0, updated_at = ?
+            WHERE id = ? AND state = ? AND worker_id = ?
+        ''', (self.max_attempts, FAILED, PENDING, error_message or "", time.time(), task_id, IN_FLIGHT, worker_id))
+        conn.close()
+
+    def retry_failed(self, job_id: int) -> int:
+        """
+        Put the failed tasks of `job_id` back to pending with a fresh attempt count.
+        Returns the number of tasks reset.
+        """
+        conn = self._connect()
+        cursor = conn.execute(
+            'UPDATE crawl_tasks SET state = ?, attempts = 0, updated_at = ? WHERE job_id = ? AND state = ?',
+            (PENDING, time.time(), job_id, FAILED)
+        )
+        conn.close()
+        return cursor.rowcount
+
+    def status(self, job_id: int) -> dict:
+        """
+        Number of tasks of `job_id` in each state, plus the total.
+        """
+        conn = self._connect()
+        rows = conn.execute('SELECT state, COUNT(*) FROM crawl_tasks WHERE job_id = ? GROUP BY state', (job_id,)).fetchall()
+        conn.close()
+        counts = {state: 0 for state in STATES}
+        counts.update(dict(rows))
+        counts["total"] = sum(count for state, count in rows)
+        return counts
+
+    def tasks(self, job_id: int, state: str = None) -> List[dict]:
+        conn = self._connect()
+        query = 'SELECT id, url, state, attempts, worker_id, error_message FROM crawl_tasks WHERE job_id = ?'
+        args = (job_id,)
+        if state:
+            query += ' AND state = ?'
+            args += (state,)
+        rows = conn.execute(query + ' ORDER BY id', args).fetchall()
+        conn.close()
+        return [
+            {"id": row[0], "url": row[1], "state": row[2], "attempts": row[3], "worker_id": row[4], "error_message": row[5]}
+            for row in rows
+        ]
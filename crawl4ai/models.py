@@ -1,10 +1,28 @@
 from pydantic import BaseModel, HttpUrl
 from typing import List, Dict, Optional
 
+# CrawlResult fields that can be requested with `fields=`; the others are always returned
+OUTPUT_FIELDS = ("html", "cleaned_html", "markdown", "media", "links", "metadata", "screenshot", "extracted_content")
+
 class UrlModel(BaseModel):
     url: HttpUrl
     forced: bool = False
 
+class CrawlTimings(BaseModel):
+    # Seconds spent in each stage of a crawl; stages that did not run stay at 0
+    cache_read: float = 0.0
+    fetch: float = 0.0
+    wait_for_load: float = 0.0
+    parse: float = 0.0
+    markdown: float = 0.0
+    chunking: float = 0.0
+    extraction: float = 0.0
+    cache_write: float = 0.0
+    # Sizes in bytes of the main artifacts (UTF-8 encoded)
+    html_bytes: int = 0
+    cleaned_html_bytes: int = 0
+    markdown_bytes: int = 0
+
 class CrawlResult(BaseModel):
     url: str
     html: str
@@ -16,4 +34,8 @@ class CrawlResult(BaseModel):
     markdown: Optional[str] = None
     extracted_content: Optional[str] = None
     metadata: Optional[dict] = None
-    error_message: Optional[str] = None
\ No newline at end of file
+    error_message: Optional[str] = None
+    timings: Optional[CrawlTimings] = None
+    content_hash: Optional[str] = None
+    content_unchanged: bool = False
+    timed_out: bool = False
\ No newline at end of file
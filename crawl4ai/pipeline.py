@@ -0,0 +1,322 @@
+import os, time
+import inspect
+import json
+import queue
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Iterable, Iterator, Optional
+
+from .models import CrawlResult
+from .database import cache_url, touch_cached_url
+from .utils import get_content_of_website_optimized, sanitize_input_encode, hash_content, format_html, InvalidCSSSelectorError
+from .chunking_strategy import ChunkingStrategy, RegexChunking
+from .extraction_strategy import ExtractionStrategy, LLMExtractionStrategy
+from .config import *
+from .deadline import Deadline, DeadlineExceeded
+
+
+def process_content(
+        url: str,
+        html: str,
+        extracted_content: Optional[str],
+        word_count_threshold: int,
+        extraction_strategy: Optional[ExtractionStrategy],
+        chunking_strategy: ChunkingStrategy,
+        css_selector: str,
+        verbose: bool,
+        previous: Optional[dict] = None,
+        **kwargs,
+    ) -> dict:
+    """
+    Clean `html`, convert it to markdown and run chunking + extraction on it.
+
+    This is the CPU-bound half of a crawl. It only touches its arguments, so it can run
+    in a worker process. When `extraction_strategy` is None the extraction step is
+    skipped and `extracted_content` is returned as given. `previous` holds the
+    `markdown_hash` of the last crawl of this page and what the current extraction
+    configuration extracted from it; when the markdown did not change, that extracted
+    content is reused instead of re-extracting ("extraction_reused" in the result).
+
+    A `deadline` keyword argument (see Deadline) bounds the extraction; the stages it
+    cut short are returned under "skipped_stages". A `fields` keyword argument (set of
+    CrawlResult field names) limits the work to those outputs; the artifacts that were
+    not computed are None. The cleaned HTML is also returned pretty-printed, as
+    "formatted_html", when it is one of the outputs.
+    """
+    deadline = kwargs.get("deadline")
+    fields = kwargs.get("fields")
+    if fields is not None and "extracted_content" not in fields:
+        extraction_strategy = None
+    if fields is not None and extraction_strategy is not None:
+        # Extraction works on the markdown
+        fields = fields | {"markdown"}
+    timings = {}
+    # Extract content from HTML
+    try:
+        t1 = time.time()
+        result = get_content_of_website_optimized(url, html, word_count_threshold, css_selector=css_selector, only_text=kwargs.get("only_text", False), timings=timings, fields=fields)
+        if verbose:
+            print(f"[LOG] 🚀 Content extracted for {url}, success: True, time taken: {time.time() - t1} seconds")
+
+        if result is None:
+            raise ValueError(f"Failed to extract content from the website: {url}")
+    except InvalidCSSSelectorError as e:
+        raise ValueError(str(e))
+
+    markdown = result.get("markdown")
+    markdown = sanitize_input_encode(markdown) if markdown is not None else None
+    markdown_hash = hash_content(markdown) if markdown is not None else ""
+    extraction_reused = extracted_content is not None
+    if extracted_content is None and markdown_hash and previous and previous.get("extracted_content") is not None \
+            and previous.get("markdown_hash") == markdown_hash:
+        extracted_content = previous["extracted_content"]
+        extraction_reused = True
+        if verbose:
+            print(f"[LOG] ♻️  Markdown unchanged for {url}, reusing the extracted content")
+    if extracted_content is None and extraction_strategy is not None:
+        extracted_content = extract_content(url, markdown, extraction_strategy, chunking_strategy, verbose, timings, deadline)
+
+    cleaned_html = sanitize_input_encode(result.get("cleaned_html", ""))
+    wanted_fields = kwargs.get("fields")
+    return {
+        "cleaned_html": cleaned_html,
+        # Pretty-printing is a full parse, so it is done here rather than in the process building the result
+        "formatted_html": format_html(cleaned_html) if wanted_fields is None or "cleaned_html" in wanted_fields else None,
+        "markdown": markdown,
+        "media": result.get("media"),
+        "links": result.get("links"),
+        "metadata": result.get("metadata"),
+        "extracted_content": extracted_content,
+        "timings": timings,
+        "content_hash": hash_content(html),
+        "markdown_hash": markdown_hash,
+        "extraction_reused": extraction_reused,
+        "skipped_stages": list(deadline.skipped) if deadline is not None else [],
+    }
+
+def extract_content(url: str, markdown: str, extraction_strategy: ExtractionStrategy, chunking_strategy: ChunkingStrategy, verbose: bool, timings: dict = None, deadline: Deadline = None) -> Optional[str]:
+    if deadline is not None and deadline.expired():
+        deadline.skip("extraction")
+        return None
+
+    t = time.time()
+    if verbose:
+        print(f"[LOG] 🔥 Extracting semantic blocks for {url}, Strategy: {extraction_strategy.name}")
+
+    sections = chunking_strategy.chunk(markdown)
+    t_chunked = time.time()
+    if deadline is not None and _accepts_deadline(extraction_strategy):
+        extracted_content = extraction_strategy.run(url, sections, deadline=deadline)
+    else:
+        extracted_content = extraction_strategy.run(url, sections)
+    extracted_content = json.dumps(extracted_content, indent=4, default=str)
+
+    if timings is not None:
+        timings["chunking"] = t_chunked - t
+        timings["extraction"] = time.time() - t_chunked
+    if verbose:
+        print(f"[LOG] 🚀 Extraction done for {url}, time taken: {time.time() - t} seconds.")
+    return extracted_content
+
+
+def _accepts_deadline(extraction_strategy: ExtractionStrategy) -> bool:
+    # Custom strategies may override run() without the deadline parameter
+    return "deadline" in inspect.signature(extraction_strategy.run).parameters
+
+
+# Strategies a worker process received from its initializer, so that they are pickled
+# once per worker rather than once per page.
+_worker_strategies = {}
+
+def _init_worker(extraction_strategy: Optional[ExtractionStrategy], chunking_strategy: ChunkingStrategy):
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    _worker_strategies["extraction"] = extraction_strategy
+    _worker_strategies["chunking"] = chunking_strategy
+    # Warm up the parser stack so the first real page does not pay for it
+    get_content_of_website_optimized("https://localhost/", "<html><body><p>warm up</p></body></html>")
+
+def _process_in_worker(url: str, html: str, extracted_content: Optional[str], word_count_threshold: int, css_selector: str, verbose: bool, previous: Optional[dict], kwargs: dict) -> dict:
+    return process_content(
+        url, html, extracted_content, word_count_threshold,
+        _worker_strategies["extraction"], _worker_strategies["chunking"],
+        css_selector, verbose, previous, **kwargs
+    )
+
+
+class CrawlPipeline:
+    """
+    Two-stage crawl: a pool of fetcher threads (I/O bound) pushes raw HTML onto a
+    bounded queue, and a pool of warm worker processes (CPU bound) cleans it, converts
+    it to markdown and runs chunking and extraction.
+
+    LLM extraction is network bound, so it runs on a separate thread pool once the
+    worker has produced the markdown. Cache reads and writes stay in the parent process.
+    """
+
+    def __init__(self, crawler, fetch_concurrency: int = DRIVER_POOL_SIZE, process_concurrency: int = None, queue_size: int = None):
+        self.crawler = crawler
+        self.fetch_concurrency = max(fetch_concurrency, 1)
+        self.process_concurrency = max(process_concurrency or os.cpu_count() or 1, 1)
+        self.queue_size = queue_size or 2 * self.process_concurrency
+
+    def run(
+            self,
+            urls: Iterable[str],
+            word_count_threshold=MIN_WORD_THRESHOLD,
+            extraction_strategy: ExtractionStrategy = None,
+            chunking_strategy: ChunkingStrategy = RegexChunking(),
+            bypass_cache: bool = False,
+            css_selector: str = None,
+            screenshot: bool = False,
+            user_agent: str = None,
+            verbose=True,
+            **kwargs,
+        ) -> Iterator[CrawlResult]:
+        """
+        Crawl `urls` and yield each CrawlResult as soon as both stages are done with it.
+        """
+        extraction_strategy = self.crawler._prepare_strategies(extraction_strategy, chunking_strategy, verbose)
+        word_count_threshold = max(word_count_threshold, 0)
+        fields = kwargs["fields"] = self.crawler._output_fields(kwargs.get("fields"))
+        if fields is not None:
+            screenshot = "screenshot" in fields
+        if fields is not None and "extracted_content" not in fields:
+            extraction_strategy = None
+        extract_in_thread = isinstance(extraction_strategy, LLMExtractionStrategy)
+        processing_key = self.crawler._processing_key(word_count_threshold, css_selector, **kwargs)
+        extraction_key = self.crawler._extraction_key(extraction_strategy, chunking_strategy)
+        urls = list(urls)
+        handoff = queue.Queue(maxsize=self.queue_size)
+        closed = False
+
+        timeout = kwargs.pop("timeout", None)
+
+        def fetch_stage(url):
+            try:
+                # Each URL gets its own time budget, starting when its fetch starts
+                deadline = Deadline(timeout)
+                item = self.crawler._load_html(url, bypass_cache, screenshot, user_agent, verbose, {}, **{**kwargs, "deadline": deadline})
+                item["deadline"] = deadline
+            except Exception as e:
+                item = self._failed(url, e)
+            while not closed:
+                try:
+                    handoff.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        with ThreadPoolExecutor(max_workers=self.fetch_concurrency) as fetch_executor, \
+             ThreadPoolExecutor(max_workers=self.fetch_concurrency) as extract_executor, \
+             ProcessPoolExecutor(
+                 max_workers=self.process_concurrency,
+                 initializer=_init_worker,
+                 initargs=(None if extract_in_thread else extraction_strategy, chunking_strategy),
+             ) as process_executor:
+            try:
+                for url in self.crawler.scheduler.interleave(urls):
+                    fetch_executor.submit(fetch_stage, url)
+
+                remaining = len(urls)
+                # Future of the processing of a page -> the page
+                pending = {}
+                while remaining or pending:
+                    # Only pull more pages off the queue while the workers can keep up, so
+                    # fetchers block on the full queue instead of piling up HTML in memory.
+                    if remaining and len(pending) < self.queue_size:
+                        try:
+                            item = handoff.get(timeout=0.05 if pending else None)
+                        except queue.Empty:
+                            item = None
+                        if isinstance(item, CrawlResult):
+                            remaining -= 1
+                            yield item
+                        elif item is not None:
+                            remaining -= 1
+                            stored = self.crawler._stored_content(item, verbose, fields, processing_key, extraction_key)
+                            if stored is not None:
+                                yield self._unchanged(item, stored, fields)
+                            else:
+                                future = self._process(item, process_executor, extract_executor, extraction_strategy, chunking_strategy, processing_key, extraction_key, word_count_threshold, css_selector, verbose, kwargs)
+                                pending[future] = item
+                        done = {future for future in pending if future.done()}
+                    else:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield self._finish(pending.pop(future), future, processing_key, extraction_key, kwargs["fields"])
+            finally:
+                # Unblock fetchers if the caller stopped iterating early
+                closed = True
+                fetch_executor.shutdown(wait=False, cancel_futures=True)
+
+    def _process(self, item, process_executor, extract_executor, extraction_strategy, chunking_strategy, processing_key, extraction_key, word_count_threshold, css_selector, verbose, kwargs) -> Future:
+        """
+        Send the page to a worker process, then to an extraction thread for LLM
+        extraction. Returns a future of the processed content, which `_finish` turns into
+        a result. The callbacks run on the thread of the process pool that collects the
+        workers' output, so they only hand the page on.
+        """
+        result = Future()
+        url = item["url"]
+
+        def extract(processed):
+            try:
+                processed["extracted_content"] = extract_content(url, processed["markdown"], extraction_strategy, chunking_strategy, verbose, processed["timings"], item["deadline"])
+                processed["extraction_reused"] = False
+                result.set_result(processed)
+            except Exception as e:
+                result.set_exception(e)
+
+        def on_processed(future):
+            try:
+                processed = future.result()
+            except Exception as e:
+                result.set_exception(e)
+                return
+            if processed["extracted_content"] is None and extraction_strategy is not None:
+                extract_executor.submit(extract, processed)
+            else:
+                result.set_result(processed)
+
+        worker_kwargs = {**kwargs, "deadline": item["deadline"]}
+        if kwargs["fields"] is not None and extraction_strategy is not None:
+            # The extraction thread needs the markdown even if the caller did not ask for it
+            worker_kwargs["fields"] = kwargs["fields"] | {"markdown"}
+        process_executor.submit(
+            _process_in_worker, url, item["html"], item["extracted_content"],
+            word_count_threshold, css_selector, verbose, self.crawler._previous_extraction(item, processing_key, extraction_key), worker_kwargs
+        ).add_done_callback(on_processed)
+        return result
+
+    def _finish(self, item, future: Future, processing_key: str, extraction_key: tuple, fields) -> CrawlResult:
+        # On the consumer's thread: cache the processed page and build its result
+        url = item["url"]
+        try:
+            processed = future.result()
+            timings = item["timings"]
+            if not self.crawler._skipped_stages(item["deadline"], processed):
+                t = time.time()
+                if not item["is_cached"]:
+                    cache_url(url, item["html"], **self.crawler._cache_columns(processed, item["screenshot"], item["validators"]))
+                self.crawler._store_artifacts(url, processed, processing_key, extraction_key)
+                timings["cache_write"] = time.time() - t
+            crawl_result = self.crawler._build_result(url, item["html"], processed, item["screenshot"], timings, item["deadline"], fields)
+            crawl_result.success = bool(item["html"])
+            return crawl_result
+        except Exception as e:
+            return self._failed(url, e)
+
+    def _unchanged(self, item, stored, fields=None) -> CrawlResult:
+        # The HTML was already processed with these parameters: skip the worker and reuse the stored results
+        validators = item["validators"]
+        if not item["is_cached"]:
+            touch_cached_url(item["url"], validators.get("etag", ""), validators.get("last_modified", ""), item["screenshot"])
+        crawl_result = self.crawler._build_result(item["url"], item["html"], stored, item["screenshot"], item["timings"], item["deadline"], fields)
+        crawl_result.content_unchanged = not item["is_cached"]
+        crawl_result.success = True
+        return crawl_result
+
+    def _failed(self, url: str, e: Exception) -> CrawlResult:
+        if not hasattr(e, "msg"):
+            e.msg = str(e)
+        print(f"[ERROR] 🚫 Failed to crawl {url}, error: {e.msg}")
+        return CrawlResult(url=url, html="", success=False, error_message=e.msg, timed_out=isinstance(e, DeadlineExceeded))
@@ -0,0 +1,440 @@
+import time
+import asyncio
+import inspect
+import threading
+from typing import Callable, List, Optional, Tuple
+
+from .config import *
+from .crawler_strategy import CrawlerStrategy, SCREENSHOT_OPTIONS
+from .deadline import Deadline, DeadlineExceeded
+from .html_store import HtmlStore
+from .resource_blocking import blocked_url_patterns
+from .scheduler import domain_of, match_domain
+from .screenshot import PAGE_METRICS_JS, capture_params, check_screenshot_options, error_screenshot
+from .wait_strategy import WaitStrategy, wait_strategies
+from .utils import sanitize_input_encode
+
+try:
+    from playwright.async_api import async_playwright, Page, TimeoutError as PlaywrightTimeoutError
+    PLAYWRIGHT_AVAILABLE = True
+except ImportError:
+    PLAYWRIGHT_AVAILABLE = False
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+DEFAULT_VIEWPORT = {"width": 1920, "height": 1080}
+
+
+class _Tab:
+    """
+    A browser context with its single page and DevTools session, reused across
+    navigations, and the settings currently applied to it.
+    """
+
+    def __init__(self, browser, context, page, cdp, user_agent: str):
+        self.browser = browser
+        self.context = context
+        self.page = page
+        self.cdp = cdp
+        self.pages_served = 0
+        self.blocked = ()
+        self.overrides = {"user_agent": user_agent, "headers": {}, "viewport": None}
+
+
+class PlaywrightCrawlerStrategy(CrawlerStrategy):
+    """
+    Renders pages in isolated browser contexts of a single Chromium process driven by
+    Playwright, instead of one Chrome process per parallel crawl as in
+    LocalSeleniumCrawlerStrategy. Up to `max_contexts` contexts render at once, which
+    bounds memory use; each keeps one tab and is reused for `max_pages_per_context` page
+    loads before it is replaced.
+
+    Hooks, resource blocking, wait strategies, per-request overrides, screenshots and
+    the HTML store work as in LocalSeleniumCrawlerStrategy, with hooks receiving the
+    Playwright Page where the Selenium strategy passes its driver. Hooks may be
+    coroutine functions.
+
+    Playwright runs on an event loop owned by the strategy in a background thread, so
+    that one browser serves worker threads and async callers on any loop alike.
+    """
+
+    supports_request_overrides = True
+
+    def __init__(self, use_cached_html=False, js_code=None, **kwargs):
+        if not PLAYWRIGHT_AVAILABLE:
+            raise ImportError("PlaywrightCrawlerStrategy needs Playwright: pip install playwright && playwright install chromium")
+        super().__init__()
+        print("[LOG] 🚀 Initializing PlaywrightCrawlerStrategy")
+        self.use_cached_html = use_cached_html
+        self.js_code = js_code
+        self.verbose = kwargs.get("verbose", False)
+        self.headless = kwargs.get("headless", True)
+        self.cookies = kwargs.get("cookies")
+        self.html_store = kwargs.get("html_store") or HtmlStore()
+
+        # Defaults applied to every navigation unless a crawl passes its own
+        self._launch_user_agent = kwargs.get("user_agent") or DEFAULT_USER_AGENT
+        self.user_agent = self._launch_user_agent
+        self.headers = {}
+        self.viewport = None
+
+        self.hooks = {
+            'on_driver_created': None,
+            'on_user_agent_updated': None,
+            'before_get_url': None,
+            'after_get_url': None,
+            'before_return_html': None
+        }
+
+        self.max_contexts = max(kwargs.get("max_contexts", PLAYWRIGHT_MAX_CONTEXTS), 1)
+        self.max_pages = kwargs.get("max_pages_per_context", DRIVER_MAX_PAGES)
+        self.prewarm_count = kwargs.get("prewarm_count", DRIVER_PREWARM_COUNT)
+
+        self.blocked_urls = blocked_url_patterns(kwargs.get("blocked_resources", RESOURCE_BLOCKING))
+        self.domain_blocked_urls = {
+            domain_of(f"http://{domain}"): blocked_url_patterns(spec)
+            for domain, spec in (kwargs.get("domain_blocked_resources") or {}).items()
+        }
+        self.wait_for = wait_strategies(kwargs.get("wait_for"))
+
+        self.screenshot_mode = kwargs.get("screenshot_mode", SCREENSHOT_MODE)
+        self.screenshot_format = kwargs.get("screenshot_format", SCREENSHOT_FORMAT)
+        self.screenshot_quality = kwargs.get("screenshot_quality", SCREENSHOT_QUALITY)
+        self.screenshot_max_height = kwargs.get("screenshot_max_height", SCREENSHOT_MAX_HEIGHT)
+        self.thumbnail_width = kwargs.get("thumbnail_width", SCREENSHOT_THUMBNAIL_WIDTH)
+        check_screenshot_options(self.screenshot_mode, self.screenshot_format)
+
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        # Only touched from the strategy's loop
+        self._playwright = None
+        self._browser = None
+        self._browser_lock = None
+        self._slots = None
+        self._idle: List[_Tab] = []
+        # Synchronous crawls keep their tab bound to the calling thread until release(),
+        # so that a crawl and its screenshot see the same page
+        self._local = threading.local()
+
+    # Running coroutines on the strategy's loop
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="playwright-loop", daemon=True).start()
+            return self._loop
+
+    def _run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+
+    async def _arun(self, coro):
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()))
+
+    # CrawlerStrategy interface
+
+    def crawl(self, url: str, **kwargs) -> str:
+        html = self._cached_html(url)
+        if html is not None:
+            return html
+        return self._run(self._crawl(self._tab(kwargs.get("deadline")), url, **kwargs))
+
+    async def acrawl(self, url: str, **kwargs) -> str:
+        html, _ = await self.afetch(url, False, **kwargs)
+        return html
+
+    def fetch(self, url: str, screenshot: bool = False, **kwargs) -> Tuple[str, Optional[str]]:
+        html = self._cached_html(url)
+        if html is not None:
+            return html, None
+        return self._run(self._fetch(url, screenshot, **kwargs))
+
+    async def afetch(self, url: str, screenshot: bool = False, **kwargs) -> Tuple[str, Optional[str]]:
+        html = self._cached_html(url)
+        if html is not None:
+            return html, None
+        return await self._arun(self._fetch(url, screenshot, **kwargs))
+
+    def take_screenshot(self, mode: str = None, format: str = None, quality: int = None) -> str:
+        return self._run(self._screenshot(self._tab(), mode, format, quality))
+
+    def release(self):
+        tab = getattr(self._local, "tab", None)
+        if tab is not None:
+            self._local.tab = None
+            self._run(self._checkin(tab))
+
+    def warmup(self):
+        t = time.time()
+        try:
+            self._run(self._prewarm())
+            if self.verbose:
+                print(f"[LOG] 🚗 Started the browser and {self.prewarm_count} context(s) in {time.time() - t:.2f} seconds")
+        except Exception as e:
+            print(f"[LOG] ⚠️ Could not start the browser during warmup, it will be started on the first crawl: {sanitize_input_encode(str(e))}")
+
+    def update_user_agent(self, user_agent: str):
+        # Applied to each context on its next navigation
+        self.user_agent = user_agent
+        if self.hooks['on_user_agent_updated']:
+            tab = self._tab()
+            tab.page = self._run(self.execute_hook('on_user_agent_updated', tab.page))
+
+    def set_custom_headers(self, headers: dict):
+        self.headers = dict(headers)
+
+    def set_hook(self, hook_type: str, hook: Callable):
+        if hook_type in self.hooks:
+            self.hooks[hook_type] = hook
+        else:
+            raise ValueError(f"Invalid hook type: {hook_type}")
+
+    async def execute_hook(self, hook_type: str, page, *args):
+        hook = self.hooks.get(hook_type)
+        if hook:
+            result = hook(page, *args)
+            if inspect.isawaitable(result):
+                result = await result
+            if result is not None:
+                if isinstance(result, Page):
+                    return result
+                else:
+                    raise TypeError(f"Hook {hook_type} must return a Playwright Page or None.")
+        return page
+
+    def quit(self):
+        self.release()
+        if self._loop is not None:
+            self._run(self._shutdown())
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = None
+
+    # Browser and contexts, on the strategy's loop
+
+    def _tab(self, deadline: Deadline = None) -> _Tab:
+        tab = getattr(self._local, "tab", None)
+        if tab is None:
+            tab = self._local.tab = self._run(self._checkout(deadline))
+        return tab
+
+    def _cached_html(self, url: str) -> Optional[str]:
+        if not self.use_cached_html:
+            return None
+        html = self.html_store.get(url)
+        return sanitize_input_encode(html) if html is not None else None
+
+    async def _ensure_browser(self):
+        if self._browser_lock is None:
+            self._browser_lock = asyncio.Lock()
+            self._slots = asyncio.Semaphore(self.max_contexts)
+        async with self._browser_lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(
+                    headless=self.headless,
+                    args=["--disable-gpu", "--no-sandbox", "--disable-dev-shm-usage", "--disable-blink-features=AutomationControlled"],
+                )
+                # Tabs of a browser that went away are discarded on checkout
+                if self.verbose:
+                    print("[LOG] 🚗 Browser started")
+
+    async def _checkout(self, deadline: Deadline = None) -> _Tab:
+        """
+        Take an idle context, or open a new one, once fewer than `max_contexts` are busy.
+        Waiting for a busy context counts against the crawl's `deadline`.
+        """
+        await self._ensure_browser()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), deadline.remaining() if deadline is not None else None)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded("page load") from None
+        try:
+            while self._idle:
+                tab = self._idle.pop()
+                if tab.browser is self._browser and not tab.page.is_closed():
+                    return tab
+                await self._close_tab(tab)
+            return await self._new_tab()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def _new_tab(self) -> _Tab:
+        browser = self._browser
+        context = await browser.new_context(user_agent=self._launch_user_agent, viewport=DEFAULT_VIEWPORT)
+        if self.cookies:
+            await context.add_cookies(self.cookies)
+        tab = _Tab(browser, context, await context.new_page(), None, self._launch_user_agent)
+        try:
+            tab.page = await self.execute_hook('on_driver_created', tab.page)
+            # The DevTools session goes to the page the hook returned, which may be a new one
+            tab.cdp = await context.new_cdp_session(tab.page)
+        except BaseException:
+            await self._close_tab(tab)
+            raise
+        return tab
+
+    async def _checkin(self, tab: _Tab):
+        try:
+            reusable = tab.browser is self._browser and not tab.page.is_closed() and tab.pages_served < self.max_pages
+            if reusable:
+                try:
+                    # An idle tab should not keep running the scripts of the last article
+                    await tab.page.goto("about:blank")
+                except Exception:
+                    reusable = False
+            if reusable:
+                self._idle.append(tab)
+            else:
+                await self._close_tab(tab)
+        finally:
+            self._slots.release()
+
+    async def _close_tab(self, tab: _Tab):
+        try:
+            await tab.context.close()
+        except Exception:
+            pass
+
+    async def _prewarm(self):
+        tabs = [await self._checkout() for _ in range(min(self.prewarm_count, self.max_contexts))]
+        for tab in tabs:
+            await self._checkin(tab)
+
+    async def _shutdown(self):
+        while self._idle:
+            await self._close_tab(self._idle.pop())
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    # One crawl, on the strategy's loop
+
+    async def _fetch(self, url: str, screenshot: bool, **kwargs) -> Tuple[str, Optional[str]]:
+        tab = await self._checkout(kwargs.get("deadline"))
+        try:
+            html = await self._crawl(tab, url, **kwargs)
+            deadline = kwargs.get("deadline")
+            if screenshot and deadline is not None and deadline.expired():
+                deadline.skip("screenshot")
+                screenshot = False
+            options = {arg: kwargs[key] for key, arg in SCREENSHOT_OPTIONS.items() if kwargs.get(key) is not None}
+            screenshot_data = await self._screenshot(tab, **options) if screenshot else None
+            return html, screenshot_data
+        finally:
+            await self._checkin(tab)
+
+    async def _crawl(self, tab: _Tab, url: str, **kwargs) -> str:
+        deadline = kwargs.get('deadline') or Deadline()
+        try:
+            tab.page = await self.execute_hook('before_get_url', tab.page)
+            if self.verbose:
+                print(f"[LOG] 🕸️ Crawling {url} using PlaywrightCrawlerStrategy...")
+            await self._block_resources(tab, url)
+            await self._apply_overrides(tab, kwargs.get("user_agent"), kwargs.get("headers"), kwargs.get("viewport"))
+            # A timeout of 0 would mean no timeout at all to Playwright
+            deadline.check("page load")
+            try:
+                await tab.page.goto(url, wait_until="load", timeout=max(deadline.cap(SELENIUM_PAGE_LOAD_TIMEOUT) * 1000, 1))
+            except PlaywrightTimeoutError:
+                if not deadline.expired():
+                    raise
+                # Out of time: keep whatever has loaded so far
+                deadline.skip("page load")
+                await tab.page.evaluate("() => window.stop()")
+            tab.pages_served += 1
+
+            t_wait = time.time()
+            wait_for = wait_strategies(kwargs["wait_for"]) if kwargs.get("wait_for") else self.wait_for
+            # Scroll first, so that content loaded lazily on scroll is waited for as well
+            await tab.page.evaluate("() => window.scrollTo(0, document.body ? document.body.scrollHeight : 0)")
+            tab.page = await self.execute_hook('after_get_url', tab.page)
+            await self._wait_for_page(tab, wait_for, deadline)
+            if kwargs.get('timings') is not None:
+                kwargs['timings']['wait_for_load'] = time.time() - t_wait
+
+            js_snippets = [self.js_code] if type(self.js_code) == str else (self.js_code or [])
+            for js in js_snippets:
+                if deadline.expired():
+                    deadline.skip("js_code")
+                    break
+                # Run as a function body, like Selenium's execute_script
+                await tab.page.evaluate("() => {\n" + js + "\n}")
+                await self._wait_for_page(tab, wait_for, deadline, "js_code")
+
+            html = await tab.page.content()
+            tab.page = await self.execute_hook('before_return_html', tab.page, html)
+
+            # Store in the HTML store, unless the page was cut short by the deadline. Off
+            # the loop, which drives every other context in the meantime.
+            if not deadline.skipped:
+                await asyncio.get_running_loop().run_in_executor(None, self.html_store.put, url, html)
+
+            if self.verbose:
+                print(f"[LOG] ✅ Crawled {url} successfully!")
+            return sanitize_input_encode(html)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            message = sanitize_input_encode(str(e))
+            error = Exception(f"Failed to crawl {url}: {message}")
+            # A malformed URL fails the same way every time
+            if "invalid url" in message.lower():
+                error.retryable = False
+            raise error from e
+
+    async def _wait_for_page(self, tab: _Tab, wait_for: List[WaitStrategy], deadline: Deadline, stage: str = "page load"):
+        for strategy in wait_for:
+            await strategy.await_page(tab.page, deadline, stage)
+
+    async def _block_resources(self, tab: _Tab, url: str):
+        patterns = match_domain(domain_of(url), self.domain_blocked_urls, self.blocked_urls)
+        if tab.blocked == patterns:
+            return
+        await tab.cdp.send('Network.enable')
+        await tab.cdp.send('Network.setBlockedURLs', {'urls': list(patterns)})
+        tab.blocked = patterns
+
+    async def _apply_overrides(self, tab: _Tab, user_agent: str = None, headers: dict = None, viewport=None):
+        # Same as LocalSeleniumCrawlerStrategy._apply_overrides, for a context
+        viewport = viewport or self.viewport
+        if isinstance(viewport, dict):
+            viewport = (viewport["width"], viewport["height"])
+        wanted = {
+            "user_agent": user_agent or self.user_agent,
+            "headers": {**self.headers, **(headers or {})},
+            "viewport": tuple(viewport) if viewport else None,
+        }
+        current = tab.overrides
+        if wanted["user_agent"] != current["user_agent"]:
+            await tab.cdp.send('Network.setUserAgentOverride', {'userAgent': wanted["user_agent"]})
+        if wanted["headers"] != current["headers"]:
+            await tab.page.set_extra_http_headers(wanted["headers"])
+        if wanted["viewport"] != current["viewport"]:
+            width, height = wanted["viewport"] or (DEFAULT_VIEWPORT["width"], DEFAULT_VIEWPORT["height"])
+            await tab.page.set_viewport_size({"width": int(width), "height": int(height)})
+        tab.overrides = wanted
+
+    async def _screenshot(self, tab: _Tab, mode: str = None, format: str = None, quality: int = None) -> str:
+        mode, format = mode or self.screenshot_mode, format or self.screenshot_format
+        check_screenshot_options(mode, format)
+        try:
+            params = capture_params(
+                mode,
+                format,
+                quality if quality is not None else self.screenshot_quality,
+                await tab.page.evaluate("() => {\n" + PAGE_METRICS_JS + "\n}"),
+                self.screenshot_max_height,
+                self.thumbnail_width,
+            )
+            img_base64 = (await tab.cdp.send("Page.captureScreenshot", params))["data"]
+            if self.verbose:
+                print(f"[LOG] 📸 {mode.capitalize()} screenshot taken as {format}")
+            return img_base64
+        except Exception as e:
+            error_message = sanitize_input_encode(f"Failed to take screenshot: {str(e)}")
+            print(error_message)
+            return error_screenshot(error_message)
@@ -0,0 +1,259 @@
+import os
+import json
+import time
+import base64
+import asyncio
+import tempfile
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urldefrag
+from .crawler_strategy import CrawlerStrategy
+
+
+class ReplayMissError(Exception):
+    """
+    Raised by ReplayCrawlerStrategy for a URL that is not in its archive.
+    """
+
+    def __init__(self, url: str, path: str):
+        self.url = url
+        self.msg = f"{url} is not in the replay archive {path}"
+        # The archive will not have it next time either
+        self.retryable = False
+        super().__init__(self.msg)
+
+
+def _key(url: str) -> str:
+    # The fragment is never sent to the server, so it does not tell responses apart
+    return urldefrag(url)[0]
+
+
+class HarArchive:
+    """
+    Responses of crawls in a HAR 1.2 file (JSON, as exported by browser developer tools),
+    looked up by URL. When a URL appears more than once, its last successful response
+    wins. Crawl4AI adds the screenshot of a page in a `_screenshot` field of its entry,
+    as HAR allows for custom fields.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: List[dict] = []
+        self.by_url: Dict[str, dict] = {}
+        self.lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for entry in json.load(f)["log"]["entries"]:
+                    self._index(entry)
+
+    def _index(self, entry: dict):
+        self.entries.append(entry)
+        key = _key(entry["request"]["url"])
+        status = entry["response"].get("status", 200)
+        if 200 <= status < 400 or key not in self.by_url:
+            self.by_url[key] = entry
+
+    def __contains__(self, url: str) -> bool:
+        return _key(url) in self.by_url
+
+    def __len__(self) -> int:
+        return len(self.by_url)
+
+    def urls(self) -> List[str]:
+        return list(self.by_url)
+
+    def get(self, url: str) -> Optional[dict]:
+        return self.by_url.get(_key(url))
+
+    def add(self, url: str, html: str, screenshot: str = None, elapsed: float = 0.0, status: int = 200):
+        """
+        Record `html` as the response to `url`, received in `elapsed` seconds.
+        """
+        body_size = len(html.encode("utf-8"))
+        entry = {
+            "startedDateTime": datetime.now(timezone.utc).isoformat(),
+            "time": round(elapsed * 1000, 3),
+            "request": {
+                "method": "GET", "url": url, "httpVersion": "HTTP/1.1",
+                "headers": [], "queryString": [], "cookies": [], "headersSize": -1, "bodySize": 0,
+            },
+            "response": {
+                "status": status, "statusText": "", "httpVersion": "HTTP/1.1",
+                "headers": [{"name": "Content-Type", "value": "text/html; charset=utf-8"}], "cookies": [],
+                "content": {"size": body_size, "mimeType": "text/html; charset=utf-8", "text": html},
+                "redirectURL": "", "headersSize": -1, "bodySize": body_size,
+            },
+            "cache": {},
+            "timings": {"send": 0, "wait": round(elapsed * 1000, 3), "receive": 0},
+        }
+        if screenshot:
+            entry["_screenshot"] = screenshot
+        with self.lock:
+            self._index(entry)
+
+    def save(self):
+        """
+        Write the archive to `path`, through a temporary file so that a crash midway
+        leaves the previous archive intact.
+        """
+        with self.lock:
+            har = {"log": {"version": "1.2", "creator": {"name": "crawl4ai", "version": ""}, "entries": list(self.entries)}}
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".har")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(har, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    @staticmethod
+    def text(entry: dict) -> str:
+        content = entry["response"].get("content", {})
+        text = content.get("text") or ""
+        if content.get("encoding") == "base64":
+            text = base64.b64decode(text).decode("utf-8", errors="replace")
+        return text
+
+
+class RecordingCrawlerStrategy(CrawlerStrategy):
+    """
+    Wraps another crawler strategy and records the page it returns for every URL into a
+    HAR archive, to be served again by ReplayCrawlerStrategy. What is recorded is the
+    HTML the pipeline receives (the rendered DOM for browser strategies), with the
+    screenshot and the time the crawl took. Call `save` (or `quit`) to write the archive.
+
+    Pages cut short by the crawl's deadline are not recorded, and neither are pages that
+    a revalidation found unchanged, so record with `bypass_cache=True`.
+    """
+
+    def __init__(self, strategy: CrawlerStrategy, path: str):
+        self.strategy = strategy
+        self.archive = HarArchive(path)
+
+    @property
+    def supports_request_overrides(self):
+        return self.strategy.supports_request_overrides
+
+    def _record(self, url: str, html: Optional[str], screenshot: Optional[str], started: float, kwargs: dict):
+        deadline = kwargs.get("deadline")
+        if html is not None and not (deadline is not None and deadline.skipped):
+            self.archive.add(url, html, screenshot, time.time() - started)
+
+    def crawl(self, url: str, **kwargs) -> str:
+        started = time.time()
+        html = self.strategy.crawl(url, **kwargs)
+        self._record(url, html, None, started, kwargs)
+        return html
+
+    async def acrawl(self, url: str, **kwargs) -> str:
+        started = time.time()
+        html = await self.strategy.acrawl(url, **kwargs)
+        self._record(url, html, None, started, kwargs)
+        return html
+
+    def fetch(self, url: str, screenshot: bool = False, **kwargs) -> Tuple[str, Optional[str]]:
+        started = time.time()
+        html, screenshot_data = self.strategy.fetch(url, screenshot, **kwargs)
+        self._record(url, html, screenshot_data, started, kwargs)
+        return html, screenshot_data
+
+    async def afetch(self, url: str, screenshot: bool = False, **kwargs) -> Tuple[str, Optional[str]]:
+        started = time.time()
+        html, screenshot_data = await self.strategy.afetch(url, screenshot, **kwargs)
+        self._record(url, html, screenshot_data, started, kwargs)
+        return html, screenshot_data
+
+    def take_screenshot(self, *args, **kwargs):
+        return self.strategy.take_screenshot(*args, **kwargs)
+
+    def update_user_agent(self, user_agent: str):
+        self.strategy.update_user_agent(user_agent)
+
+    def set_hook(self, hook_type: str, hook: Callable):
+        self.strategy.set_hook(hook_type, hook)
+
+    def release(self):
+        self.strategy.release()
+
+    def warmup(self):
+        self.strategy.warmup()
+
+    def save(self):
+        self.archive.save()
+
+    def quit(self):
+        self.save()
+        if hasattr(self.strategy, "quit"):
+            self.strategy.quit()
+
+    def __getattr__(self, name):
+        # Anything else the wrapped strategy offers, e.g. set_custom_headers
+        if name == "strategy":
+            raise AttributeError(name)
+        return getattr(self.strategy, name)
+
+
+class ReplayCrawlerStrategy(CrawlerStrategy):
+    """
+    Serves pages from a HAR archive instead of the network, e.g. one written by
+    RecordingCrawlerStrategy or exported from a browser, so that the pipeline runs on
+    exactly the same responses every time and without network access. A URL missing
+    from the archive fails with ReplayMissError.
+
+    With `simulate_latency=True`, each page is returned after the time its recorded
+    crawl took, for end-to-end measurements.
+    """
+
+    def __init__(self, path: str, simulate_latency: bool = False):
+        self.path = path
+        self.archive = HarArchive(path)
+        self.simulate_latency = simulate_latency
+        # URL of the last page served to each thread, for take_screenshot
+        self._local = threading.local()
+
+    def _entry(self, url: str) -> dict:
+        entry = self.archive.get(url)
+        if entry is None:
+            raise ReplayMissError(url, self.path)
+        self._local.url = url
+        return entry
+
+    def _latency(self, entry: dict) -> float:
+        return entry.get("time", 0) / 1000 if self.simulate_latency else 0.0
+
+    def crawl(self, url: str, **kwargs) -> str:
+        entry = self._entry(url)
+        if self._latency(entry):
+            time.sleep(self._latency(entry))
+        return HarArchive.text(entry)
+
+    async def acrawl(self, url: str, **kwargs) -> str:
+        entry = self._entry(url)
+        if self._latency(entry):
+            await asyncio.sleep(self._latency(entry))
+        return HarArchive.text(entry)
+
+    def fetch(self, url: str, screenshot: bool = False, **kwargs) -> Tuple[str, Optional[str]]:
+        html = self.crawl(url, **kwargs)
+        return html, self.archive.get(url).get("_screenshot") if screenshot else None
+
+    async def afetch(self, url: str, screenshot: bool = False, **kwargs) -> Tuple[str, Optional[str]]:
+        html = await self.acrawl(url, **kwargs)
+        return html, self.archive.get(url).get("_screenshot") if screenshot else None
+
+    def take_screenshot(self, *args, **kwargs) -> Optional[str]:
+        url = getattr(self._local, "url", None)
+        entry = self.archive.get(url) if url else None
+        return entry.get("_screenshot") if entry else None
+
+    def update_user_agent(self, user_agent: str):
+        # Recorded responses do not depend on the user agent
+        pass
+
+    def set_hook(self, hook_type: str, hook: Callable):
+        # There is no browser to run hooks on
+        pass
@@ -0,0 +1,49 @@
+from typing import Iterable, Tuple, Union
+
+
+def _extensions(*extensions: str) -> Tuple[str, ...]:
+    # With and without a query string, e.g. "*.jpg" and "*.jpg?*"
+    return tuple(pattern for ext in extensions for pattern in (f"*.{ext}", f"*.{ext}?*"))
+
+
+# URL patterns (with "*" wildcards, as accepted by Chrome's Network.setBlockedURLs) of the
+# subresources a crawl can do without: only the DOM is read, so they are downloaded for nothing
+BLOCKING_PROFILES = {
+    "none": (),
+    "images": _extensions("png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp"),
+    "fonts": _extensions("woff", "woff2", "ttf", "otf", "eot"),
+    "media": _extensions("mp4", "webm", "ogg", "ogv", "mp3", "m4a", "wav", "m3u8", "ts"),
+    "trackers": tuple(f"*{host}*" for host in (
+        "google-analytics.com", "googletagmanager.com", "googletagservices.com", "doubleclick.net",
+        "googlesyndication.com", "adservice.google.", "connect.facebook.net", "scorecardresearch.com",
+        "chartbeat.com", "chartbeat.net", "quantserve.com", "taboola.com", "outbrain.com",
+        "amazon-adsystem.com", "criteo.com", "criteo.net", "adnxs.com", "hotjar.com", "segment.io",
+        "nr-data.net", "moatads.com", "pubmatic.com", "rubiconproject.com", "optimizely.com",
+    )),
+}
+BLOCKING_PROFILES["all"] = tuple(
+    pattern for name in ("images", "fonts", "media", "trackers") for pattern in BLOCKING_PROFILES[name]
+)
+
+
+def blocked_url_patterns(spec: Union[str, Iterable[str], None]) -> Tuple[str, ...]:
+    """
+    URL patterns to block for `spec`: a profile name from BLOCKING_PROFILES, a URL pattern,
+    or a list (or comma-separated string) mixing both, e.g. "images,fonts,*/ads/*".
+    """
+    if not spec:
+        return ()
+    items = spec.split(",") if isinstance(spec, str) else spec
+    patterns = []
+    for item in items:
+        item = item.strip()
+        if not item:
+            continue
+        if item in BLOCKING_PROFILES:
+            patterns.extend(BLOCKING_PROFILES[item])
+        elif "*" in item or "/" in item or "." in item:
+            patterns.append(item)
+        else:
+            raise ValueError(f"Unknown resource blocking profile: {item} (expected one of: {', '.join(BLOCKING_PROFILES)}, or a URL pattern)")
+    # Keep the order, drop duplicates
+    return tuple(dict.fromkeys(patterns))
@@ -0,0 +1,115 @@
+import time
+import random
+import threading
+from typing import Dict, Tuple, Type
+from .config import *
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of crawling when the circuit breaker of a domain is open.
+    """
+
+    def __init__(self, domain: str, retry_in: float):
+        self.domain = domain
+        self.retry_in = retry_in
+        self.msg = f"Circuit open for {domain} after repeated failures, retrying in {retry_in:.0f} seconds"
+        # Retrying right away would only hit the open circuit again
+        self.retryable = False
+        super().__init__(self.msg)
+
+
+class RetryPolicy:
+    """
+    How often and how long to wait before a failed page load is tried again: up to
+    `max_attempts` attempts in total, waiting a random time between 0 and
+    min(`max_delay`, `base_delay` * `multiplier` ** (attempt - 1)) seconds ("full jitter")
+    so that crawlers that failed together do not retry together.
+
+    Exceptions in `give_up_on`, and exceptions with a false `retryable` attribute, are
+    not retried.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = RETRY_MAX_ATTEMPTS,
+        base_delay: float = RETRY_BASE_DELAY,
+        max_delay: float = RETRY_MAX_DELAY,
+        multiplier: float = 2.0,
+        jitter: bool = True,
+        give_up_on: Tuple[Type[Exception], ...] = (),
+    ):
+        self.max_attempts = max(max_attempts, 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.give_up_on = (CircuitOpenError, *give_up_on)
+
+    def should_retry(self, error: Exception, attempt: int) -> bool:
+        if attempt >= self.max_attempts or isinstance(error, self.give_up_on):
+            return False
+        return getattr(error, "retryable", True)
+
+    def delay(self, attempt: int) -> float:
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+        return random.uniform(0, delay) if self.jitter else delay
+
+
+class CircuitBreaker:
+    """
+    Per-domain circuit breaker. After `failure_threshold` consecutive failures the
+    domain's circuit opens and `before` fails fast with CircuitOpenError for
+    `reset_timeout` seconds. Then a single trial request is let through: success closes
+    the circuit, failure opens it for another `reset_timeout`. A trial that ends with
+    neither (it was cancelled, or failed in a way that says nothing about the domain) is
+    given up with `abandon`, and the next request becomes the trial.
+    """
+
+    def __init__(self, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD, reset_timeout: float = CIRCUIT_RESET_TIMEOUT):
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_timeout = reset_timeout
+        self.lock = threading.Lock()
+        self.failures: Dict[str, int] = {}
+        self.opened_at: Dict[str, float] = {}
+        self.trial_in_flight = set()
+
+    def before(self, domain: str):
+        """
+        Raise CircuitOpenError if requests to `domain` must not be made right now.
+        """
+        with self.lock:
+            if domain not in self.opened_at:
+                return
+            retry_in = self.opened_at[domain] + self.reset_timeout - time.monotonic()
+            if retry_in > 0 or domain in self.trial_in_flight:
+                raise CircuitOpenError(domain, max(retry_in, 0))
+            # Half open: this request is the trial
+            self.trial_in_flight.add(domain)
+
+    def record_success(self, domain: str):
+        with self.lock:
+            self.failures.pop(domain, None)
+            self.opened_at.pop(domain, None)
+            self.trial_in_flight.discard(domain)
+
+    def record_failure(self, domain: str):
+        with self.lock:
+            self.failures[domain] = self.failures.get(domain, 0) + 1
+            if domain in self.trial_in_flight or self.failures[domain] >= self.failure_threshold:
+                if domain not in self.opened_at or domain in self.trial_in_flight:
+                    print(f"[LOG] ⛔ Too many failures for {domain}, pausing it for {self.reset_timeout} seconds")
+                self.opened_at[domain] = time.monotonic()
+                self.trial_in_flight.discard(domain)
+
+    def abandon(self, domain: str):
+        """
+        Forget a request to `domain` that neither succeeded nor failed, so that it does
+        not hold the trial of a half-open circuit forever.
+        """
+        with self.lock:
+            self.trial_in_flight.discard(domain)
+
+    def is_open(self, domain: str) -> bool:
+        with self.lock:
+            return domain in self.opened_at and time.monotonic() - self.opened_at[domain] < self.reset_timeout
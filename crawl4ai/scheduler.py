@@ -0,0 +1,190 @@
+import time
+import asyncio
+import threading
+import weakref
+from collections import deque, OrderedDict
+from contextlib import contextmanager, asynccontextmanager
+from typing import Callable, Dict, Iterable, Iterator, Optional
+from urllib.parse import urlparse
+from .config import *
+from .deadline import Deadline, DeadlineExceeded
+
+
+def domain_of(url: str) -> str:
+    """
+    Host name of `url` used to group requests, without a leading "www.".
+    """
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def match_domain(domain: str, mapping: dict, default=None):
+    """
+    Value of the entry of `mapping` whose key is `domain` or one of its parent domains.
+    """
+    for suffix, value in mapping.items():
+        if domain == suffix or domain.endswith("." + suffix):
+            return value
+    return default
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, holding at most `burst` tokens.
+    A rate of 0 or less means no limit.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, timeout: Optional[float] = None) -> Optional[float]:
+        """
+        Take a token and return how many seconds the caller has to wait before using it.
+        Tokens may be reserved ahead of time, so concurrent callers queue up in order.
+        Returns None, without taking a token, when the wait would exceed `timeout`.
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            delay = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+            if timeout is not None and delay > timeout:
+                return None
+            self.tokens -= 1
+            return delay
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        delay = self.reserve(timeout)
+        if delay:
+            time.sleep(delay)
+        return delay is not None
+
+    async def aacquire(self, timeout: Optional[float] = None) -> bool:
+        delay = self.reserve(timeout)
+        if delay:
+            await asyncio.sleep(delay)
+        return delay is not None
+
+
+class DomainScheduler:
+    """
+    Politeness layer in front of the crawler strategy. Each domain gets at most
+    `max_concurrency` requests in flight and `rate` requests per second (token bucket
+    with a burst of `burst`). `overrides` maps a domain to its own
+    {"max_concurrency": ..., "rate": ..., "burst": ...}; it also applies to subdomains.
+
+    `interleave` orders a batch round-robin across domains, so that workers spread over
+    many hosts instead of queueing behind a single one.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DOMAIN_MAX_CONCURRENCY,
+        rate: float = DOMAIN_RATE_LIMIT,
+        burst: int = None,
+        overrides: Dict[str, dict] = None,
+    ):
+        self.max_concurrency = max(max_concurrency, 1)
+        self.rate = rate
+        self.burst = burst or self.max_concurrency
+        self.overrides = {domain_of(f"http://{domain}"): limits for domain, limits in (overrides or {}).items()}
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        # asyncio semaphores are tied to the loop they are first used on
+        self._async_semaphores = weakref.WeakKeyDictionary()
+
+    def limits(self, domain: str) -> dict:
+        limits = {"max_concurrency": self.max_concurrency, "rate": self.rate, "burst": self.burst}
+        limits.update(match_domain(domain, self.overrides, {}))
+        return limits
+
+    def _bucket(self, domain: str) -> TokenBucket:
+        with self._lock:
+            if domain not in self._buckets:
+                limits = self.limits(domain)
+                self._buckets[domain] = TokenBucket(limits["rate"], limits["burst"])
+            return self._buckets[domain]
+
+    def _semaphore(self, domain: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if domain not in self._semaphores:
+                self._semaphores[domain] = threading.BoundedSemaphore(max(self.limits(domain)["max_concurrency"], 1))
+            return self._semaphores[domain]
+
+    def _async_semaphore(self, domain: str) -> asyncio.Semaphore:
+        semaphores = self._async_semaphores.setdefault(asyncio.get_running_loop(), {})
+        if domain not in semaphores:
+            semaphores[domain] = asyncio.Semaphore(max(self.limits(domain)["max_concurrency"], 1))
+        return semaphores[domain]
+
+    @contextmanager
+    def slot(self, url: str, deadline: Deadline = None):
+        """
+        Block until a request to the domain of `url` is allowed, and hold the slot
+        for the duration of the `with` block. Raise DeadlineExceeded instead of waiting
+        past `deadline`.
+        """
+        domain = domain_of(url)
+        semaphore = self._semaphore(domain)
+        if not semaphore.acquire(timeout=deadline.remaining() if deadline is not None else None):
+            raise DeadlineExceeded("scheduling")
+        try:
+            if not self._bucket(domain).acquire(deadline.remaining() if deadline is not None else None):
+                raise DeadlineExceeded("scheduling")
+            yield
+        finally:
+            semaphore.release()
+
+    @asynccontextmanager
+    async def aslot(self, url: str, deadline: Deadline = None):
+        domain = domain_of(url)
+        semaphore = self._async_semaphore(domain)
+        try:
+            await asyncio.wait_for(semaphore.acquire(), deadline.remaining() if deadline is not None else None)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded("scheduling") from None
+        try:
+            if not await self._bucket(domain).aacquire(deadline.remaining() if deadline is not None else None):
+                raise DeadlineExceeded("scheduling")
+            yield
+        finally:
+            semaphore.release()
+
+    def interleave(self, items: Iterable, key: Callable = None, window: Optional[int] = None) -> Iterator:
+        """
+        Yield `items` round-robin across domains. `key` maps an item to its URL (items
+        are URLs by default). With a `window`, at most that many items are read ahead,
+        so `items` can be an unbounded iterator; without one, all items are read first.
+        """
+        key = key or (lambda item: item)
+        items = iter(items)
+        queues: "OrderedDict[str, deque]" = OrderedDict()
+        buffered = 0
+        exhausted = False
+
+        while True:
+            while not exhausted and (window is None or buffered < window):
+                try:
+                    item = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+                queues.setdefault(domain_of(key(item)), deque()).append(item)
+                buffered += 1
+            if not queues:
+                return
+            # Take one item from the domain at the front and move it to the back
+            domain, pending = next(iter(queues.items()))
+            yield pending.popleft()
+            buffered -= 1
+            if pending:
+                queues.move_to_end(domain)
+            else:
+                del queues[domain]
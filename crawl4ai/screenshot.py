@@ -0,0 +1,79 @@
+import base64
+from io import BytesIO
+from typing import Optional, Sequence
+
+# "full": the whole page; "viewport": what a visitor sees first; "clip": the whole page,
+# cut at a maximum height; "thumbnail": the viewport scaled down to a given width
+SCREENSHOT_MODES = ("full", "viewport", "clip", "thumbnail")
+SCREENSHOT_FORMATS = ("jpeg", "webp", "png")
+
+# Scrolls back to the top (crawls end scrolled to the bottom) and returns the viewport and
+# document sizes in CSS pixels, in a single round trip
+PAGE_METRICS_JS = """
+window.scrollTo(0, 0);
+const root = document.documentElement, body = document.body || root;
+return [
+    window.innerWidth, window.innerHeight,
+    Math.max(root.scrollWidth, body.scrollWidth), Math.max(root.scrollHeight, body.scrollHeight)
+];
+"""
+
+
+def check_screenshot_options(mode: str, format: str):
+    if mode not in SCREENSHOT_MODES:
+        raise ValueError(f"Unknown screenshot mode {mode!r}, expected one of {', '.join(SCREENSHOT_MODES)}")
+    if format not in SCREENSHOT_FORMATS:
+        raise ValueError(f"Unknown screenshot format {format!r}, expected one of {', '.join(SCREENSHOT_FORMATS)}")
+
+
+def capture_params(
+    mode: str,
+    format: str,
+    quality: Optional[int],
+    metrics: Sequence[float],
+    max_height: int,
+    thumbnail_width: int,
+) -> dict:
+    """
+    Parameters of the DevTools Page.captureScreenshot command for `mode`, given the page
+    `metrics` read with PAGE_METRICS_JS. The browser crops, scales and encodes the image
+    itself, so the page is not resized and no image is decoded in Python.
+    """
+    check_screenshot_options(mode, format)
+    viewport_width, viewport_height, page_width, page_height = (max(int(value or 0), 1) for value in metrics)
+    params = {"format": format}
+    if format != "png" and quality is not None:
+        params["quality"] = int(quality)
+
+    if mode == "viewport":
+        params["captureBeyondViewport"] = False
+    elif mode == "thumbnail":
+        params["captureBeyondViewport"] = False
+        scale = min(thumbnail_width / viewport_width, 1.0)
+        params["clip"] = {"x": 0, "y": 0, "width": viewport_width, "height": viewport_height, "scale": scale}
+    else:
+        height = page_height if mode == "full" else min(page_height, max_height)
+        params["captureBeyondViewport"] = True
+        params["clip"] = {"x": 0, "y": 0, "width": page_width, "height": height, "scale": 1}
+    return params
+
+
+def error_screenshot(error_message: str) -> str:
+    """
+    A black JPEG with `error_message` written on it, base64-encoded, returned in place of
+    a screenshot that could not be taken.
+    """
+    from PIL import Image, ImageDraw, ImageFont
+    from .utils import wrap_text
+
+    img = Image.new('RGB', (800, 600), color='black')
+    draw = ImageDraw.Draw(img)
+    try:
+        font = ImageFont.truetype("arial.ttf", 40)
+    except IOError:
+        font = ImageFont.load_default()
+    draw.text((10, 10), wrap_text(draw, error_message, font, 780), fill=(255, 255, 255), font=font)
+
+    buffered = BytesIO()
+    img.save(buffered, format="JPEG")
+    return base64.b64encode(buffered.getvalue()).decode('utf-8')
@@ -0,0 +1,553 @@
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import InvalidArgumentException, WebDriverException, TimeoutException
+# from selenium.webdriver.chrome.service import Service as ChromeService
+# from webdriver_manager.chrome import ChromeDriverManager
+# from urllib3.exceptions import MaxRetryError
+
+from .config import *
+from .crawler_strategy import CrawlerStrategy
+from .deadline import Deadline, DeadlineExceeded
+from .scheduler import domain_of, match_domain
+from .resource_blocking import blocked_url_patterns
+from .wait_strategy import WaitStrategy, wait_strategies
+from .html_store import HtmlStore
+from .screenshot import PAGE_METRICS_JS, capture_params, check_screenshot_options, error_screenshot
+import logging, time
+from typing import List, Callable
+import threading
+import weakref
+import os
+from pathlib import Path
+from .utils import *
+
+logger = logging.getLogger('selenium.webdriver.remote.remote_connection')
+logger.setLevel(logging.WARNING)
+
+logger_driver = logging.getLogger('selenium.webdriver.common.service')
+logger_driver.setLevel(logging.WARNING)
+
+urllib3_logger = logging.getLogger('urllib3.connectionpool')
+urllib3_logger.setLevel(logging.WARNING)
+
+# Disable http.client logging
+http_client_logger = logging.getLogger('http.client')
+http_client_logger.setLevel(logging.WARNING)
+
+# Disable driver_finder and service logging
+driver_finder_logger = logging.getLogger('selenium.webdriver.common.driver_finder')
+driver_finder_logger.setLevel(logging.WARNING)
+
+
+
+
+class DriverPool:
+    """
+    A bounded pool of Chrome drivers with checkout/checkin semantics.
+
+    Drivers are created lazily by `driver_factory` until `size` of them exist, are
+    health-checked on checkout, and are recycled (quit and replaced) once they have
+    served `max_pages` page loads or after the pool is reset.
+    """
+
+    def __init__(self, driver_factory: Callable, size: int = DRIVER_POOL_SIZE, max_pages: int = DRIVER_MAX_PAGES, verbose: bool = False):
+        self.driver_factory = driver_factory
+        self.size = max(size, 1)
+        self.max_pages = max_pages
+        self.verbose = verbose
+        # Most recently checked in last, so that busy drivers stay warm
+        self._idle = []
+        self._lock = threading.Lock()
+        # Notified whenever a driver is checked in or discarded, which is when a waiter
+        # can take an idle driver or create a new one
+        self._available = threading.Condition(self._lock)
+        self._created = 0
+        self._generation = 0
+        self._closed = False
+        # id(driver) -> [pages served, pool generation the driver was created in]
+        self._stats = {}
+
+    def checkout(self, timeout: float = None):
+        """
+        Take a healthy driver from the pool, creating one if the pool is not full yet.
+        Blocks up to `timeout` seconds (forever if None) when every driver is in use.
+        """
+        give_up_at = None if timeout is None else time.monotonic() + timeout
+        while True:
+            driver = self._take_or_create(timeout, give_up_at)
+            if self._is_reusable(driver) and self._is_healthy(driver):
+                return driver
+            self._discard(driver)
+
+    def checkin(self, driver):
+        """
+        Return a driver to the pool, recycling it if it is worn out, stale or broken.
+        """
+        if self._closed or not self._is_reusable(driver):
+            self._discard(driver)
+        else:
+            with self._available:
+                self._idle.append(driver)
+                self._available.notify()
+
+    def mark_used(self, driver):
+        with self._lock:
+            self._stats.setdefault(id(driver), [0, self._generation])[0] += 1
+
+    def prewarm(self, count: int = 1):
+        """
+        Make sure at least `count` drivers (capped at the pool size) are started and idle.
+        """
+        drivers = []
+        try:
+            for _ in range(min(count, self.size)):
+                drivers.append(self.checkout(timeout=0))
+        except TimeoutError:
+            pass
+        finally:
+            for driver in drivers:
+                self.checkin(driver)
+
+    def reset(self):
+        """
+        Retire every existing driver: idle ones are quit now, checked-out ones on checkin.
+        """
+        with self._lock:
+            self._generation += 1
+        self._drain()
+
+    def close(self):
+        with self._available:
+            self._closed = True
+            self._available.notify_all()
+        self._drain()
+
+    def _take_or_create(self, timeout, give_up_at):
+        # An idle driver if there is one, else a new driver if the pool is not full, else
+        # wait for a checkin or a discard and try again
+        with self._available:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Driver pool is closed")
+                if self._idle:
+                    return self._idle.pop()
+                if self._created < self.size:
+                    self._created += 1
+                    break
+                remaining = None if give_up_at is None else give_up_at - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"No browser became available within {timeout} seconds")
+                self._available.wait(remaining)
+        try:
+            driver = self.driver_factory()
+        except Exception:
+            with self._available:
+                self._created -= 1
+                self._available.notify()
+            raise
+        with self._lock:
+            self._stats[id(driver)] = [0, self._generation]
+        if self.verbose:
+            print(f"[LOG] 🚗 Driver pool created a new browser ({self._created}/{self.size})")
+        return driver
+
+    def _is_reusable(self, driver) -> bool:
+        with self._lock:
+            pages, generation = self._stats.get(id(driver), [0, self._generation])
+            return pages < self.max_pages and generation == self._generation
+
+    def _is_healthy(self, driver) -> bool:
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, driver):
+        with self._available:
+            self._stats.pop(id(driver), None)
+            self._created = max(self._created - 1, 0)
+            self._available.notify()
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _drain(self):
+        with self._lock:
+            drivers, self._idle = self._idle, []
+        for driver in drivers:
+            self._discard(driver)
+
+class LocalSeleniumCrawlerStrategy(CrawlerStrategy):
+    supports_request_overrides = True
+
+    def __init__(self, use_cached_html=False, js_code=None, **kwargs):
+        super().__init__()
+        print("[LOG] 🚀 Initializing LocalSeleniumCrawlerStrategy")
+        self.options = Options()
+        self.options.headless = True
+        if kwargs.get("user_agent"):
+            self.options.add_argument("--user-agent=" + kwargs.get("user_agent"))
+        else:
+            user_agent = kwargs.get("user_agent", "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+            self.options.add_argument(f"--user-agent={user_agent}")
+            self.options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+        # The user agent browsers are launched with, and the user agent, extra headers and
+        # viewport applied to every navigation unless a crawl passes its own
+        self._launch_user_agent = kwargs.get("user_agent") or "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+        self.user_agent = self._launch_user_agent
+        self.headers = {}
+        self.viewport = None
+        # Settings currently applied to each pooled driver, so only changes are sent
+        self._overrides_on = weakref.WeakKeyDictionary()
+                  
+        self.options.headless = kwargs.get("headless", True)
+        if self.options.headless:
+            self.options.add_argument("--headless")
+        
+        self.options.add_argument("--disable-gpu")  
+        self.options.add_argument("--window-size=1920,1080")
+        self.options.add_argument("--no-sandbox")
+        self.options.add_argument("--disable-dev-shm-usage")
+        self.options.add_argument("--disable-blink-features=AutomationControlled")     
+        
+        # self.options.add_argument("--disable-dev-shm-usage")
+        self.options.add_argument("--disable-gpu")
+        # self.options.add_argument("--disable-extensions")
+        # self.options.add_argument("--disable-infobars")
+        # self.options.add_argument("--disable-logging")
+        # self.options.add_argument("--disable-popup-blocking")
+        # self.options.add_argument("--disable-translate")
+        # self.options.add_argument("--disable-default-apps")
+        # self.options.add_argument("--disable-background-networking")
+        # self.options.add_argument("--disable-sync")
+        # self.options.add_argument("--disable-features=NetworkService,NetworkServiceInProcess")
+        # self.options.add_argument("--disable-browser-side-navigation")
+        # self.options.add_argument("--dns-prefetch-disable")
+        # self.options.add_argument("--disable-web-security")
+        self.options.add_argument("--log-level=3")
+        self.use_cached_html = use_cached_html
+        # Raw HTML of every crawl, read back instead of crawling when use_cached_html is set
+        self.html_store = kwargs.get("html_store") or HtmlStore()
+        self.js_code = js_code
+        self.verbose = kwargs.get("verbose", False)
+        
+        # Hooks
+        self.hooks = {
+            'on_driver_created': None,
+            'on_user_agent_updated': None,
+            'before_get_url': None,
+            'after_get_url': None,
+            'before_return_html': None
+        }
+
+        # chromedriver_autoinstaller.install()
+        # import chromedriver_autoinstaller
+        # crawl4ai_folder = os.path.join(Path.home(), ".crawl4ai")
+        # driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=self.options)
+        # chromedriver_path = chromedriver_autoinstaller.install()
+        # chromedriver_path = chromedriver_autoinstaller.utils.download_chromedriver()
+        # self.service = Service(chromedriver_autoinstaller.install())
+        
+        
+        # chromedriver_path = ChromeDriverManager().install()
+        # self.service = Service(chromedriver_path)
+        # self.service.log_path = "NUL"
+        # self.driver = webdriver.Chrome(service=self.service, options=self.options)
+        
+        # Use selenium-manager (built into Selenium 4.10.0+)
+        self.service = Service()
+        self.cookies = kwargs.get("cookies")
+        
+        # Each thread checks a driver out of the pool on its first crawl and keeps it
+        # bound until release(), so a crawl and its screenshot see the same page.
+        self._local = threading.local()
+        self.pool = DriverPool(
+            self._create_driver,
+            size=kwargs.get("pool_size", DRIVER_POOL_SIZE),
+            max_pages=kwargs.get("max_pages_per_driver", DRIVER_MAX_PAGES),
+            verbose=self.verbose,
+        )
+        # Browsers start lazily on the first crawl, or ahead of it through warmup()
+        self.prewarm_count = kwargs.get("prewarm_count", DRIVER_PREWARM_COUNT)
+
+        # Subresources not to load (see resource_blocking.py), with per-domain overrides
+        # such as {"nytimes.com": "images,fonts"}; checked up front so typos fail early
+        self.blocked_urls = blocked_url_patterns(kwargs.get("blocked_resources", RESOURCE_BLOCKING))
+        self.domain_blocked_urls = {
+            domain_of(f"http://{domain}"): blocked_url_patterns(spec)
+            for domain, spec in (kwargs.get("domain_blocked_resources") or {}).items()
+        }
+        # Patterns currently applied to each driver, so they are only sent when they change
+        self._blocked_on = weakref.WeakKeyDictionary()
+
+        # How to tell that a loaded page is ready (see wait_strategy.py); `wait_for` can also
+        # be passed per crawl
+        self.wait_for = wait_strategies(kwargs.get("wait_for"))
+
+        # Screenshot defaults (see screenshot.py); mode, format and quality can also be
+        # passed per crawl as screenshot_mode, screenshot_format and screenshot_quality
+        self.screenshot_mode = kwargs.get("screenshot_mode", SCREENSHOT_MODE)
+        self.screenshot_format = kwargs.get("screenshot_format", SCREENSHOT_FORMAT)
+        self.screenshot_quality = kwargs.get("screenshot_quality", SCREENSHOT_QUALITY)
+        self.screenshot_max_height = kwargs.get("screenshot_max_height", SCREENSHOT_MAX_HEIGHT)
+        self.thumbnail_width = kwargs.get("thumbnail_width", SCREENSHOT_THUMBNAIL_WIDTH)
+        check_screenshot_options(self.screenshot_mode, self.screenshot_format)
+
+    @property
+    def driver(self):
+        driver = getattr(self._local, "driver", None)
+        if driver is None:
+            driver = self._local.driver = self.pool.checkout()
+        return driver
+
+    @driver.setter
+    def driver(self, driver):
+        self._local.driver = driver
+
+    def _bind_driver(self, deadline: Deadline):
+        # Waiting for a driver when every one is busy counts against the crawl's deadline
+        if getattr(self._local, "driver", None) is None:
+            try:
+                self._local.driver = self.pool.checkout(timeout=deadline.remaining())
+            except TimeoutError:
+                raise DeadlineExceeded("page load") from None
+
+    def _create_driver(self):
+        driver = webdriver.Chrome(options=self.options)
+        # Bind the new driver while its hook runs, since execute_hook falls back to self.driver
+        previous, self._local.driver = getattr(self._local, "driver", None), driver
+        try:
+            driver = self.execute_hook('on_driver_created', driver)
+            if self.cookies:
+                for cookie in self.cookies:
+                    driver.add_cookie(cookie)
+        finally:
+            self._local.driver = previous
+        return driver
+
+    def warmup(self):
+        t = time.time()
+        try:
+            self.pool.prewarm(self.prewarm_count)
+            if self.verbose:
+                print(f"[LOG] 🚗 Started {self.prewarm_count} browser(s) in {time.time() - t:.2f} seconds")
+        except Exception as e:
+            print(f"[LOG] ⚠️ Could not start a browser during warmup, it will be started on the first crawl: {sanitize_input_encode(str(e))}")
+
+    def release(self):
+        driver = getattr(self._local, "driver", None)
+        if driver is not None:
+            self._local.driver = None
+            self.pool.checkin(driver)
+
+    def set_hook(self, hook_type: str, hook: Callable):
+        if hook_type in self.hooks:
+            self.hooks[hook_type] = hook
+        else:
+            raise ValueError(f"Invalid hook type: {hook_type}")
+    
+    def execute_hook(self, hook_type: str, *args):
+        hook = self.hooks.get(hook_type)
+        if hook:
+            result = hook(*args)
+            if result is not None:
+                if isinstance(result, webdriver.Chrome):
+                    return result
+                else:
+                    raise TypeError(f"Hook {hook_type} must return an instance of webdriver.Chrome or None.")
+        # If the hook returns None or there is no hook, return self.driver
+        return self.driver
+
+    def update_user_agent(self, user_agent: str):
+        # Applied to each pooled driver on its next navigation, without relaunching browsers
+        self.user_agent = user_agent
+        if self.hooks['on_user_agent_updated']:
+            self.driver = self.execute_hook('on_user_agent_updated', self.driver)
+
+    def set_custom_headers(self, headers: dict):
+        # Sent with every request from now on, by whichever pooled driver makes it
+        self.headers = dict(headers)
+
+    def _apply_overrides(self, user_agent: str = None, headers: dict = None, viewport=None):
+        """
+        Set the user agent, extra HTTP headers and viewport of the current driver for the
+        next navigation through the DevTools protocol, so that a crawl with its own values
+        does not relaunch the browser. `viewport` is a (width, height) pair or a dict with
+        "width" and "height". Only what differs from the driver's current settings is sent.
+        """
+        viewport = viewport or self.viewport
+        if isinstance(viewport, dict):
+            viewport = (viewport["width"], viewport["height"])
+        wanted = {
+            "user_agent": user_agent or self.user_agent,
+            "headers": {**self.headers, **(headers or {})},
+            "viewport": tuple(viewport) if viewport else None,
+        }
+        driver = self.driver
+        current = self._overrides_on.get(driver, {"user_agent": self._launch_user_agent, "headers": {}, "viewport": None})
+        if wanted["user_agent"] != current["user_agent"]:
+            driver.execute_cdp_cmd('Network.setUserAgentOverride', {'userAgent': wanted["user_agent"]})
+        if wanted["headers"] != current["headers"]:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setExtraHTTPHeaders', {'headers': wanted["headers"]})
+        if wanted["viewport"] != current["viewport"]:
+            if wanted["viewport"]:
+                width, height = wanted["viewport"]
+                driver.execute_cdp_cmd('Emulation.setDeviceMetricsOverride', {'width': int(width), 'height': int(height), 'deviceScaleFactor': 0, 'mobile': False})
+            else:
+                driver.execute_cdp_cmd('Emulation.clearDeviceMetricsOverride', {})
+        self._overrides_on[driver] = wanted
+
+    def _block_resources(self, url: str):
+        """
+        Apply the blocked URL patterns for the domain of `url` to the current driver
+        through the DevTools protocol, before it navigates.
+        """
+        patterns = match_domain(domain_of(url), self.domain_blocked_urls, self.blocked_urls)
+        driver = self.driver
+        if self._blocked_on.get(driver, ()) == patterns:
+            return
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(patterns)})
+        self._blocked_on[driver] = patterns
+
+    def _wait_for_page(self, wait_for: List[WaitStrategy], deadline: Deadline, stage: str = "page load"):
+        for strategy in wait_for:
+            strategy.wait(self.driver, deadline, stage)
+    
+    def crawl(self, url: str, **kwargs) -> str:
+        if self.use_cached_html:
+            html = self.html_store.get(url)
+            if html is not None:
+                return sanitize_input_encode(html)
+
+        deadline = kwargs.get('deadline') or Deadline()
+        try:
+            self._bind_driver(deadline)
+            self.driver = self.execute_hook('before_get_url', self.driver)
+            if self.verbose:
+                print(f"[LOG] 🕸️ Crawling {url} using LocalSeleniumCrawlerStrategy...")
+            self._block_resources(url)
+            self._apply_overrides(kwargs.get("user_agent"), kwargs.get("headers"), kwargs.get("viewport"))
+            # Out of time already: the driver still shows its previous page, which must not
+            # be returned as a partial result of this one
+            deadline.check("page load")
+            # Set on every crawl, since pooled drivers keep the value of the previous one
+            self.driver.set_page_load_timeout(deadline.cap(SELENIUM_PAGE_LOAD_TIMEOUT))
+            try:
+                self.driver.get(url) #<html><head></head><body></body></html>
+            except TimeoutException:
+                if not deadline.expired():
+                    raise
+                # Out of time: keep whatever has loaded so far
+                deadline.skip("page load")
+                self.driver.execute_script("window.stop();")
+            self.pool.mark_used(self.driver)
+            
+            t_wait = time.time()
+            wait_for = wait_strategies(kwargs["wait_for"]) if kwargs.get("wait_for") else self.wait_for
+            # Scroll first, so that content loaded lazily on scroll is waited for as well
+            self.driver.execute_script("window.scrollTo(0, document.body ? document.body.scrollHeight : 0);")
+            self.driver = self.execute_hook('after_get_url', self.driver)
+            self._wait_for_page(wait_for, deadline)
+            if kwargs.get('timings') is not None:
+                kwargs['timings']['wait_for_load'] = time.time() - t_wait
+            can_not_be_done_headless = False # Look at my creativity for naming variables
+            # Checked in the page rather than on page_source, which is only transferred once, at the end
+            blank = self.driver.execute_script(
+                "return !document.head || !document.body || (!document.head.childElementCount && !document.body.childNodes.length);"
+            )
+            
+            # TODO: Very ugly approach, but promise to change it!
+            if (kwargs.get('bypass_headless', False) or blank) and not deadline.expired():
+                print("[LOG] 🙌 Page could not be loaded in headless mode. Trying non-headless mode...")
+                can_not_be_done_headless = True
+                options = Options()
+                options.headless = False
+                # set window size very small
+                options.add_argument("--window-size=5,5")
+                driver = webdriver.Chrome(service=self.service, options=options)
+                driver.get(url)
+                # Keep the pooled driver bound; the temporary one is quit right away
+                pooled_driver, self.driver = self.driver, driver
+                driver = self.execute_hook('after_get_url', driver)
+                html = sanitize_input_encode(driver.page_source)
+                driver.quit()
+                self.driver = pooled_driver
+            
+            # Execute JS code if provided
+            js_snippets = [self.js_code] if type(self.js_code) == str else (self.js_code or [])
+            for js in js_snippets:
+                if deadline.expired():
+                    deadline.skip("js_code")
+                    break
+                self.driver.execute_script(js)
+                # Wait for the page to settle again after the changes made by the JS code
+                self._wait_for_page(wait_for, deadline, "js_code")
+            
+            if not can_not_be_done_headless:
+                html = sanitize_input_encode(self.driver.page_source)
+            self.driver = self.execute_hook('before_return_html', self.driver, html)
+            
+            # Store in cache, unless the page was cut short by the deadline
+            if not deadline.skipped:
+                self.html_store.put(url, html)
+                
+            if self.verbose:
+                print(f"[LOG] ✅ Crawled {url} successfully!")
+            
+            return html
+        except DeadlineExceeded:
+            raise
+        except InvalidArgumentException as e:
+            if not hasattr(e, 'msg'):
+                e.msg = sanitize_input_encode(str(e))
+            error = InvalidArgumentException(f"Failed to crawl {url}: {e.msg}")
+            # A malformed URL fails the same way every time
+            error.retryable = False
+            raise error
+        except WebDriverException as e:
+            # If e does nlt have msg attribute create it and set it to str(e)
+            if not hasattr(e, 'msg'):
+                e.msg = sanitize_input_encode(str(e))
+            raise WebDriverException(f"Failed to crawl {url}: {e.msg}")  
+        except Exception as e:
+            if not hasattr(e, 'msg'):
+                e.msg = sanitize_input_encode(str(e))
+            raise Exception(f"Failed to crawl {url}: {e.msg}")
+
+    def take_screenshot(self, mode: str = None, format: str = None, quality: int = None) -> str:
+        mode, format = mode or self.screenshot_mode, format or self.screenshot_format
+        # A wrong option is the caller's mistake, not a failed capture
+        check_screenshot_options(mode, format)
+        try:
+            # Captured through the DevTools protocol: the browser crops, scales and encodes
+            # the image, so the window is not resized to the page and nothing is re-encoded here
+            params = capture_params(
+                mode,
+                format,
+                quality if quality is not None else self.screenshot_quality,
+                self.driver.execute_script(PAGE_METRICS_JS),
+                self.screenshot_max_height,
+                self.thumbnail_width,
+            )
+            img_base64 = self.driver.execute_cdp_cmd("Page.captureScreenshot", params)["data"]
+
+            if self.verbose:
+                print(f"[LOG] 📸 {mode.capitalize()} screenshot taken as {format}")
+
+            return img_base64
+        except Exception as e:
+            error_message = sanitize_input_encode(f"Failed to take screenshot: {str(e)}")
+            print(error_message)
+            return error_screenshot(error_message)
+
+    def quit(self):
+        self.release()
+        self.pool.close()
@@ -3,7 +3,9 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from bs4 import BeautifulSoup, Comment, element, Tag, NavigableString
 import html2text
 import json
+import hashlib
 import html
+from html import unescape as unescape_html
 import re
 import os
 from html2text import HTML2Text
@@ -436,6 +438,7 @@ def get_content_of_website_optimized(url: str, html: str, word_count_threshold:
     if not html:
         return None
 
+    t_parse = time.time()
     soup = BeautifulSoup(html, 'html.parser')
     body = soup.body
     
@@ -449,6 +452,14 @@ def get_content_of_website_optimized(url: str, html: str, word_count_threshold:
         for el in selected_elements:
             body.append(el)
 
+    # `fields` (a set of CrawlResult field names, None for all) lets callers skip the work
+    # behind outputs they do not need: image scoring, link collection, metadata, markdown
+    fields = kwargs.get('fields')
+    want_links = fields is None or 'links' in fields
+    want_media = fields is None or 'media' in fields
+    want_metadata = fields is None or 'metadata' in fields
+    want_markdown = fields is None or 'markdown' in fields
+
     links = {'internal': [], 'external': []}
     media = {'images': [], 'videos': [], 'audios': []}
 
@@ -563,24 +574,26 @@ def get_content_of_website_optimized(url: str, html: str, word_count_threshold:
             keep_element = False
 
             if element.name == 'a' and element.get('href'):
-                href = element['href']
-                url_base = url.split('/')[2]
-                link_data = {'href': href, 'text': element.get_text()}
-                if href.startswith('http') and url_base not in href:
-                    links['external'].append(link_data)
-                else:
-                    links['internal'].append(link_data)
+                if want_links:
+                    href = element['href']
+                    url_base = url.split('/')[2]
+                    link_data = {'href': href, 'text': element.get_text()}
+                    if href.startswith('http') and url_base not in href:
+                        links['external'].append(link_data)
+                    else:
+                        links['internal'].append(link_data)
                 keep_element = True
 
             elif element.name == 'img':
                 return True  # Always keep image elements
 
             elif element.name in ['video', 'audio']:
-                media[f"{element.name}s"].append({
-                    'src': element.get('src'),
-                    'alt': element.get('alt'),
-                    'type': element.name
-                })
+                if want_media:
+                    media[f"{element.name}s"].append({
+                        'src': element.get('src'),
+                        'alt': element.get('alt'),
+                        'type': element.name
+                    })
                 return True  # Always keep video and audio elements
 
             if element.name != 'pre':
@@ -616,12 +629,13 @@ def get_content_of_website_optimized(url: str, html: str, word_count_threshold:
             return False
 
     #process images by filtering and extracting contextual text from the page
-    imgs = body.find_all('img')
-    media['images'] = [
-        result for result in
-        (process_image(img, url, i, len(imgs)) for i, img in enumerate(imgs))
-        if result is not None
-    ]
+    if want_media:
+        imgs = body.find_all('img')
+        media['images'] = [
+            result for result in
+            (process_image(img, url, i, len(imgs)) for i, img in enumerate(imgs))
+            if result is not None
+        ]
 
     process_element(body)
 
@@ -638,23 +652,34 @@ def get_content_of_website_optimized(url: str, html: str, word_count_threshold:
     cleaned_html = str(body).replace('\n\n', '\n').replace('  ', ' ')
     cleaned_html = sanitize_html(cleaned_html)
 
-    h = CustomHTML2Text()
-    h.ignore_links = True
-    markdown = h.handle(cleaned_html)
-    markdown = markdown.replace('    ```', '```')
+    meta = None
+    if want_metadata:
+        try:
+            meta = extract_metadata(html, soup)
+        except Exception as e:
+            print('Error extracting metadata:', str(e))
+            meta = {}
+
+    t_markdown = time.time()
+    markdown = None
+    if want_markdown:
+        h = CustomHTML2Text()
+        h.ignore_links = True
+        markdown = h.handle(cleaned_html)
+        markdown = markdown.replace('    ```', '```')
 
-    try:
-        meta = extract_metadata(html, soup)
-    except Exception as e:
-        print('Error extracting metadata:', str(e))
-        meta = {}
+    # Callers may pass a dict to collect how long parsing/cleaning and markdown conversion took
+    timings = kwargs.get('timings')
+    if timings is not None:
+        timings['parse'] = t_markdown - t_parse
+        timings['markdown'] = time.time() - t_markdown
 
     return {
         'markdown': markdown,
         'cleaned_html': cleaned_html,
         'success': True,
-        'media': media,
-        'links': links,
+        'media': media if want_media else None,
+        'links': links if want_links else None,
         'metadata': meta
     }
 
@@ -898,3 +923,59 @@ def format_html(html_string):
     return soup.prettify()
 
 
+
+
+_NON_VISIBLE_BLOCKS = re.compile(r'<(script|style|noscript|template|head)\b[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_NOSCRIPT_BLOCKS = re.compile(r'<noscript\b[^>]*>(.*?)</noscript\s*>', re.IGNORECASE | re.DOTALL)
+_TAGS = re.compile(r'<[^>]+>')
+_JS_REQUIRED_HINTS = ('enable javascript', 'javascript is disabled', 'javascript is required', 'requires javascript', 'turn on javascript')
+
+def needs_javascript(html: str, min_text_length: int = JS_DETECTION_MIN_TEXT_LENGTH) -> bool:
+    """
+    Cheap heuristic telling whether a page fetched without a browser has to be rendered
+    with JavaScript to be useful: the body has (almost) no visible text outside of
+    script/noscript blocks, or the only real message is a "please enable JavaScript" one.
+    """
+    if not html or not html.strip():
+        return True
+
+    visible_text = _TAGS.sub(' ', _NON_VISIBLE_BLOCKS.sub(' ', html))
+    visible_text = ' '.join(unescape_html(visible_text).split())
+    if len(visible_text) < min_text_length:
+        return True
+
+    noscript_text = ' '.join(_TAGS.sub(' ', ' '.join(_NOSCRIPT_BLOCKS.findall(html))).split()).lower()
+    if any(hint in noscript_text for hint in _JS_REQUIRED_HINTS) and len(visible_text) < 4 * min_text_length:
+        return True
+
+    return False
+
+def hash_content(text: str) -> str:
+    """
+    Fingerprint of `text` used to tell whether a page changed between two crawls.
+    """
+    return hashlib.blake2b((text or "").encode("utf-8"), digest_size=16).hexdigest()
+
+def config_fingerprint(obj, exclude=()) -> str:
+    """
+    Fingerprint of the class of `obj` and of its plain (JSON-like) public attributes,
+    i.e. of the options it was configured with. Models, tokenizers and other live
+    objects are left out, as are the attribute names in `exclude`.
+    """
+    plain = (str, int, float, bool, type(None), list, tuple, dict)
+    params = {
+        key: value for key, value in sorted(vars(obj).items())
+        if not key.startswith("_") and key not in exclude and isinstance(value, plain)
+    }
+    return hash_content(json.dumps([type(obj).__name__, params], sort_keys=True, default=str))
+
+def has_error_blocks(extracted_content: str) -> bool:
+    """
+    Whether extracted content (the JSON list an extraction strategy produced) holds
+    blocks flagged with `"error": true`, such as LLM calls that failed.
+    """
+    try:
+        blocks = json.loads(extracted_content)
+    except (TypeError, ValueError):
+        return False
+    return isinstance(blocks, list) and any(isinstance(block, dict) and block.get("error") is True for block in blocks)
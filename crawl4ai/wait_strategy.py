@@ -0,0 +1,223 @@
+from abc import ABC, abstractmethod
+from typing import List, Union
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from .config import *
+from .deadline import Deadline
+
+# Resolves once the DOM went `quietMs` without a mutation, or after `timeoutMs`, with
+# whether it did settle. Runs inside the page, so nothing crosses the WebDriver wire but
+# the answer. Only added or removed nodes and text changes count: carousels, tickers and
+# animations keep flipping classes and styles, and would hold every crawl for the whole
+# timeout, while content that is still loading shows up as new nodes.
+DOM_QUIET_JS = """
+const [quietMs, timeoutMs, done] = [arguments[0], arguments[1], arguments[arguments.length - 1]];
+const start = Date.now();
+let last = start;
+const observer = new MutationObserver(() => { last = Date.now(); });
+observer.observe(document.documentElement || document, {childList: true, subtree: true, characterData: true});
+(function check() {
+    const now = Date.now();
+    if (now - last >= quietMs || now - start >= timeoutMs) {
+        observer.disconnect();
+        done(now - last >= quietMs);
+    } else {
+        setTimeout(check, Math.min(50, quietMs));
+    }
+})();
+"""
+
+# Same, for the network: the page is idle once the load event fired and no request
+# completed for `idleMs`, according to the Resource Timing entries of the page.
+NETWORK_IDLE_JS = """
+const [idleMs, timeoutMs, done] = [arguments[0], arguments[1], arguments[arguments.length - 1]];
+performance.setResourceTimingBufferSize(100000);
+const start = Date.now();
+let last = start;
+let count = performance.getEntriesByType('resource').length;
+(function check() {
+    const now = Date.now();
+    const current = performance.getEntriesByType('resource').length;
+    if (current !== count) {
+        count = current;
+        last = now;
+    }
+    const idle = document.readyState === 'complete' && now - last >= idleMs;
+    if (idle || now - start >= timeoutMs) {
+        done(idle);
+    } else {
+        setTimeout(check, 50);
+    }
+})();
+"""
+
+
+# Runs one of the scripts above, written for Selenium's execute_async_script, as a
+# Playwright page.evaluate promise: the inner function gets the same `arguments`
+def _as_promise(script: str) -> str:
+    return "([value, timeoutMs]) => new Promise(done => (function () {\n" + script + "\n})(value, timeoutMs, done))"
+
+
+class WaitStrategy(ABC):
+    """
+    Decides when a page loaded in the browser is ready to be read. `wait` blocks for at
+    most `timeout` seconds, capped by the crawl's deadline; when the deadline runs out
+    first, the stage is recorded as skipped and the crawl goes on with what it has.
+    `await_page` does the same for a Playwright page.
+    """
+
+    def __init__(self, timeout: float = WAIT_TIMEOUT):
+        self.timeout = timeout
+
+    @abstractmethod
+    def wait(self, driver, deadline: Deadline, stage: str = "page load") -> bool:
+        """
+        Wait until the page is ready. Returns whether it became ready in time.
+        """
+        pass
+
+    @abstractmethod
+    async def await_page(self, page, deadline: Deadline, stage: str = "page load") -> bool:
+        """
+        Same as `wait`, for a Playwright page (see PlaywrightCrawlerStrategy).
+        """
+        pass
+
+    def _until(self, driver, condition, deadline: Deadline, stage: str) -> bool:
+        # WebDriverWait capped by the deadline; a timeout that is not the deadline's fault raises
+        if deadline.expired():
+            deadline.skip(stage)
+            return False
+        try:
+            WebDriverWait(driver, deadline.cap(self.timeout), poll_frequency=0.1).until(condition)
+            return True
+        except TimeoutException:
+            if not deadline.expired():
+                raise
+            deadline.skip(stage)
+            return False
+
+    def _in_page(self, driver, script: str, quiet_ms: int, deadline: Deadline, stage: str) -> bool:
+        # Pages that never settle are read as they are once the timeout is over
+        if deadline.expired():
+            deadline.skip(stage)
+            return False
+        timeout = deadline.cap(self.timeout)
+        driver.set_script_timeout(timeout + 5)
+        settled = bool(driver.execute_async_script(script, quiet_ms, int(timeout * 1000)))
+        if not settled and deadline.expired():
+            deadline.skip(stage)
+        return settled
+
+    async def _auntil(self, wait, deadline: Deadline, stage: str) -> bool:
+        # `wait` is a Playwright wait_for_* call taking its timeout in milliseconds
+        from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+        if deadline.expired():
+            deadline.skip(stage)
+            return False
+        try:
+            await wait(deadline.cap(self.timeout) * 1000)
+            return True
+        except PlaywrightTimeoutError:
+            if not deadline.expired():
+                raise
+            deadline.skip(stage)
+            return False
+
+    async def _ain_page(self, page, script: str, quiet_ms: int, deadline: Deadline, stage: str) -> bool:
+        if deadline.expired():
+            deadline.skip(stage)
+            return False
+        timeout = deadline.cap(self.timeout)
+        settled = bool(await page.evaluate(_as_promise(script), [quiet_ms, int(timeout * 1000)]))
+        if not settled and deadline.expired():
+            deadline.skip(stage)
+        return settled
+
+
+class DomStabilityWait(WaitStrategy):
+    """
+    Ready once the DOM went `quiet_ms` milliseconds without a mutation, as seen by a
+    MutationObserver inside the page.
+    """
+
+    def __init__(self, quiet_ms: int = WAIT_DOM_QUIET_MS, timeout: float = WAIT_TIMEOUT):
+        super().__init__(timeout)
+        self.quiet_ms = quiet_ms
+
+    def wait(self, driver, deadline: Deadline, stage: str = "page load") -> bool:
+        return self._in_page(driver, DOM_QUIET_JS, self.quiet_ms, deadline, stage)
+
+    async def await_page(self, page, deadline: Deadline, stage: str = "page load") -> bool:
+        return await self._ain_page(page, DOM_QUIET_JS, self.quiet_ms, deadline, stage)
+
+
+class NetworkIdleWait(WaitStrategy):
+    """
+    Ready once the load event fired and no request completed for `idle_ms` milliseconds.
+    """
+
+    def __init__(self, idle_ms: int = 500, timeout: float = WAIT_TIMEOUT):
+        super().__init__(timeout)
+        self.idle_ms = idle_ms
+
+    def wait(self, driver, deadline: Deadline, stage: str = "page load") -> bool:
+        return self._in_page(driver, NETWORK_IDLE_JS, self.idle_ms, deadline, stage)
+
+    async def await_page(self, page, deadline: Deadline, stage: str = "page load") -> bool:
+        return await self._ain_page(page, NETWORK_IDLE_JS, self.idle_ms, deadline, stage)
+
+
+class SelectorWait(WaitStrategy):
+    """
+    Ready once an element matching the CSS `selector` is in the page (or visible, with
+    `visible=True`). Raises TimeoutException if it never appears.
+    """
+
+    def __init__(self, selector: str, visible: bool = False, timeout: float = WAIT_TIMEOUT):
+        super().__init__(timeout)
+        self.selector = selector
+        self.visible = visible
+
+    def wait(self, driver, deadline: Deadline, stage: str = "page load") -> bool:
+        locate = EC.visibility_of_element_located if self.visible else EC.presence_of_element_located
+        return self._until(driver, locate((By.CSS_SELECTOR, self.selector)), deadline, stage)
+
+    async def await_page(self, page, deadline: Deadline, stage: str = "page load") -> bool:
+        state = "visible" if self.visible else "attached"
+        return await self._auntil(lambda timeout: page.wait_for_selector(self.selector, state=state, timeout=timeout), deadline, stage)
+
+
+class JsPredicateWait(WaitStrategy):
+    """
+    Ready once the JavaScript expression `predicate` is truthy in the page, e.g.
+    "window.articleLoaded === true". Raises TimeoutException if it never is.
+    """
+
+    def __init__(self, predicate: str, timeout: float = WAIT_TIMEOUT):
+        super().__init__(timeout)
+        self.predicate = predicate
+
+    def wait(self, driver, deadline: Deadline, stage: str = "page load") -> bool:
+        script = f"return !!({self.predicate});"
+        return self._until(driver, lambda d: d.execute_script(script), deadline, stage)
+
+    async def await_page(self, page, deadline: Deadline, stage: str = "page load") -> bool:
+        script = f"() => !!({self.predicate})"
+        return await self._auntil(lambda timeout: page.wait_for_function(script, timeout=timeout, polling=100), deadline, stage)
+
+
+def wait_strategies(wait_for: Union[WaitStrategy, List[WaitStrategy], None]) -> List[WaitStrategy]:
+    """
+    The wait strategies to run one after the other for `wait_for`: a strategy, a list of
+    them, or None for the default DOM stability wait.
+    """
+    if wait_for is None:
+        return [DomStabilityWait()]
+    strategies = [wait_for] if isinstance(wait_for, WaitStrategy) else list(wait_for)
+    for strategy in strategies:
+        if not isinstance(strategy, WaitStrategy):
+            raise ValueError(f"Unsupported wait strategy: {strategy!r}")
+    return strategies
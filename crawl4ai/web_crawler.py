@@ -1,36 +1,72 @@
+from __future__ import annotations
 import os, time
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
+import json
+import asyncio
+from functools import partial
 from pathlib import Path
 
-from .models import UrlModel, CrawlResult
-from .database import init_db, get_cached_url, cache_url, DB_PATH, flush_db
-from .utils import *
-from .chunking_strategy import *
-from .extraction_strategy import *
-from .crawler_strategy import *
-from typing import List
-from concurrent.futures import ThreadPoolExecutor
+# Only lightweight modules are imported here. Parsing (bs4, html2text), extraction
+# (numpy, models) and browser (selenium, PIL) dependencies are imported on first use.
+from .models import UrlModel, CrawlResult, CrawlTimings, OUTPUT_FIELDS
+from .database import init_db, get_cached_url, cache_url, touch_cached_url, aget_cached_url, acache_url, get_processed, cache_processed, get_extraction, cache_extraction, DB_PATH, flush_db
+from .chunking_strategy import ChunkingStrategy, RegexChunking
+from .crawler_strategy import CrawlerStrategy
+from .scheduler import DomainScheduler, domain_of, match_domain
+from .retry import RetryPolicy, CircuitBreaker
+from .deadline import Deadline, DeadlineExceeded
+from typing import List, Iterable, Iterator, AsyncIterator, Optional, TYPE_CHECKING
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from .config import *
+import threading
 import warnings
+if TYPE_CHECKING:
+    from .extraction_strategy import ExtractionStrategy
+    from .job_queue import JobQueue
 warnings.filterwarnings("ignore", message='Field "model_name" has conflict with protected namespace "model_".')
 
+# Small but representative page used by warmup() to load the parsing and markdown stack
+WARMUP_HTML = """<html><head><title>Crawl4AI</title><meta name="description" content="warmup"></head>
+<body><article><h1>Warmup</h1><p>This page exercises the <b>HTML</b> cleaning and <a href="https://localhost/">markdown</a> conversion.</p>
+<img src="https://localhost/image.jpg" alt="image" width="300" height="200"></article></body></html>"""
+
 
 class WebCrawler:
+    # Columns (in `get_processed` rows) of the output fields that a crawl with `fields=`
+    # may leave uncomputed (NULL)
+    STORED_FIELDS = {"markdown": 2, "media": 3, "links": 4, "metadata": 5}
+
     def __init__(
         self,
         # db_path: str = None,
         crawler_strategy: CrawlerStrategy = None,
         always_by_pass_cache: bool = False,
         verbose: bool = False,
+        scheduler: DomainScheduler = None,
+        cache_ttl: float = CACHE_TTL,
+        domain_cache_ttl: dict = None,
+        retry_policy: RetryPolicy = None,
+        circuit_breaker: CircuitBreaker = None,
     ):
         # self.db_path = db_path
-        self.crawler_strategy = crawler_strategy or LocalSeleniumCrawlerStrategy(verbose=verbose)
+        if crawler_strategy is None:
+            from .selenium_crawler_strategy import LocalSeleniumCrawlerStrategy
+            crawler_strategy = LocalSeleniumCrawlerStrategy(verbose=verbose)
+        self.crawler_strategy = crawler_strategy
         self.always_by_pass_cache = always_by_pass_cache
+        # Per-domain concurrency and rate limits applied to every page load
+        self.scheduler = scheduler or DomainScheduler()
+        # Seconds before a cached page is revalidated (0 = never), overridable per domain
+        self.cache_ttl = cache_ttl
+        self.domain_cache_ttl = {domain_of(f"http://{domain}"): ttl for domain, ttl in {**DOMAIN_CACHE_TTL, **(domain_cache_ttl or {})}.items()}
+        # Page loads that raise are retried with backoff; domains that keep failing are skipped for a while
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
 
         # Create the .crawl4ai folder in the user's home directory if it doesn't exist
         self.crawl4ai_folder = os.path.join(Path.home(), ".crawl4ai")
         os.makedirs(self.crawl4ai_folder, exist_ok=True)
-        os.makedirs(f"{self.crawl4ai_folder}/cache", exist_ok=True)
 
         # If db_path is not provided, use the default path
         # if not db_path:
@@ -41,18 +77,23 @@ class WebCrawler:
         
         self.ready = False
         
-    def warmup(self):
+    def warmup(self, background: bool = True):
+        """
+        Get the crawler ready without touching the network: the HTML parsing stack is
+        exercised on a built-in page, and the crawler strategy starts its browsers
+        (in a background thread unless `background` is False).
+        """
+        from .pipeline import process_content
+        from .extraction_strategy import NoExtractionStrategy
         print("[LOG] 🌤️  Warming up the WebCrawler")
-        result = self.run(
-            url='https://google.com/',
-            word_count_threshold=5,
-            extraction_strategy= NoExtractionStrategy(),
-            bypass_cache=False,
-            verbose = False,
-            # warmup=True
-        )
+        t = time.time()
+        process_content("https://localhost/", WARMUP_HTML, None, 1, NoExtractionStrategy(), RegexChunking(), None, False)
+        if background:
+            threading.Thread(target=self.crawler_strategy.warmup, daemon=True).start()
+        else:
+            self.crawler_strategy.warmup()
         self.ready = True
-        print("[LOG] 🌞 WebCrawler is ready to crawl")
+        print(f"[LOG] 🌞 WebCrawler is ready to crawl ({time.time() - t:.2f} seconds)")
         
     def fetch_page(
         self,
@@ -69,9 +110,9 @@ class WebCrawler:
         **kwargs,
     ) -> CrawlResult:
         return self.run(
-            url_model.url,
+            str(url_model.url),
             word_count_threshold,
-            extraction_strategy or NoExtractionStrategy(),
+            extraction_strategy,
             chunking_strategy,
             bypass_cache=url_model.forced,
             css_selector=css_selector,
@@ -94,30 +135,144 @@ class WebCrawler:
         chunking_strategy: ChunkingStrategy = RegexChunking(),
         **kwargs,
     ) -> List[CrawlResult]:
-        extraction_strategy = extraction_strategy or NoExtractionStrategy()
-        def fetch_page_wrapper(url_model, *args, **kwargs):
-            return self.fetch_page(url_model, *args, **kwargs)
-
+        fetch_page = self._fetch_page_partial(
+            provider, api_token, extract_blocks_flag, word_count_threshold, use_cached_html,
+            css_selector, screenshot, extraction_strategy, chunking_strategy, **kwargs
+        )
+        url_models = list(url_models)
         with ThreadPoolExecutor() as executor:
-            results = list(
-                executor.map(
-                    fetch_page_wrapper,
-                    url_models,
-                    [provider] * len(url_models),
-                    [api_token] * len(url_models),
-                    [extract_blocks_flag] * len(url_models),
-                    [word_count_threshold] * len(url_models),
-                    [css_selector] * len(url_models),
-                    [screenshot] * len(url_models),
-                    [use_cached_html] * len(url_models),
-                    [extraction_strategy] * len(url_models),
-                    [chunking_strategy] * len(url_models),
-                    *[kwargs] * len(url_models),
-                )
-            )
+            # Submit round-robin across domains, but return results in the given order
+            futures = {}
+            for index in self.scheduler.interleave(range(len(url_models)), key=lambda i: str(url_models[i].url)):
+                futures[index] = executor.submit(fetch_page, url_models[index])
+            results = [futures[index].result() for index in range(len(url_models))]
 
         return results
 
+    def fetch_pages_stream(
+        self,
+        url_models: Iterable[UrlModel],
+        provider: str = DEFAULT_PROVIDER,
+        api_token: str = None,
+        extract_blocks_flag: bool = True,
+        word_count_threshold=MIN_WORD_THRESHOLD,
+        use_cached_html: bool = False,
+        css_selector: str = None,
+        screenshot: bool = False,
+        extraction_strategy: ExtractionStrategy = None,
+        chunking_strategy: ChunkingStrategy = RegexChunking(),
+        concurrency: int = 10,
+        **kwargs,
+    ) -> Iterator[CrawlResult]:
+        """
+        Like `fetch_pages`, but yields each CrawlResult as soon as it completes (in
+        completion order). At most `concurrency` pages are in flight at any time, and
+        `url_models` is consumed lazily, so memory stays flat however large the batch.
+        URLs are interleaved across domains within a look-ahead of 4 * `concurrency`.
+        """
+        fetch_page = self._fetch_page_partial(
+            provider, api_token, extract_blocks_flag, word_count_threshold, use_cached_html,
+            css_selector, screenshot, extraction_strategy, chunking_strategy, **kwargs
+        )
+        concurrency = max(concurrency, 1)
+        url_models = self.scheduler.interleave(url_models, key=lambda url_model: str(url_model.url), window=4 * concurrency)
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            in_flight = set()
+            for url_model in islice(url_models, concurrency):
+                in_flight.add(executor.submit(fetch_page, url_model))
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for url_model in islice(url_models, len(done)):
+                    in_flight.add(executor.submit(fetch_page, url_model))
+                for future in done:
+                    yield future.result()
+
+    def run_pipeline(
+        self,
+        urls: Iterable[str],
+        fetch_concurrency: int = DRIVER_POOL_SIZE,
+        process_concurrency: int = None,
+        **kwargs,
+    ) -> Iterator[CrawlResult]:
+        """
+        Crawl `urls` with a two-stage pipeline: `fetch_concurrency` threads load pages
+        and hand raw HTML to `process_concurrency` worker processes (one per core by
+        default) that do the parsing, markdown conversion, chunking and extraction.
+        Yields results in completion order; accepts the same keyword arguments as `run`.
+        """
+        from .pipeline import CrawlPipeline
+        pipeline = CrawlPipeline(self, fetch_concurrency=fetch_concurrency, process_concurrency=process_concurrency)
+        return pipeline.run(urls, **kwargs)
+
+    def run_job(
+        self,
+        job_id: int,
+        queue: JobQueue = None,
+        worker_id: str = None,
+        batch_size: int = JOB_BATCH_SIZE,
+        **kwargs,
+    ) -> dict:
+        """
+        Work on a crawl job of `queue` (a JobQueue on the cache database by default) until
+        no task is left to claim, and return the job's status counts. Tasks are claimed
+        `batch_size` at a time and crawled concurrently with `run`, using the job's stored
+        params overridden by `kwargs`. The leases of tasks still being crawled are renewed
+        every third of the queue's lease. Any number of processes can run the same job,
+        and a job interrupted midway is resumed by calling this again.
+        """
+        from .job_queue import JobQueue, default_worker_id
+        queue = queue or JobQueue()
+        worker_id = worker_id or default_worker_id()
+        job = queue.get_job(job_id)
+        if job is None:
+            raise ValueError(f"Unknown crawl job: {job_id}")
+        params = {**job["params"], **kwargs}
+        if not self.ready:
+            self.warmup()
+
+        with ThreadPoolExecutor(max_workers=max(batch_size, 1)) as executor:
+            while True:
+                tasks = queue.claim(job_id, worker_id, batch_size)
+                if not tasks:
+                    break
+                futures = {
+                    executor.submit(self.run, url, **params): task_id
+                    for task_id, url in self.scheduler.interleave(tasks, key=lambda task: task[1])
+                }
+                running = set(futures)
+                while running:
+                    done, running = wait(running, timeout=queue.lease_seconds / 3)
+                    for future in done:
+                        result = future.result()
+                        if result is not None and result.success:
+                            queue.complete(futures[future], worker_id)
+                        else:
+                            queue.fail(futures[future], result.error_message if result is not None else "Crawl returned no result", worker_id)
+                    # Slow crawls (retries included) must not lose their tasks to other workers
+                    if running:
+                        queue.renew([futures[future] for future in running], worker_id)
+
+        return queue.status(job_id)
+
+    def _fetch_page_partial(
+        self,
+        provider, api_token, extract_blocks_flag, word_count_threshold, use_cached_html,
+        css_selector, screenshot, extraction_strategy, chunking_strategy, **kwargs
+    ):
+        return partial(
+            self.fetch_page,
+            provider=provider,
+            api_token=api_token,
+            extract_blocks_flag=extract_blocks_flag,
+            word_count_threshold=word_count_threshold,
+            css_selector=css_selector,
+            screenshot=screenshot,
+            use_cached_html=use_cached_html,
+            extraction_strategy=extraction_strategy,
+            chunking_strategy=chunking_strategy,
+            **kwargs,
+        )
+
     def run(
             self,
             url: str,
@@ -129,59 +284,414 @@ class WebCrawler:
             screenshot: bool = False,
             user_agent: str = None,
             verbose=True,
+            timeout: float = None,
+            fields: List[str] = None,
             **kwargs,
         ) -> CrawlResult:
             try:
-                extraction_strategy = extraction_strategy or NoExtractionStrategy()
-                extraction_strategy.verbose = verbose
-                if not isinstance(extraction_strategy, ExtractionStrategy):
-                    raise ValueError("Unsupported extraction strategy")
-                if not isinstance(chunking_strategy, ChunkingStrategy):
-                    raise ValueError("Unsupported chunking strategy")
-                
-                # if word_count_threshold < MIN_WORD_THRESHOLD:
-                #     word_count_threshold = MIN_WORD_THRESHOLD
-                    
+                extraction_strategy = self._prepare_strategies(extraction_strategy, chunking_strategy, verbose)
                 word_count_threshold = max(word_count_threshold, 0)
 
-                # Check cache first
-                cached = None
-                screenshot_data = None
-                extracted_content = None
-                if not bypass_cache and not self.always_by_pass_cache:
-                    cached = get_cached_url(url)
-                
                 if kwargs.get("warmup", True) and not self.ready:
                     return None
-                
-                if cached:
-                    html = sanitize_input_encode(cached[1])
-                    extracted_content = sanitize_input_encode(cached[4])
-                    if screenshot:
-                        screenshot_data = cached[9]
-                        if not screenshot_data:
-                            cached = None
-                
-                if not cached or not html:
-                    if user_agent:
-                        self.crawler_strategy.update_user_agent(user_agent)
-                    t1 = time.time()
-                    html = sanitize_input_encode(self.crawler_strategy.crawl(url, **kwargs))
-                    t2 = time.time()
-                    if verbose:
-                        print(f"[LOG] 🚀 Crawling done for {url}, success: {bool(html)}, time taken: {t2 - t1} seconds")
-                    if screenshot:
-                        screenshot_data = self.crawler_strategy.take_screenshot()
-
-                
-                crawl_result = self.process_html(url, html, extracted_content, word_count_threshold, extraction_strategy, chunking_strategy, css_selector, screenshot_data, verbose, bool(cached), **kwargs)
-                crawl_result.success = bool(html)
+
+                # Only the requested outputs are computed (all of them without `fields`)
+                kwargs["fields"] = fields = self._output_fields(fields)
+                if fields is not None:
+                    screenshot = "screenshot" in fields
+                processing_key = self._processing_key(word_count_threshold, css_selector, **kwargs)
+                extraction_key = self._extraction_key(extraction_strategy, chunking_strategy, fields)
+
+                # Time budget shared by every stage of this crawl (unbounded without a timeout)
+                kwargs["deadline"] = deadline = kwargs.get("deadline") or Deadline(timeout)
+                timings = {}
+                page = self._load_html(url, bypass_cache, screenshot, user_agent, verbose, timings, **kwargs)
+
+                stored = self._stored_content(page, verbose, fields, processing_key, extraction_key)
+                if stored is not None:
+                    if not page["is_cached"]:
+                        touch_cached_url(url, page["validators"].get("etag", ""), page["validators"].get("last_modified", ""), page["screenshot"])
+                    crawl_result = self._build_result(url, page["html"], stored, page["screenshot"], timings, deadline, fields)
+                    crawl_result.content_unchanged = not page["is_cached"]
+                else:
+                    crawl_result = self.process_html(url, page["html"], page["extracted_content"], word_count_threshold, extraction_strategy, chunking_strategy, css_selector, page["screenshot"], verbose, page["is_cached"], timings=timings, previous=self._previous_extraction(page, processing_key, extraction_key), validators=page["validators"], processing_key=processing_key, extraction_key=extraction_key, **kwargs)
+                crawl_result.success = bool(page["html"])
                 return crawl_result
             except Exception as e:
                 if not hasattr(e, "msg"):
                     e.msg = str(e)
                 print(f"[ERROR] 🚫 Failed to crawl {url}, error: {e.msg}")    
-                return CrawlResult(url=url, html="", success=False, error_message=e.msg)
+                return CrawlResult(url=url, html="", success=False, error_message=e.msg, timed_out=isinstance(e, DeadlineExceeded))
+
+    async def arun(
+            self,
+            url: str,
+            word_count_threshold=MIN_WORD_THRESHOLD,
+            extraction_strategy: ExtractionStrategy = None,
+            chunking_strategy: ChunkingStrategy = RegexChunking(),
+            bypass_cache: bool = False,
+            css_selector: str = None,
+            screenshot: bool = False,
+            user_agent: str = None,
+            verbose=True,
+            timeout: float = None,
+            fields: List[str] = None,
+            **kwargs,
+        ) -> CrawlResult:
+            """
+            Asyncio-native counterpart of `run`. The cache is read and written without
+            blocking the event loop, the page is fetched through the strategy's `afetch`,
+            and HTML processing is pushed to the loop's default executor.
+            """
+            try:
+                extraction_strategy = self._prepare_strategies(extraction_strategy, chunking_strategy, verbose)
+                word_count_threshold = max(word_count_threshold, 0)
+
+                if kwargs.get("warmup", True) and not self.ready:
+                    return None
+
+                # Only the requested outputs are computed (all of them without `fields`)
+                kwargs["fields"] = fields = self._output_fields(fields)
+                if fields is not None:
+                    screenshot = "screenshot" in fields
+                processing_key = self._processing_key(word_count_threshold, css_selector, **kwargs)
+                extraction_key = self._extraction_key(extraction_strategy, chunking_strategy, fields)
+
+                # Time budget shared by every stage of this crawl (unbounded without a timeout)
+                kwargs["deadline"] = deadline = kwargs.get("deadline") or Deadline(timeout)
+                timings = {}
+                page = await self._aload_html(url, bypass_cache, screenshot, user_agent, verbose, timings, **kwargs)
+                html = page["html"]
+                loop = asyncio.get_running_loop()
+
+                stored = await loop.run_in_executor(None, self._stored_content, page, verbose, fields, processing_key, extraction_key)
+                if stored is not None:
+                    if not page["is_cached"]:
+                        await loop.run_in_executor(None, touch_cached_url, url, page["validators"].get("etag", ""), page["validators"].get("last_modified", ""), page["screenshot"])
+                    crawl_result = self._build_result(url, html, stored, page["screenshot"], timings, deadline, fields)
+                    crawl_result.content_unchanged = not page["is_cached"]
+                    crawl_result.success = bool(html)
+                    return crawl_result
+
+                previous = await loop.run_in_executor(None, self._previous_extraction, page, processing_key, extraction_key)
+                processed = await loop.run_in_executor(
+                    None,
+                    partial(self._process, url, html, page["extracted_content"], word_count_threshold, extraction_strategy, chunking_strategy, css_selector, verbose, previous=previous, **kwargs),
+                )
+                # Partial results are returned but not cached
+                if not self._skipped_stages(deadline, processed):
+                    t = time.time()
+                    if not page["is_cached"]:
+                        await acache_url(url, html, **self._cache_columns(processed, page["screenshot"], page["validators"]))
+                    await loop.run_in_executor(None, self._store_artifacts, url, processed, processing_key, extraction_key)
+                    timings["cache_write"] = time.time() - t
+
+                crawl_result = self._build_result(url, html, processed, page["screenshot"], timings, deadline, fields)
+                crawl_result.success = bool(html)
+                return crawl_result
+            except Exception as e:
+                if not hasattr(e, "msg"):
+                    e.msg = str(e)
+                print(f"[ERROR] 🚫 Failed to crawl {url}, error: {e.msg}")
+                return CrawlResult(url=url, html="", success=False, error_message=e.msg, timed_out=isinstance(e, DeadlineExceeded))
+
+    def _load_html(self, url: str, bypass_cache: bool, screenshot: bool, user_agent: str, verbose: bool, timings: dict, **kwargs) -> dict:
+        """
+        Get the raw HTML of `url` from the cache, or from the crawler strategy when it is
+        not cached (or a screenshot was asked for and none is cached).
+        """
+        from .utils import sanitize_input_encode
+        # The cached row is read even when the cache is bypassed, so that a page whose
+        # HTML did not change can reuse the stored results (see `_stored_content`).
+        t = time.time()
+        cached = get_cached_url(url)
+        timings["cache_read"] = time.time() - t
+
+        page = self._page_from_cache(url, cached, not bypass_cache and not self.always_by_pass_cache, screenshot, timings)
+        page["refresh_extraction"] = bool(kwargs.get("refresh_extraction"))
+        if not page["is_cached"] or not page["html"]:
+            if user_agent and not self.crawler_strategy.supports_request_overrides:
+                self.crawler_strategy.update_user_agent(user_agent)
+            t1 = time.time()
+            html, page["screenshot"] = self._fetch(url, screenshot, timings, page["validators"], verbose, user_agent=user_agent, **kwargs)
+            page["html"] = sanitize_input_encode(self._revalidated_html(page, html))
+            timings["fetch"] = time.time() - t1
+            if verbose:
+                print(f"[LOG] 🚀 Crawling done for {url}, success: {bool(page['html'])}, time taken: {timings['fetch']} seconds")
+        return page
+
+    async def _aload_html(self, url: str, bypass_cache: bool, screenshot: bool, user_agent: str, verbose: bool, timings: dict, **kwargs) -> dict:
+        from .utils import sanitize_input_encode
+        t = time.time()
+        cached = await aget_cached_url(url)
+        timings["cache_read"] = time.time() - t
+
+        page = self._page_from_cache(url, cached, not bypass_cache and not self.always_by_pass_cache, screenshot, timings)
+        page["refresh_extraction"] = bool(kwargs.get("refresh_extraction"))
+        if not page["is_cached"] or not page["html"]:
+            if user_agent and not self.crawler_strategy.supports_request_overrides:
+                self.crawler_strategy.update_user_agent(user_agent)
+            t1 = time.time()
+            html, page["screenshot"] = await self._afetch(url, screenshot, timings, page["validators"], verbose, user_agent=user_agent, **kwargs)
+            page["html"] = sanitize_input_encode(self._revalidated_html(page, html))
+            timings["fetch"] = time.time() - t1
+            if verbose:
+                print(f"[LOG] 🚀 Crawling done for {url}, success: {bool(page['html'])}, time taken: {timings['fetch']} seconds")
+        return page
+
+    def _fetch(self, url: str, screenshot: bool, timings: dict, validators: dict, verbose: bool, **kwargs):
+        """
+        Load `url` through the crawler strategy within the domain's politeness slot,
+        retrying failures according to `retry_policy` unless the domain's circuit is open.
+        Waiting for the slot counts against the crawl's deadline.
+        """
+        domain = domain_of(url)
+        attempt = 0
+        while True:
+            attempt += 1
+            self.circuit_breaker.before(domain)
+            try:
+                with self.scheduler.slot(url, kwargs.get("deadline")):
+                    fetched = self.crawler_strategy.fetch(url, screenshot, timings=timings, validators=validators, **kwargs)
+            except Exception as e:
+                self._record_failure(domain, e)
+                delay = self._retry_delay(e, attempt, kwargs.get("deadline"))
+                if delay is None:
+                    raise
+                if verbose:
+                    print(f"[LOG] 🔄 Attempt {attempt} for {url} failed ({e}), retrying in {delay:.1f} seconds")
+                time.sleep(delay)
+                continue
+            except BaseException:
+                # Interrupted: no verdict on the domain, but the trial must not stay taken
+                self.circuit_breaker.abandon(domain)
+                raise
+            self.circuit_breaker.record_success(domain)
+            return fetched
+
+    async def _afetch(self, url: str, screenshot: bool, timings: dict, validators: dict, verbose: bool, **kwargs):
+        domain = domain_of(url)
+        attempt = 0
+        while True:
+            attempt += 1
+            self.circuit_breaker.before(domain)
+            try:
+                async with self.scheduler.aslot(url, kwargs.get("deadline")):
+                    fetched = await self.crawler_strategy.afetch(url, screenshot, timings=timings, validators=validators, **kwargs)
+            except Exception as e:
+                self._record_failure(domain, e)
+                delay = self._retry_delay(e, attempt, kwargs.get("deadline"))
+                if delay is None:
+                    raise
+                if verbose:
+                    print(f"[LOG] 🔄 Attempt {attempt} for {url} failed ({e}), retrying in {delay:.1f} seconds")
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled, e.g. by arun_stream closing with crawls in flight
+                self.circuit_breaker.abandon(domain)
+                raise
+            self.circuit_breaker.record_success(domain)
+            return fetched
+
+    def _record_failure(self, domain: str, error: Exception):
+        # Errors that cannot be retried (a malformed URL, the crawl's own deadline) would
+        # fail the same way on any domain, so they do not count against this one
+        if getattr(error, "retryable", True):
+            self.circuit_breaker.record_failure(domain)
+        else:
+            self.circuit_breaker.abandon(domain)
+
+    def _retry_delay(self, error: Exception, attempt: int, deadline: Deadline = None):
+        # None means give up: the policy says so, or the wait would outlast the deadline
+        if not self.retry_policy.should_retry(error, attempt):
+            return None
+        delay = self.retry_policy.delay(attempt)
+        if deadline is not None and deadline.remaining() is not None and delay >= deadline.remaining():
+            return None
+        return delay
+
+    def _page_from_cache(self, url: str, cached, use_cache: bool, screenshot: bool, timings: dict) -> dict:
+        from .utils import sanitize_input_encode
+        page = {"url": url, "html": None, "extracted_content": None, "screenshot": None, "is_cached": False, "timings": timings, "previous": cached, "validators": {}}
+        if cached and use_cache and not self._is_fresh(url, cached):
+            # Stale: fetch again, conditionally when the last response had validators
+            if not screenshot:
+                page["validators"] = {"if_none_match": cached[13] or "", "if_modified_since": cached[14] or ""}
+            return page
+        if cached and use_cache:
+            page["html"] = sanitize_input_encode(cached[1])
+            page["is_cached"] = True
+            if screenshot:
+                page["screenshot"] = cached[9]
+                if not page["screenshot"]:
+                    page["is_cached"] = False
+        return page
+
+    def _is_fresh(self, url: str, cached) -> bool:
+        ttl = match_domain(domain_of(url), self.domain_cache_ttl, self.cache_ttl)
+        return not ttl or time.time() - (cached[12] or 0) < ttl
+
+    def _revalidated_html(self, page: dict, html: str) -> str:
+        """
+        After a conditional fetch answered "not modified", the cached HTML is still
+        current: return it and keep its validators, so that `_stored_content` reuses
+        the stored results.
+        """
+        validators = page["validators"]
+        if not validators.get("not_modified"):
+            return html
+        validators.setdefault("etag", validators.get("if_none_match", ""))
+        validators.setdefault("last_modified", validators.get("if_modified_since", ""))
+        return page["previous"][1]
+
+    def _stored_content(self, page: dict, verbose: bool = False, fields: frozenset = None, processing_key: str = None, extraction_key: tuple = None) -> dict:
+        """
+        Return the stored artifacts of the page in the shape `_process` produces, so that
+        nothing is re-parsed, re-extracted or re-written, when its HTML is the cached HTML
+        (a cache hit, or a fetch whose HTML hashes to the same value) and it was already
+        processed with the parameters of `processing_key` (see `_processing_key`).
+
+        Returns None when the page has to be processed, including when one of the
+        requested `fields` was not computed by that processing, or nothing was extracted
+        yet with `extraction_key` (see `_extraction_key`), or the crawl asked for a fresh
+        extraction with `refresh_extraction=True`.
+        """
+        from .utils import hash_content
+        previous = page["previous"]
+        if not page["html"] or not previous or not previous[10] or not processing_key:
+            return None
+        if not page["is_cached"] and hash_content(page["html"]) != previous[10]:
+            return None
+        stored = get_processed(page["url"], processing_key)
+        if stored is None or stored[0] != previous[10]:
+            return None
+        if any(stored[column] is None for field, column in self.STORED_FIELDS.items() if fields is None or field in fields):
+            return None
+        extracted_content = get_extraction(stored[6], *extraction_key) if extraction_key and stored[6] else None
+        if extraction_key and (extracted_content is None or page.get("refresh_extraction")):
+            return None
+        if verbose:
+            print(f"[LOG] ♻️  Content of {page['url']} already processed, reusing the stored results")
+        return {
+            "cleaned_html": stored[1] or "",
+            "markdown": stored[2],
+            "media": json.loads(stored[3]) if stored[3] is not None else None,
+            "links": json.loads(stored[4]) if stored[4] is not None else None,
+            "metadata": json.loads(stored[5]) if stored[5] is not None else None,
+            "extracted_content": extracted_content,
+            "timings": {},
+            "content_hash": stored[0],
+            "markdown_hash": stored[6],
+        }
+
+    def _previous_extraction(self, page: dict, processing_key: str = None, extraction_key: tuple = None) -> dict:
+        """
+        What `extraction_key` extracted from the markdown of the last processing of the
+        page with the same parameters, for `process_content` to reuse if the markdown is
+        still the same.
+        """
+        if not processing_key or not extraction_key or page.get("refresh_extraction"):
+            return None
+        stored = get_processed(page["url"], processing_key)
+        if stored is None or not stored[6]:
+            return None
+        extracted_content = get_extraction(stored[6], *extraction_key)
+        if extracted_content is None:
+            return None
+        return {"markdown_hash": stored[6], "extracted_content": extracted_content}
+
+    def _processing_key(self, word_count_threshold: int, css_selector: str = None, only_text: bool = False, **kwargs) -> str:
+        """
+        Hash of the parameters that change what `get_content_of_website_optimized` makes
+        of a page, which key its stored cleaned HTML, markdown, media, links and metadata.
+        """
+        from .utils import hash_content
+        return hash_content(json.dumps([word_count_threshold, css_selector or "", bool(only_text)]))
+
+    def _extraction_key(self, extraction_strategy: ExtractionStrategy, chunking_strategy: ChunkingStrategy, fields: frozenset = None) -> tuple:
+        """
+        Key of the extraction results of this configuration: the strategy's class, a hash
+        of its options and a hash of the chunking options. None when nothing is extracted.
+        """
+        if extraction_strategy is None or (fields is not None and "extracted_content" not in fields):
+            return None
+        return (extraction_strategy.name, extraction_strategy.fingerprint(), chunking_strategy.fingerprint())
+
+    def _store_artifacts(self, url: str, processed: dict, processing_key: str, extraction_key: tuple):
+        """
+        Store the processed content of `url` under `processing_key`, and its extracted
+        content under `extraction_key` unless it was reused from the store or holds error
+        blocks (e.g. an LLM call that hit a rate limit), which the next crawl retries.
+        """
+        from .utils import has_error_blocks
+        if processing_key:
+            dump = lambda value: json.dumps(value) if value is not None else None
+            cache_processed(
+                url, processing_key, processed["content_hash"], processed["cleaned_html"], processed["markdown"],
+                dump(processed["media"]), dump(processed["links"]), dump(processed["metadata"]), processed["markdown_hash"]
+            )
+        if extraction_key and processed["extracted_content"] is not None and processed["markdown_hash"] and not processed.get("extraction_reused") \
+                and not has_error_blocks(processed["extracted_content"]):
+            cache_extraction(processed["markdown_hash"], *extraction_key, processed["extracted_content"])
+
+    async def arun_many(
+            self,
+            urls: List[str],
+            concurrency: int = 10,
+            **kwargs,
+        ) -> List[CrawlResult]:
+            """
+            Crawl many URLs on the current event loop with at most `concurrency` crawls
+            in flight. Results are returned in the same order as `urls`; any keyword
+            argument accepted by `arun` is applied to every URL.
+            """
+            semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+            async def bounded_arun(url):
+                async with semaphore:
+                    return await self.arun(url, **kwargs)
+
+            # Start the crawls round-robin across domains, but return results in the given order
+            urls = list(urls)
+            tasks = {}
+            for index in self.scheduler.interleave(range(len(urls)), key=lambda i: urls[i]):
+                tasks[index] = asyncio.ensure_future(bounded_arun(urls[index]))
+            return await asyncio.gather(*[tasks[index] for index in range(len(urls))])
+
+    async def arun_stream(
+            self,
+            urls: Iterable[str],
+            concurrency: int = 10,
+            **kwargs,
+        ) -> AsyncIterator[CrawlResult]:
+            """
+            Async iterator over crawl results in completion order, with at most
+            `concurrency` crawls in flight. `urls` is consumed lazily as slots free up.
+            """
+            concurrency = max(concurrency, 1)
+            urls = self.scheduler.interleave(urls, window=4 * concurrency)
+            in_flight = {asyncio.ensure_future(self.arun(url, **kwargs)) for url in islice(urls, concurrency)}
+            try:
+                while in_flight:
+                    done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    for url in islice(urls, len(done)):
+                        in_flight.add(asyncio.ensure_future(self.arun(url, **kwargs)))
+                    for task in done:
+                        yield task.result()
+            finally:
+                for task in in_flight:
+                    task.cancel()
+
+    def _prepare_strategies(self, extraction_strategy, chunking_strategy, verbose) -> ExtractionStrategy:
+        from .extraction_strategy import ExtractionStrategy, NoExtractionStrategy
+        extraction_strategy = extraction_strategy or NoExtractionStrategy()
+        if not isinstance(extraction_strategy, ExtractionStrategy):
+            raise ValueError("Unsupported extraction strategy")
+        if not isinstance(chunking_strategy, ChunkingStrategy):
+            raise ValueError("Unsupported chunking strategy")
+        extraction_strategy.verbose = verbose
+        return extraction_strategy
 
     def process_html(
             self,
@@ -195,67 +705,106 @@ class WebCrawler:
             screenshot: bool,
             verbose: bool,
             is_cached: bool,
+            timings: dict = None,
+            previous: dict = None,
+            validators: dict = None,
+            processing_key: str = None,
+            extraction_key: tuple = None,
             **kwargs,
         ) -> CrawlResult:
-            t = time.time()
-            # Extract content from HTML
-            try:
-                # t1 = time.time()
-                # result = get_content_of_website(url, html, word_count_threshold, css_selector=css_selector, only_text=kwargs.get("only_text", False))
-                # print(f"[LOG] 🚀 Crawling done for {url}, success: True, time taken: {time.time() - t1} seconds")
-                t1 = time.time()
-                result = get_content_of_website_optimized(url, html, word_count_threshold, css_selector=css_selector, only_text=kwargs.get("only_text", False))
-                if verbose:
-                    print(f"[LOG] 🚀 Content extracted for {url}, success: True, time taken: {time.time() - t1} seconds")
-                
-                if result is None:
-                    raise ValueError(f"Failed to extract content from the website: {url}")
-            except InvalidCSSSelectorError as e:
-                raise ValueError(str(e))
-            
-            cleaned_html = sanitize_input_encode(result.get("cleaned_html", ""))
-            markdown = sanitize_input_encode(result.get("markdown", ""))
-            media = result.get("media", [])
-            links = result.get("links", [])
-            metadata = result.get("metadata", {})
-                        
-            if extracted_content is None:
-                if verbose:
-                    print(f"[LOG] 🔥 Extracting semantic blocks for {url}, Strategy: {extraction_strategy.name}")
-
-                sections = chunking_strategy.chunk(markdown)
-                extracted_content = extraction_strategy.run(url, sections)
-                extracted_content = json.dumps(extracted_content, indent=4, default=str)
-
-                if verbose:
-                    print(f"[LOG] 🚀 Extraction done for {url}, time taken: {time.time() - t} seconds.")
-                
+            timings = {} if timings is None else timings
+            processed = self._process(url, html, extracted_content, word_count_threshold, extraction_strategy, chunking_strategy, css_selector, verbose, previous=previous, **kwargs)
             screenshot = None if not screenshot else screenshot
             
-            if not is_cached:
-                cache_url(
-                    url,
-                    html,
-                    cleaned_html,
-                    markdown,
-                    extracted_content,
-                    True,
-                    json.dumps(media),
-                    json.dumps(links),
-                    json.dumps(metadata),
-                    screenshot=screenshot,
-                )                
+            # Partial results are returned but not cached
+            deadline = kwargs.get("deadline")
+            if not self._skipped_stages(deadline, processed):
+                t = time.time()
+                if not is_cached:
+                    cache_url(url, html, **self._cache_columns(processed, screenshot, validators))
+                self._store_artifacts(url, processed, processing_key, extraction_key)
+                timings["cache_write"] = time.time() - t
             
-            return CrawlResult(
-                url=url,
-                html=html,
-                cleaned_html=format_html(cleaned_html),
-                markdown=markdown,
-                media=media,
-                links=links,
-                metadata=metadata,
-                screenshot=screenshot,
-                extracted_content=extracted_content,
-                success=True,
-                error_message="",
-            )
\ No newline at end of file
+            return self._build_result(url, html, processed, screenshot, timings, deadline, kwargs.get("fields"))
+
+    def _process(
+            self,
+            url: str,
+            html: str,
+            extracted_content: str,
+            word_count_threshold: int,
+            extraction_strategy: ExtractionStrategy,
+            chunking_strategy: ChunkingStrategy,
+            css_selector: str,
+            verbose: bool,
+            previous: dict = None,
+            **kwargs,
+        ) -> dict:
+            from .pipeline import process_content
+            return process_content(url, html, extracted_content, word_count_threshold, extraction_strategy, chunking_strategy, css_selector, verbose, previous, **kwargs)
+
+    def _cache_columns(self, processed: dict, screenshot: str, validators: dict = None) -> dict:
+        validators = validators or {}
+        return {
+            "cleaned_html": processed["cleaned_html"],
+            "markdown": processed["markdown"],
+            "extracted_content": processed["extracted_content"],
+            "success": True,
+            # Artifacts that were not requested are stored as NULL, so a later crawl that
+            # asks for them knows it has to compute them
+            "media": json.dumps(processed["media"]) if processed["media"] is not None else None,
+            "links": json.dumps(processed["links"]) if processed["links"] is not None else None,
+            "metadata": json.dumps(processed["metadata"]) if processed["metadata"] is not None else None,
+            "screenshot": screenshot,
+            "content_hash": processed["content_hash"],
+            "markdown_hash": processed["markdown_hash"],
+            "etag": validators.get("etag", ""),
+            "last_modified": validators.get("last_modified", ""),
+        }
+
+    def _skipped_stages(self, deadline: Deadline, processed: dict) -> list:
+        """
+        Stages cut short by the deadline, whether in this process or in a worker.
+        """
+        skipped = list(deadline.skipped) if deadline is not None else []
+        return skipped + [stage for stage in processed.get("skipped_stages", []) if stage not in skipped]
+
+    def _output_fields(self, fields) -> Optional[frozenset]:
+        """
+        Validate the `fields` a caller asked for; None means every field.
+        """
+        if fields is None:
+            return None
+        fields = frozenset([fields] if isinstance(fields, str) else fields)
+        unknown = fields - set(OUTPUT_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown output fields: {', '.join(sorted(unknown))} (expected some of: {', '.join(OUTPUT_FIELDS)})")
+        return fields
+
+    def _build_result(self, url: str, html: str, processed: dict, screenshot: str, timings: dict = None, deadline: Deadline = None, fields: frozenset = None) -> CrawlResult:
+        from .utils import format_html
+        timings = {**(timings or {}), **processed.get("timings", {})}
+        skipped = self._skipped_stages(deadline, processed)
+        wanted = lambda field: fields is None or field in fields
+        return CrawlResult(
+            url=url,
+            html=html if wanted("html") else "",
+            # Pretty-printing is only paid for when the cleaned HTML is returned
+            cleaned_html=(processed.get("formatted_html") or format_html(processed["cleaned_html"])) if wanted("cleaned_html") else None,
+            markdown=processed["markdown"] if wanted("markdown") else None,
+            media=processed["media"] if wanted("media") and processed["media"] is not None else {},
+            links=processed["links"] if wanted("links") and processed["links"] is not None else {},
+            metadata=processed["metadata"] if wanted("metadata") else None,
+            screenshot=screenshot if wanted("screenshot") and screenshot else None,
+            extracted_content=processed["extracted_content"] if wanted("extracted_content") else None,
+            success=True,
+            error_message=f"Deadline exceeded, partial result (cut short: {', '.join(skipped)})" if skipped else "",
+            timed_out=bool(skipped),
+            content_hash=processed.get("content_hash"),
+            timings=CrawlTimings(
+                **timings,
+                html_bytes=len(html.encode("utf-8")) if html else 0,
+                cleaned_html_bytes=len(processed["cleaned_html"].encode("utf-8")),
+                markdown_bytes=len((processed["markdown"] or "").encode("utf-8")),
+            ),
+        )
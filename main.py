@@ -34,6 +34,7 @@ load_dotenv()
 # Configuration
 __location__ = os.path.realpath(os.path.join(os.getcwd(), os.path.dirname(__file__)))
 MAX_CONCURRENT_REQUESTS = 10  # Adjust this to change the maximum concurrent requests
+MAX_CONCURRENT_CRAWLS = int(os.environ.get('MAX_CONCURRENT_CRAWLS', 10))  # In-flight crawls per request
 current_requests = 0
 lock = asyncio.Lock()
 
@@ -148,6 +149,8 @@ class CrawlRequest(BaseModel):
     screenshot: Optional[bool] = False
     user_agent: Optional[str] = None
     verbose: Optional[bool] = True
+    # Result fields to compute and return (see OUTPUT_FIELDS), all of them by default
+    fields: Optional[List[str]] = None
 
 @app.get("/")
 def read_root():
@@ -206,27 +209,20 @@ async def crawl_urls(crawl_request: CrawlRequest, request: Request):
         extraction_strategy = import_strategy("crawl4ai.extraction_strategy", crawl_request.extraction_strategy, **crawl_request.extraction_strategy_args)
         chunking_strategy = import_strategy("crawl4ai.chunking_strategy", crawl_request.chunking_strategy, **crawl_request.chunking_strategy_args)
 
-        # Use ThreadPoolExecutor to run the synchronous WebCrawler in async manner
         logging.debug("[LOG] Running the WebCrawler...")
-        with ThreadPoolExecutor() as executor:
-            loop = asyncio.get_event_loop()
-            futures = [
-                loop.run_in_executor(
-                    executor, 
-                    get_crawler().run,
-                    str(url),
-                    crawl_request.word_count_threshold,
-                    extraction_strategy,
-                    chunking_strategy,
-                    crawl_request.bypass_cache,
-                    crawl_request.css_selector,
-                    crawl_request.screenshot,
-                    crawl_request.user_agent,
-                    crawl_request.verbose
-                )
-                for url in crawl_request.urls
-            ]
-            results = await asyncio.gather(*futures)
+        results = await get_crawler().arun_many(
+            [str(url) for url in crawl_request.urls],
+            concurrency=MAX_CONCURRENT_CRAWLS,
+            word_count_threshold=crawl_request.word_count_threshold,
+            extraction_strategy=extraction_strategy,
+            chunking_strategy=chunking_strategy,
+            bypass_cache=crawl_request.bypass_cache,
+            css_selector=crawl_request.css_selector,
+            screenshot=crawl_request.screenshot,
+            user_agent=crawl_request.user_agent,
+            verbose=crawl_request.verbose,
+            fields=crawl_request.fields,
+        )
 
         # if include_raw_html is False, remove the raw HTML content from the results
         if not crawl_request.include_raw_html:
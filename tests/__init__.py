@@ -0,0 +1,111 @@
+import os
+import time
+import asyncio
+import tempfile
+import threading
+from crawl4ai import database
+from crawl4ai.web_crawler import WebCrawler
+from crawl4ai.crawler_strategy import CrawlerStrategy
+
+ARTICLE = "<html><head><title>News</title></head><body><article><p>" + "Markets rallied on Tuesday as investors weighed new data. " * 10 + "</p></article></body></html>"
+
+
+class StubStrategy(CrawlerStrategy):
+    """
+    Stands in for the network: every crawl returns `html`, or `html(url)` when it is a
+    function, and is counted. The first `failures` crawls raise instead.
+    """
+
+    def __init__(self, html=ARTICLE, failures: int = 0, screenshot: str = "screenshot"):
+        self.html = html
+        self.failures = failures
+        self.screenshot = screenshot
+        self.crawls = 0
+
+    def crawl(self, url: str, **kwargs) -> str:
+        self.crawls += 1
+        if self.crawls <= self.failures:
+            raise Exception("connection reset")
+        return self.html(url) if callable(self.html) else self.html
+
+    def take_screenshot(self, *args, **kwargs):
+        return self.screenshot
+
+    def update_user_agent(self, user_agent: str):
+        pass
+
+    def set_hook(self, hook_type: str, hook: callable):
+        pass
+
+
+class SlowStubStrategy(StubStrategy):
+    """
+    A StubStrategy whose crawls take `delay(url)` seconds, in a thread for `crawl` and on
+    the event loop for `afetch`. It records how many crawls were running at once.
+    """
+
+    def __init__(self, delay, html=ARTICLE):
+        super().__init__(html)
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def _started(self):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _finished(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def crawl(self, url: str, **kwargs) -> str:
+        self._started()
+        try:
+            time.sleep(self.delay(url))
+            return super().crawl(url, **kwargs)
+        finally:
+            self._finished()
+
+    async def afetch(self, url: str, screenshot: bool = False, **kwargs):
+        self._started()
+        try:
+            await asyncio.sleep(self.delay(url))
+            return super().crawl(url, **kwargs), None
+        finally:
+            self._finished()
+
+
+def later_first(url: str) -> float:
+    """
+    Crawl delay for SlowStubStrategy with URLs ending in 0 to 9: the first URLs take the
+    longest, so crawls complete in reverse order.
+    """
+    return 0.2 - 0.02 * int(url.rsplit("/", 1)[1])
+
+
+class TempDatabaseMixin:
+    """
+    Points the cache database at a fresh file in `self.tmpdir` for each test, and puts
+    the previous one back afterwards.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.addCleanup(setattr, database, "DB_PATH", database.DB_PATH)
+        self.use_database("crawl4ai.db")
+
+    def use_database(self, name: str):
+        database.DB_PATH = os.path.join(self.tmpdir.name, name)
+        database.init_db()
+
+    def make_crawler(self, strategy: CrawlerStrategy = None, **kwargs) -> WebCrawler:
+        """
+        A WebCrawler on `strategy` (a StubStrategy by default), ready without warming up.
+        """
+        crawler = WebCrawler(crawler_strategy=strategy or StubStrategy(), **kwargs)
+        crawler.ready = True
+        return crawler
@@ -0,0 +1,50 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+from crawl4ai import database, web_crawler
+from crawl4ai.scheduler import DomainScheduler
+from tests import ARTICLE, SlowStubStrategy, TempDatabaseMixin, later_first
+
+
+class TestAsyncCrawl(TempDatabaseMixin, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.strategy = SlowStubStrategy(later_first)
+        self.crawler = self.make_crawler(self.strategy, scheduler=DomainScheduler(max_concurrency=100, rate=0))
+        self.urls = [f"https://example.com/news/{n}" for n in range(8)]
+
+    def test_arun(self):
+        result = asyncio.run(self.crawler.arun(self.urls[0], verbose=False))
+        self.assertTrue(result.success)
+        self.assertEqual(result.html, ARTICLE)
+        self.assertIn("Markets rallied", result.markdown)
+
+    def test_arun_many_keeps_order_and_bounds_concurrency(self):
+        results = asyncio.run(self.crawler.arun_many(self.urls, concurrency=3, verbose=False))
+        self.assertEqual([result.url for result in results], self.urls)
+        self.assertTrue(all(result.success for result in results))
+        self.assertEqual(self.strategy.max_in_flight, 3)
+        self.assertEqual(self.strategy.crawls, 8)
+
+    def test_cache_is_read_and_written_asynchronously(self):
+        # The blocking cache functions must not be used on the event loop
+        with patch.object(web_crawler, "get_cached_url", side_effect=AssertionError("blocking cache read")), \
+                patch.object(web_crawler, "cache_url", side_effect=AssertionError("blocking cache write")), \
+                patch.object(web_crawler, "aget_cached_url", wraps=database.aget_cached_url) as aget_cached_url, \
+                patch.object(web_crawler, "acache_url", wraps=database.acache_url) as acache_url:
+            first = asyncio.run(self.crawler.arun_many(self.urls[:2], verbose=False))
+            self.assertEqual(acache_url.call_count, 2)
+            self.assertEqual(database.get_cached_url(self.urls[0])[1], ARTICLE)
+
+            second = asyncio.run(self.crawler.arun_many(self.urls[:2], verbose=False))
+
+        self.assertTrue(all(result.success for result in first + second))
+        self.assertEqual(aget_cached_url.call_count, 4)
+        # The second round came from the cache
+        self.assertEqual(self.strategy.crawls, 2)
+        self.assertEqual(acache_url.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import threading
+import time
+import unittest
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from crawl4ai import database
+from crawl4ai.crawler_strategy import HTTPCrawlerStrategy
+from tests import ARTICLE, TempDatabaseMixin
+
+
+class ETagHandler(BaseHTTPRequestHandler):
+    etag = '"v1"'
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(self.headers.get("If-None-Match"))
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", self.etag)
+        self.end_headers()
+        self.wfile.write(ARTICLE.encode("utf-8"))
+
+    def log_message(self, *args):
+        pass
+
+
+class TestCacheFreshness(TempDatabaseMixin, unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(("127.0.0.1", 0), ETagHandler)
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}/article"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+
+    def setUp(self):
+        super().setUp()
+        ETagHandler.requests.clear()
+
+    def _crawler(self, **kwargs):
+        return self.make_crawler(HTTPCrawlerStrategy(use_fallback=False), **kwargs)
+
+    def test_fresh_rows_are_served_from_cache(self):
+        crawler = self._crawler(cache_ttl=3600)
+        crawler.run(self.url, verbose=False)
+        crawler.run(self.url, verbose=False)
+        self.assertEqual(len(ETagHandler.requests), 1)
+
+    def test_stale_rows_are_revalidated_with_a_conditional_get(self):
+        crawler = self._crawler(domain_cache_ttl={"127.0.0.1": 0.05})
+        first = crawler.run(self.url, verbose=False)
+        fetched_at = database.get_cached_url(self.url)[12]
+        self.assertEqual(database.get_cached_url(self.url)[13], '"v1"')
+        time.sleep(0.1)
+        second = crawler.run(self.url, verbose=False)
+        self.assertEqual(ETagHandler.requests, [None, '"v1"'])
+        self.assertTrue(second.content_unchanged)
+        self.assertEqual(second.markdown, first.markdown)
+        self.assertGreater(database.get_cached_url(self.url)[12], fetched_at)
+
+    def test_zero_ttl_keeps_cached_rows_forever(self):
+        crawler = self._crawler(cache_ttl=0)
+        crawler.run(self.url, verbose=False)
+        time.sleep(0.05)
+        crawler.run(self.url, verbose=False)
+        self.assertEqual(len(ETagHandler.requests), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import json
+import time
+import asyncio
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from crawl4ai.crawler_strategy import CloudCrawlerStrategy
+from crawl4ai.deadline import Deadline, DeadlineExceeded
+
+
+class CrawlService(ThreadingHTTPServer):
+    """
+    Stands in for the `/crawl` endpoint of main.py: takes a list of URLs, returns one
+    result per URL (in no particular order), and fails the URLs containing "broken".
+    Calls with a URL containing "malformed" get `null` results.
+    """
+    daemon_threads = True
+
+    def __init__(self, delay: float = 0.05):
+        super().__init__(("127.0.0.1", 0), CrawlHandler)
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class CrawlHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.calls.append(body)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        time.sleep(server.delay)
+        with server.lock:
+            server.in_flight -= 1
+
+        results = []
+        for url in reversed(body["urls"]):
+            if "broken" in url:
+                results.append({"url": url, "html": "", "success": False, "error_message": "Failed to crawl"})
+            else:
+                results.append({
+                    "url": url,
+                    "html": f"<html><body>{url}</body></html>",
+                    "success": True,
+                    "screenshot": "c2NyZWVuc2hvdA==" if body["screenshot"] else None,
+                })
+        # A 200 response without results, as from a broken deployment
+        if any("malformed" in url for url in body["urls"]):
+            results = None
+        data = json.dumps({"results": results}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class TestCloudCrawlerStrategy(unittest.TestCase):
+
+    def setUp(self):
+        self.service = CrawlService()
+        threading.Thread(target=self.service.serve_forever, daemon=True).start()
+        self.strategy = CloudCrawlerStrategy(base_url=self.service.base_url, batch_size=4, batch_window=0.1, max_concurrency=2)
+
+    def tearDown(self):
+        self.strategy.quit()
+        self.service.shutdown()
+        self.service.server_close()
+
+    def test_concurrent_crawls_share_calls(self):
+        urls = [f"https://example.com/news/{n}" for n in range(8)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            pages = list(pool.map(self.strategy.crawl, urls))
+
+        self.assertEqual(pages, [f"<html><body>{url}</body></html>" for url in urls])
+        self.assertLess(len(self.service.calls), len(urls))
+        self.assertTrue(all(len(call["urls"]) <= 4 for call in self.service.calls))
+        self.assertTrue(all(call["include_raw_html"] and call["fields"] == ["html"] for call in self.service.calls))
+
+    def test_crawl_many_batches_and_bounds_concurrency(self):
+        urls = [f"https://example.com/news/{n}" for n in range(10)] + ["https://example.com/broken"]
+        pages = self.strategy.crawl_many(urls)
+
+        self.assertEqual(pages[:10], [f"<html><body>{url}</body></html>" for url in urls[:10]])
+        self.assertIsInstance(pages[10], Exception)
+        self.assertIn("Failed to crawl https://example.com/broken", str(pages[10]))
+        self.assertEqual([len(call["urls"]) for call in self.service.calls], [4, 4, 3])
+        self.assertEqual(self.service.max_in_flight, 2)
+
+    def test_async_fetch_with_screenshot(self):
+        async def fetch_all():
+            return await asyncio.gather(
+                self.strategy.afetch("https://example.com/a", screenshot=True),
+                self.strategy.afetch("https://example.com/b", screenshot=True),
+                self.strategy.acrawl("https://example.com/c"),
+            )
+
+        (html_a, shot_a), (html_b, shot_b), html_c = asyncio.run(fetch_all())
+        self.assertEqual(html_a, "<html><body>https://example.com/a</body></html>")
+        self.assertEqual(html_c, "<html><body>https://example.com/c</body></html>")
+        self.assertEqual((shot_a, shot_b), ("c2NyZWVuc2hvdA==", "c2NyZWVuc2hvdA=="))
+        # Screenshot and plain crawls go in separate calls, as they ask for different fields
+        self.assertEqual(sorted(len(call["urls"]) for call in self.service.calls), [1, 2])
+
+    def test_malformed_response_fails_the_crawls(self):
+        with self.assertRaises(Exception) as raised:
+            self.strategy.crawl("https://example.com/malformed")
+        self.assertIn("Failed to crawl https://example.com/malformed", str(raised.exception))
+
+    def test_urls_that_ran_out_of_time_waiting_for_a_call_are_not_sent(self):
+        self.service.delay = 0.5
+        strategy = CloudCrawlerStrategy(base_url=self.service.base_url, batch_size=1, max_concurrency=1)
+        self.addCleanup(strategy.quit)
+
+        async def crawl_both():
+            busy = asyncio.ensure_future(strategy.acrawl("https://example.com/slow"))
+            await asyncio.sleep(0.1)
+            t = time.time()
+            with self.assertRaises(DeadlineExceeded):
+                await strategy.acrawl("https://example.com/late", deadline=Deadline(0.2))
+            waited = time.time() - t
+            await busy
+            return waited
+
+        # It fails as soon as the slot frees up, instead of making a call of its own
+        self.assertLess(asyncio.run(crawl_both()), 0.9)
+        self.assertEqual([call["urls"] for call in self.service.calls], [["https://example.com/slow"]])
+
+
+if __name__ == '__main__':
+    unittest.main()
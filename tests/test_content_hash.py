@@ -0,0 +1,48 @@
+import unittest
+from crawl4ai import database
+from tests import StubStrategy, TempDatabaseMixin
+
+PAGE = "<html><head><title>News</title></head><body><article><p>{}</p></article></body></html>"
+
+
+class TestContentHash(TempDatabaseMixin, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.strategy = StubStrategy(PAGE.format("Markets rallied on Tuesday as investors weighed new data."))
+        self.crawler = self.make_crawler(self.strategy)
+        self.url = "https://news.example.com/business"
+
+    def test_unchanged_page_reuses_stored_results(self):
+        first = self.crawler.run(self.url, bypass_cache=True, verbose=False)
+        second = self.crawler.run(self.url, bypass_cache=True, verbose=False)
+        self.assertFalse(first.content_unchanged)
+        self.assertTrue(second.content_unchanged)
+        self.assertEqual(first.content_hash, second.content_hash)
+        self.assertEqual(first.markdown, second.markdown)
+        self.assertEqual(second.timings.parse, 0.0)
+
+    def test_changed_page_is_processed_again(self):
+        first = self.crawler.run(self.url, bypass_cache=True, verbose=False)
+        self.strategy.html = PAGE.format("Stocks fell on Wednesday after the announcement.")
+        second = self.crawler.run(self.url, bypass_cache=True, verbose=False)
+        self.assertFalse(second.content_unchanged)
+        self.assertNotEqual(first.content_hash, second.content_hash)
+        self.assertIn("Stocks fell", second.markdown)
+        self.assertEqual(database.get_cached_url(self.url)[10], second.content_hash)
+
+    def test_init_db_adds_hash_columns_to_old_databases(self):
+        import sqlite3
+        conn = sqlite3.connect(database.DB_PATH)
+        conn.execute("DROP TABLE crawled_data")
+        conn.execute("CREATE TABLE crawled_data (url TEXT PRIMARY KEY, html TEXT, cleaned_html TEXT, markdown TEXT, extracted_content TEXT, success BOOLEAN, media TEXT, links TEXT, metadata TEXT, screenshot TEXT)")
+        conn.commit()
+        conn.close()
+        database.init_db()
+        result = self.crawler.run(self.url, bypass_cache=True, verbose=False)
+        self.assertTrue(result.success)
+        self.assertEqual(database.get_cached_url(self.url)[10], result.content_hash)
+
+
+if __name__ == "__main__":
+    unittest.main()
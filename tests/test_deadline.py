@@ -0,0 +1,159 @@
+import json
+import asyncio
+import threading
+import time
+import unittest
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from crawl4ai import database
+from crawl4ai.deadline import Deadline, DeadlineExceeded
+from crawl4ai.retry import RetryPolicy
+from crawl4ai.scheduler import DomainScheduler
+from crawl4ai.crawler_strategy import HTTPCrawlerStrategy, LocalSeleniumCrawlerStrategy, DriverPool
+from crawl4ai.chunking_strategy import RegexChunking
+from crawl4ai.extraction_strategy import ExtractionStrategy
+from tests import StubStrategy, TempDatabaseMixin
+
+STORY = "<html><body><p>First paragraph of the story.</p><p>Second paragraph of the story.</p></body></html>"
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(1)
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(b"<html><body>late</body></html>")
+
+    def log_message(self, *args):
+        pass
+
+
+class PooledDriver:
+    """
+    Shows the page of the previous crawl until it is told to load another one.
+    """
+
+    def __init__(self):
+        self.page_source = STORY
+        self.visited = []
+
+    def get(self, url):
+        self.visited.append(url)
+
+    def execute_script(self, script, *args):
+        return 1
+
+    def execute_cdp_cmd(self, cmd, params):
+        return {}
+
+    def set_page_load_timeout(self, timeout):
+        pass
+
+    def quit(self):
+        pass
+
+
+def out_of_time(url):
+    raise DeadlineExceeded("page load")
+
+
+class SlowSecondSection(ExtractionStrategy):
+    def extract(self, url, section, *q, **kwargs):
+        if "Second" in section:
+            time.sleep(1)
+        return [{"content": section}]
+
+
+class TestDeadline(TempDatabaseMixin, unittest.TestCase):
+
+    def test_deadline_caps_and_expires(self):
+        unbounded = Deadline()
+        self.assertIsNone(unbounded.remaining())
+        self.assertEqual(unbounded.cap(20), 20)
+        deadline = Deadline(0.05)
+        self.assertLessEqual(deadline.cap(20), 0.05)
+        time.sleep(0.06)
+        self.assertTrue(deadline.expired())
+
+    def test_slow_extraction_returns_partial_result(self):
+        crawler = self.make_crawler(StubStrategy(STORY))
+        url = "https://news.example.com/story"
+        t = time.time()
+        result = crawler.run(url, extraction_strategy=SlowSecondSection(), chunking_strategy=RegexChunking(patterns=["\n\n"]), bypass_cache=True, verbose=False, timeout=0.3)
+        self.assertLess(time.time() - t, 0.9)
+        self.assertTrue(result.success)
+        self.assertTrue(result.timed_out)
+        self.assertIn("extraction", result.error_message)
+        self.assertIn("First paragraph", json.dumps(json.loads(result.extracted_content)))
+        self.assertIsNone(database.get_cached_url(url))
+
+    def test_slow_server_times_out(self):
+        server = HTTPServer(("127.0.0.1", 0), SlowHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            crawler = self.make_crawler(HTTPCrawlerStrategy(use_fallback=False), retry_policy=RetryPolicy(base_delay=0))
+            t = time.time()
+            result = crawler.run(f"http://127.0.0.1:{server.server_address[1]}/", bypass_cache=True, verbose=False, timeout=0.2)
+            self.assertLess(time.time() - t, 0.9)
+            self.assertFalse(result.success)
+            self.assertTrue(result.timed_out)
+        finally:
+            server.shutdown()
+
+    def test_waiting_for_a_busy_domain_counts_against_the_deadline(self):
+        def slow_story(url):
+            time.sleep(1)
+            return STORY
+
+        crawler = self.make_crawler(StubStrategy(slow_story), scheduler=DomainScheduler(max_concurrency=1, rate=0))
+        # The first crawl holds the domain's only slot for a second
+        holder = threading.Thread(target=crawler.run, args=("https://news.example.com/1",), kwargs={"bypass_cache": True, "verbose": False})
+        holder.start()
+        time.sleep(0.1)
+        t = time.time()
+        result = crawler.run("https://news.example.com/2", bypass_cache=True, verbose=False, timeout=0.2)
+        self.assertLess(time.time() - t, 0.6)
+        self.assertFalse(result.success)
+        self.assertTrue(result.timed_out)
+        self.assertIn("scheduling", result.error_message)
+        holder.join()
+
+        async def queued_crawl():
+            holder = asyncio.ensure_future(crawler.arun("https://news.example.com/3", bypass_cache=True, verbose=False))
+            await asyncio.sleep(0.1)
+            t = time.time()
+            result = await crawler.arun("https://news.example.com/4", bypass_cache=True, verbose=False, timeout=0.2)
+            elapsed = time.time() - t
+            await holder
+            return result, elapsed
+
+        result, elapsed = asyncio.run(queued_crawl())
+        self.assertLess(elapsed, 0.6)
+        self.assertTrue(result.timed_out)
+        self.assertIn("scheduling", result.error_message)
+
+    def test_browser_crawl_out_of_time_does_not_return_the_previous_page(self):
+        strategy = LocalSeleniumCrawlerStrategy(blocked_resources="none")
+        strategy.pool = DriverPool(PooledDriver, size=1)
+        driver = strategy.pool.checkout()
+        # Every driver is busy until the deadline runs out
+        t = time.time()
+        with self.assertRaises(DeadlineExceeded):
+            strategy.crawl("https://news.example.com/1", deadline=Deadline(0.1))
+        self.assertLess(time.time() - t, 0.5)
+
+        # The driver is free, but the deadline expired before navigating
+        strategy.pool.checkin(driver)
+        with self.assertRaises(DeadlineExceeded):
+            strategy.crawl("https://news.example.com/2", deadline=Deadline(0))
+        self.assertEqual(driver.visited, [])
+        strategy.release()
+
+    def test_pipeline_reports_timed_out_crawls(self):
+        crawler = self.make_crawler(StubStrategy(out_of_time))
+        results = list(crawler.run_pipeline(["https://news.example.com/1"], process_concurrency=1, verbose=False))
+        self.assertFalse(results[0].success)
+        self.assertTrue(results[0].timed_out)
+
+
+if __name__ == "__main__":
+    unittest.main()
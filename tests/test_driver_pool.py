@@ -0,0 +1,87 @@
+import time
+import threading
+import unittest
+from crawl4ai.crawler_strategy import DriverPool
+
+class FakeDriver:
+    def __init__(self):
+        self.quit_called = False
+        self.broken = False
+
+    def execute_script(self, script):
+        if self.broken:
+            raise RuntimeError("browser crashed")
+        return 1
+
+    def quit(self):
+        self.quit_called = True
+
+class TestDriverPool(unittest.TestCase):
+
+    def setUp(self):
+        self.created = []
+        def factory():
+            driver = FakeDriver()
+            self.created.append(driver)
+            return driver
+        self.pool = DriverPool(factory, size=2, max_pages=3)
+
+    def test_checkout_reuses_idle_driver(self):
+        driver = self.pool.checkout()
+        self.pool.checkin(driver)
+        self.assertIs(self.pool.checkout(), driver)
+        self.assertEqual(len(self.created), 1)
+
+    def test_checkout_blocks_when_pool_is_exhausted(self):
+        self.pool.checkout()
+        self.pool.checkout()
+        with self.assertRaises(TimeoutError):
+            self.pool.checkout(timeout=0.05)
+
+    def test_driver_recycled_after_page_budget(self):
+        driver = self.pool.checkout()
+        for _ in range(3):
+            self.pool.mark_used(driver)
+        self.pool.checkin(driver)
+        self.assertTrue(driver.quit_called)
+        self.assertIsNot(self.pool.checkout(), driver)
+
+    def test_waiter_gets_a_new_driver_when_one_is_recycled(self):
+        pool = DriverPool(lambda: FakeDriver(), size=1, max_pages=1)
+        driver = pool.checkout()
+        waiter = {}
+
+        def wait_for_driver():
+            try:
+                waiter["driver"] = pool.checkout(timeout=3)
+            except TimeoutError as e:
+                waiter["error"] = e
+
+        thread = threading.Thread(target=wait_for_driver)
+        thread.start()
+        time.sleep(0.1)
+        # The worn out driver is quit rather than put back, which frees its slot
+        pool.mark_used(driver)
+        t = time.time()
+        pool.checkin(driver)
+        thread.join()
+        self.assertNotIn("error", waiter)
+        self.assertIsNot(waiter["driver"], driver)
+        self.assertLess(time.time() - t, 1)
+
+    def test_unhealthy_driver_replaced_on_checkout(self):
+        driver = self.pool.checkout()
+        self.pool.checkin(driver)
+        driver.broken = True
+        replacement = self.pool.checkout()
+        self.assertIsNot(replacement, driver)
+        self.assertTrue(driver.quit_called)
+
+    def test_reset_retires_checked_out_drivers(self):
+        driver = self.pool.checkout()
+        self.pool.reset()
+        self.pool.checkin(driver)
+        self.assertTrue(driver.quit_called)
+
+if __name__ == '__main__':
+    unittest.main()
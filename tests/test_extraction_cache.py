@@ -0,0 +1,98 @@
+import unittest
+from crawl4ai.chunking_strategy import RegexChunking, FixedLengthWordChunking
+from crawl4ai.extraction_strategy import ExtractionStrategy
+from tests import StubStrategy, TempDatabaseMixin
+
+
+class KeywordExtraction(ExtractionStrategy):
+    runs = 0
+
+    def __init__(self, keyword: str, **kwargs):
+        super().__init__(**kwargs)
+        self.keyword = keyword
+
+    def extract(self, url: str, html: str, *q, **kwargs):
+        return [{"keyword": self.keyword, "count": html.count(self.keyword)}]
+
+    def run(self, url, sections, *q, **kwargs):
+        KeywordExtraction.runs += 1
+        return super().run(url, sections, *q, **kwargs)
+
+
+class RateLimitedOnce(KeywordExtraction):
+    """
+    Fails its first run the way LLMExtractionStrategy reports a failed call.
+    """
+
+    def run(self, url, sections, *q, **kwargs):
+        KeywordExtraction.runs += 1
+        if KeywordExtraction.runs == 1:
+            return [{"index": 0, "error": True, "tags": ["error"], "content": "Rate limit reached"}]
+        return ExtractionStrategy.run(self, url, sections, *q, **kwargs)
+
+
+class TestExtractionCache(TempDatabaseMixin, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.strategy = StubStrategy()
+        self.crawler = self.make_crawler(self.strategy)
+        self.url = "https://example.com/article"
+        KeywordExtraction.runs = 0
+
+    def _run(self, keyword, **kwargs):
+        return self.crawler.run(self.url, extraction_strategy=KeywordExtraction(keyword), verbose=False, **kwargs)
+
+    def test_new_configuration_extracts_from_cached_html(self):
+        markets = self._run("Markets")
+        investors = self._run("investors")
+        # The second strategy reused the cached page but got its own extraction
+        self.assertEqual(self.strategy.crawls, 1)
+        self.assertEqual(KeywordExtraction.runs, 2)
+        self.assertIn('"keyword": "Markets"', markets.extracted_content)
+        self.assertIn('"keyword": "investors"', investors.extracted_content)
+
+        # Both extractions coexist: going back to the first one extracts nothing
+        again = self._run("Markets")
+        self.assertEqual(KeywordExtraction.runs, 2)
+        self.assertEqual(again.extracted_content, markets.extracted_content)
+
+    def test_chunking_is_part_of_the_key(self):
+        self._run("Markets", chunking_strategy=RegexChunking())
+        self._run("Markets", chunking_strategy=FixedLengthWordChunking(chunk_size=5))
+        self.assertEqual(KeywordExtraction.runs, 2)
+
+    def test_unchanged_page_reuses_matching_extraction_only(self):
+        self._run("Markets")
+        result = self._run("Markets", bypass_cache=True)
+        self.assertTrue(result.content_unchanged)
+        self.assertEqual(KeywordExtraction.runs, 1)
+
+        # Same HTML, but nothing was extracted with this configuration yet
+        result = self._run("investors", bypass_cache=True)
+        self.assertFalse(result.content_unchanged)
+        self.assertEqual(KeywordExtraction.runs, 2)
+        self.assertIn('"keyword": "investors"', result.extracted_content)
+
+    def test_failed_extraction_is_not_cached(self):
+        failed = self.crawler.run(self.url, extraction_strategy=RateLimitedOnce("Markets"), verbose=False)
+        self.assertIn("Rate limit reached", failed.extracted_content)
+
+        result = self.crawler.run(self.url, extraction_strategy=RateLimitedOnce("Markets"), bypass_cache=True, verbose=False)
+        self.assertEqual(KeywordExtraction.runs, 2)
+        self.assertIn('"keyword": "Markets"', result.extracted_content)
+        # The successful extraction is cached
+        self.crawler.run(self.url, extraction_strategy=RateLimitedOnce("Markets"), verbose=False)
+        self.assertEqual(KeywordExtraction.runs, 2)
+
+    def test_refresh_extraction_skips_the_stored_results(self):
+        self._run("Markets")
+        for kwargs in ({}, {"bypass_cache": True}):
+            self._run("Markets", refresh_extraction=True, **kwargs)
+        self.assertEqual(KeywordExtraction.runs, 3)
+        # The page itself was still served from the cache, then found unchanged
+        self.assertEqual(self.strategy.crawls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import sqlite3
+import unittest
+from crawl4ai import database
+from tests import StubStrategy, TempDatabaseMixin
+
+ARTICLE = """<html><head><title>News</title><meta name="description" content="Markets"></head><body><article>
+<h1>Markets</h1><p>""" + "Markets rallied on Tuesday as investors weighed new data. " * 10 + """</p>
+<a href="https://example.org/more">More</a><img src="https://example.com/chart.png" alt="chart" width="400" height="300">
+</article></body></html>"""
+
+
+class TestOutputFields(TempDatabaseMixin, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.crawler = self.make_crawler(StubStrategy(ARTICLE))
+        self.url = "https://example.com/article"
+
+    def _cached_row(self):
+        conn = sqlite3.connect(database.DB_PATH)
+        row = conn.execute("SELECT markdown, media, links, metadata FROM crawled_data WHERE url = ?", (self.url,)).fetchone()
+        conn.close()
+        return row
+
+    def test_only_requested_fields_are_computed(self):
+        result = self.crawler.run(self.url, bypass_cache=True, fields=["markdown"], verbose=False)
+        self.assertTrue(result.success)
+        self.assertIn("Markets rallied", result.markdown)
+        self.assertIsNone(result.cleaned_html)
+        self.assertIsNone(result.metadata)
+        self.assertIsNone(result.extracted_content)
+        self.assertEqual(result.links, {})
+        self.assertEqual(result.media, {})
+        self.assertEqual(result.html, "")
+        # What was not computed is stored as NULL rather than as an empty value
+        markdown, media, links, metadata = self._cached_row()
+        self.assertTrue(markdown)
+        self.assertIsNone(media)
+        self.assertIsNone(links)
+        self.assertIsNone(metadata)
+
+    def test_later_crawl_computes_missing_fields(self):
+        self.crawler.run(self.url, bypass_cache=True, fields=["markdown"], verbose=False)
+        # Same HTML, but the stored row lacks the links: they must be computed, not reused
+        result = self.crawler.run(self.url, bypass_cache=True, fields=["links", "metadata"], verbose=False)
+        self.assertFalse(result.content_unchanged)
+        self.assertEqual(result.links["external"][0]["href"], "https://example.org/more")
+        self.assertEqual(result.metadata["title"], "News")
+        self.assertIsNone(result.markdown)
+
+        # Now everything that crawl needed is stored and the unchanged page is reused
+        result = self.crawler.run(self.url, bypass_cache=True, fields=["links"], verbose=False)
+        self.assertTrue(result.content_unchanged)
+        self.assertEqual(result.links["external"][0]["href"], "https://example.org/more")
+
+    def test_unknown_field_is_rejected(self):
+        result = self.crawler.run(self.url, bypass_cache=True, fields=["markdwon"], verbose=False)
+        self.assertFalse(result.success)
+        self.assertIn("markdwon", result.error_message)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import time
+import sqlite3
+import shutil
+import tempfile
+import unittest
+from crawl4ai.html_store import HtmlStore
+
+
+def page(n: int, size: int = 20000) -> str:
+    # Random-looking text, so that it does not compress to almost nothing
+    return f"<html><body>{os.urandom(size // 2).hex()}</body></html><!-- {n} -->"
+
+
+class TestHtmlStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = HtmlStore(self.tmpdir, max_bytes=0, compression="zlib")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_round_trip_sharded_and_compressed(self):
+        html = "<html><body>" + "<p>Breaking news</p>" * 1000 + "</body></html>"
+        digest = self.store.put("https://example.com/a", html)
+
+        self.assertEqual(self.store.get("https://example.com/a"), html)
+        self.assertIsNone(self.store.get("https://example.com/missing"))
+        path = os.path.join(self.tmpdir, digest[:2], digest[2:4], digest + ".zz")
+        self.assertTrue(os.path.exists(path))
+        self.assertLess(os.path.getsize(path), len(html) // 10)
+        # Temporary files were renamed into place
+        self.assertEqual(os.listdir(os.path.dirname(path)), [digest + ".zz"])
+
+    def test_identical_pages_share_a_file_and_replaced_pages_are_removed(self):
+        self.store.put("https://example.com/a", "<html>same</html>")
+        self.store.put("https://example.com/b", "<html>same</html>")
+        size = self.store.total_bytes()
+
+        self.store.put("https://example.com/a", "<html>changed</html>")
+        self.assertEqual(self.store.get("https://example.com/b"), "<html>same</html>")
+        self.store.delete("https://example.com/b")
+        self.assertIsNone(self.store.get("https://example.com/b"))
+        self.assertLess(self.store.total_bytes(), size * 2)
+        self.assertEqual(self.store.get("https://example.com/a"), "<html>changed</html>")
+
+    def test_running_total_matches_the_files(self):
+        def summed():
+            conn = sqlite3.connect(self.store.index_path)
+            total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM blobs').fetchone()[0]
+            conn.close()
+            return total
+
+        self.store.put("https://example.com/a", page(0))
+        self.store.put("https://example.com/b", page(1))
+        self.store.put("https://example.com/a", page(2))
+        self.store.delete("https://example.com/b")
+        self.assertEqual(self.store.total_bytes(), summed())
+        self.assertGreater(summed(), 0)
+
+        # An index from before the running total gets it computed when opened
+        conn = sqlite3.connect(self.store.index_path)
+        conn.execute('DROP TABLE meta')
+        conn.commit()
+        conn.close()
+        self.assertEqual(HtmlStore(self.tmpdir, compression="zlib").total_bytes(), summed())
+
+        self.store.clear()
+        self.assertEqual(self.store.total_bytes(), 0)
+
+    def test_least_recently_used_pages_are_evicted(self):
+        self.store.put("https://example.com/0", page(0))
+        budget = int(self.store.total_bytes() * 3.5)
+        store = HtmlStore(self.tmpdir, max_bytes=budget, compression="zlib")
+        for n in range(1, 3):
+            time.sleep(0.01)
+            store.put(f"https://example.com/{n}", page(n))
+        # Reading the oldest page makes it the most recently used one
+        time.sleep(0.01)
+        self.assertIsNotNone(store.get("https://example.com/0"))
+
+        store.put("https://example.com/3", page(3))
+        self.assertLessEqual(store.total_bytes(), budget)
+        self.assertIsNone(store.get("https://example.com/1"))
+        self.assertIsNotNone(store.get("https://example.com/2"))
+        self.assertIsNotNone(store.get("https://example.com/0"))
+        self.assertIsNotNone(store.get("https://example.com/3"))
+
+
+if __name__ == '__main__':
+    unittest.main()
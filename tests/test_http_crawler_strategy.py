@@ -0,0 +1,101 @@
+import unittest, threading, asyncio
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from crawl4ai.crawler_strategy import CrawlerStrategy, HTTPCrawlerStrategy
+from crawl4ai.utils import needs_javascript
+
+ARTICLE = "<html><head><title>News</title></head><body><article><p>" + "Markets rallied on Tuesday as investors weighed new data. " * 10 + "</p></article></body></html>"
+SPA = '<html><head><script src="/app.js"></script></head><body><noscript>You need to enable JavaScript to run this app.</noscript><div id="root"></div></body></html>'
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    pages = {"/article": (200, ARTICLE), "/spa": (200, SPA), "/forbidden": (403, ARTICLE)}
+    last_headers = None
+
+    def do_GET(self):
+        FixtureHandler.last_headers = self.headers
+        status, body = self.pages.get(self.path, (404, "<html><body>Not found</body></html>"))
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.end_headers()
+        self.wfile.write(body.encode("utf-8"))
+
+    def log_message(self, *args):
+        pass
+
+class FakeBrowserStrategy(CrawlerStrategy):
+    def __init__(self):
+        self.crawled = []
+
+    def crawl(self, url, **kwargs):
+        self.crawled.append(url)
+        return "<html><body>rendered</body></html>"
+
+    def take_screenshot(self):
+        return "screenshot"
+
+    def update_user_agent(self, user_agent):
+        pass
+
+    def set_hook(self, hook_type, hook):
+        pass
+
+class TestHTTPCrawlerStrategy(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(("127.0.0.1", 0), FixtureHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+
+    def setUp(self):
+        self.browser = FakeBrowserStrategy()
+        self.strategy = HTTPCrawlerStrategy(fallback_strategy=self.browser)
+
+    def test_static_page_served_without_browser(self):
+        html, screenshot = self.strategy.fetch(self.base_url + "/article")
+        self.assertIn("Markets rallied", html)
+        self.assertIsNone(screenshot)
+        self.assertEqual(self.browser.crawled, [])
+
+    def test_javascript_page_falls_back_to_browser(self):
+        html, _ = self.strategy.fetch(self.base_url + "/spa")
+        self.assertEqual(html, "<html><body>rendered</body></html>")
+        self.assertEqual(self.browser.crawled, [self.base_url + "/spa"])
+
+    def test_forbidden_page_falls_back_to_browser(self):
+        self.strategy.fetch(self.base_url + "/forbidden")
+        self.assertEqual(self.browser.crawled, [self.base_url + "/forbidden"])
+
+    def test_screenshot_goes_through_browser(self):
+        _, screenshot = self.strategy.fetch(self.base_url + "/article", screenshot=True)
+        self.assertEqual(screenshot, "screenshot")
+
+    def test_user_agent_and_headers_per_request(self):
+        self.strategy.fetch(self.base_url + "/article", user_agent="NewsBot/1.0", headers={"X-Edition": "uk"})
+        self.assertEqual(FixtureHandler.last_headers["User-Agent"], "NewsBot/1.0")
+        self.assertEqual(FixtureHandler.last_headers["X-Edition"], "uk")
+        # The next request is back to the defaults
+        self.strategy.fetch(self.base_url + "/article")
+        self.assertEqual(FixtureHandler.last_headers["User-Agent"], HTTPCrawlerStrategy.DEFAULT_HEADERS["User-Agent"])
+        self.assertIsNone(FixtureHandler.last_headers["X-Edition"])
+
+    def test_async_client_outlives_event_loops_and_is_closed(self):
+        # Each asyncio.run has its own loop; they all go through one client
+        for _ in range(2):
+            html = asyncio.run(self.strategy.acrawl(self.base_url + "/article"))
+            self.assertIn("Markets rallied", html)
+        client = self.strategy._async_client
+        self.assertFalse(client.is_closed)
+        self.strategy.quit()
+        self.assertTrue(client.is_closed)
+
+    def test_needs_javascript_heuristic(self):
+        self.assertFalse(needs_javascript(ARTICLE))
+        self.assertTrue(needs_javascript(SPA))
+        self.assertTrue(needs_javascript(""))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+import unittest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["selenium", "PIL", "bs4", "html2text", "requests", "numpy", "httpx", "nltk", "torch"]
+
+
+class TestImportTime(unittest.TestCase):
+
+    def _run(self, code):
+        return subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+
+    def test_web_crawler_import_is_light(self):
+        loaded = self._run(
+            "import sys, crawl4ai.web_crawler; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+        )
+        self.assertEqual(loaded, "", f"Heavy modules loaded on import: {loaded}")
+
+    def test_import_time_budget(self):
+        elapsed = float(self._run(
+            "import time; t = time.perf_counter(); import crawl4ai.web_crawler; "
+            "print(time.perf_counter() - t)"
+        ))
+        self.assertLess(elapsed, 1.0)
+
+    def test_strategies_still_importable(self):
+        name = self._run(
+            "from crawl4ai.crawler_strategy import LocalSeleniumCrawlerStrategy; "
+            "print(LocalSeleniumCrawlerStrategy.__name__)"
+        )
+        self.assertEqual(name, "LocalSeleniumCrawlerStrategy")
+
+
+if __name__ == "__main__":
+    unittest.main()
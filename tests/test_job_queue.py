@@ -0,0 +1,98 @@
+import time
+import threading
+import unittest
+from crawl4ai import database
+from crawl4ai.job_queue import JobQueue
+from crawl4ai.retry import RetryPolicy
+from tests import StubStrategy, TempDatabaseMixin
+
+
+def story(url: str) -> str:
+    if "broken" in url:
+        raise Exception("connection reset")
+    return f"<html><body><p>Story published at {url}</p></body></html>"
+
+
+class TestJobQueue(TempDatabaseMixin, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.queue = JobQueue(lease_seconds=60, max_attempts=2)
+        self.urls = [f"https://news.example.com/{i}" for i in range(5)]
+
+    def test_workers_claim_disjoint_batches(self):
+        job_id = self.queue.create_job(self.urls + self.urls[:2])
+        first = self.queue.claim(job_id, "worker-1", batch_size=3)
+        second = self.queue.claim(job_id, "worker-2", batch_size=3)
+        self.assertEqual(len(first), 3)
+        self.assertEqual(len(second), 2)
+        self.assertFalse({url for _, url in first} & {url for _, url in second})
+        self.assertEqual(self.queue.claim(job_id, "worker-3"), [])
+        self.assertEqual(self.queue.status(job_id)["in_flight"], 5)
+
+    def test_expired_leases_are_reclaimed(self):
+        queue = JobQueue(lease_seconds=0.05)
+        job_id = queue.create_job(self.urls[:2])
+        queue.claim(job_id, "dead-worker")
+        time.sleep(0.1)
+        reclaimed = queue.claim(job_id, "worker-2")
+        self.assertEqual(len(reclaimed), 2)
+        # The dead worker can no longer complete tasks it lost
+        queue.complete(reclaimed[0][0], "dead-worker")
+        self.assertEqual(queue.status(job_id)["done"], 0)
+
+    def test_task_that_keeps_losing_its_lease_is_failed(self):
+        queue = JobQueue(lease_seconds=0.05, max_attempts=2)
+        job_id = queue.create_job(self.urls[:1])
+        for worker_id in ("worker-1", "worker-2"):
+            self.assertEqual(len(queue.claim(job_id, worker_id)), 1)
+            time.sleep(0.1)
+        # Both workers died on it: it is not handed out a third time
+        self.assertEqual(queue.claim(job_id, "worker-3"), [])
+        failed, = queue.tasks(job_id, "failed")
+        self.assertEqual(failed["attempts"], 2)
+        self.assertIn("Lease expired", failed["error_message"])
+
+    def test_failed_tasks_are_retried_until_max_attempts(self):
+        job_id = self.queue.create_job(self.urls[:1])
+        (task_id, _), = self.queue.claim(job_id, "worker")
+        self.queue.fail(task_id, "timeout", "worker")
+        self.assertEqual(self.queue.status(job_id)["pending"], 1)
+        (task_id, _), = self.queue.claim(job_id, "worker")
+        self.queue.fail(task_id, "timeout", "worker")
+        self.assertEqual(self.queue.status(job_id)["failed"], 1)
+        self.assertEqual(self.queue.retry_failed(job_id), 1)
+        self.assertEqual(self.queue.status(job_id)["pending"], 1)
+
+    def test_run_job_resumes_and_records_failures(self):
+        job_id = self.queue.create_job(self.urls + ["https://broken.example.com/"], params={"bypass_cache": True, "verbose": False})
+        # A previous worker finished one task before dying
+        (task_id, _), = self.queue.claim(job_id, "previous-worker", batch_size=1)
+        self.queue.complete(task_id, "previous-worker")
+
+        crawler = self.make_crawler(StubStrategy(story), retry_policy=RetryPolicy(max_attempts=1))
+        status = crawler.run_job(job_id, queue=self.queue, worker_id="worker", batch_size=2)
+        self.assertEqual(status["done"], 5)
+        self.assertEqual(status["failed"], 1)
+        self.assertEqual(self.queue.tasks(job_id, "failed")[0]["url"], "https://broken.example.com/")
+        self.assertIsNotNone(database.get_cached_url(self.urls[-1]))
+
+    def test_run_job_renews_leases_of_slow_crawls(self):
+        def slow_story(url):
+            time.sleep(0.5)
+            return story(url)
+
+        queue = JobQueue(lease_seconds=0.15)
+        job_id = queue.create_job(self.urls[:2], params={"bypass_cache": True, "verbose": False})
+        crawler = self.make_crawler(StubStrategy(slow_story))
+        worker = threading.Thread(target=crawler.run_job, args=(job_id,), kwargs={"queue": queue, "worker_id": "worker", "batch_size": 2})
+        worker.start()
+        time.sleep(0.3)
+        # Past the original lease, the tasks still belong to the worker crawling them
+        self.assertEqual(queue.claim(job_id, "other-worker"), [])
+        worker.join()
+        self.assertEqual(queue.status(job_id)["done"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
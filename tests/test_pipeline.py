@@ -0,0 +1,79 @@
+import os
+import json
+import threading
+import unittest
+from unittest.mock import patch
+from crawl4ai import database, pipeline, utils
+from crawl4ai.extraction_strategy import ExtractionStrategy, LLMExtractionStrategy
+from crawl4ai.scheduler import DomainScheduler
+from tests import ARTICLE, StubStrategy, TempDatabaseMixin
+
+
+class WorkerPid(ExtractionStrategy):
+    def extract(self, url, section, *q, **kwargs):
+        return [{"pid": os.getpid(), "content": section}]
+
+
+class OfflineLLMExtraction(LLMExtractionStrategy):
+    def __init__(self):
+        super().__init__(api_token="test-token")
+
+    def run(self, url, sections, *q, **kwargs):
+        return [{"pid": os.getpid(), "thread": threading.current_thread().name}]
+
+
+class TestCrawlPipeline(TempDatabaseMixin, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.strategy = StubStrategy()
+        self.crawler = self.make_crawler(self.strategy, scheduler=DomainScheduler(max_concurrency=100, rate=0))
+        self.urls = [f"https://example.com/news/{n}" for n in range(4)]
+
+    def run_pipeline(self, **kwargs):
+        return {result.url: result for result in self.crawler.run_pipeline(self.urls, fetch_concurrency=2, process_concurrency=2, verbose=False, **kwargs)}
+
+    def test_pages_are_processed_in_worker_processes(self):
+        results = self.run_pipeline(extraction_strategy=WorkerPid())
+        self.assertEqual(sorted(results), self.urls)
+        for url, result in results.items():
+            self.assertTrue(result.success)
+            self.assertEqual(result.html, ARTICLE)
+            self.assertIn("Markets rallied", result.markdown)
+            self.assertNotEqual(json.loads(result.extracted_content)[0]["pid"], os.getpid())
+            # The parent process wrote the cache
+            self.assertEqual(database.get_cached_url(url)[1], ARTICLE)
+
+        # A second run is served from the cache and the stored results
+        results = self.run_pipeline(extraction_strategy=WorkerPid())
+        self.assertTrue(all(result.success for result in results.values()))
+        self.assertEqual(self.strategy.crawls, 4)
+
+    def test_parent_only_caches_and_builds_results_on_the_consumer_thread(self):
+        threads = []
+
+        def record_cache_write(*args, **kwargs):
+            threads.append(threading.current_thread())
+            return database.cache_url(*args, **kwargs)
+
+        # Pretty-printing the cleaned HTML is left to the workers
+        with patch.object(utils, "format_html", side_effect=AssertionError("formatted in the parent")), \
+                patch.object(pipeline, "cache_url", side_effect=record_cache_write):
+            results = self.run_pipeline()
+
+        self.assertTrue(all(result.success for result in results.values()))
+        self.assertIn("\n", results[self.urls[0]].cleaned_html)
+        self.assertEqual(threads, [threading.current_thread()] * 4)
+
+    def test_llm_extraction_runs_on_a_thread_of_the_parent(self):
+        results = self.run_pipeline(extraction_strategy=OfflineLLMExtraction())
+        self.assertEqual(sorted(results), self.urls)
+        for result in results.values():
+            self.assertTrue(result.success)
+            extracted = json.loads(result.extracted_content)[0]
+            self.assertEqual(extracted["pid"], os.getpid())
+            self.assertNotEqual(extracted["thread"], threading.main_thread().name)
+
+
+if __name__ == "__main__":
+    unittest.main()
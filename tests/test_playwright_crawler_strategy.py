@@ -0,0 +1,242 @@
+import time
+import shutil
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch
+from crawl4ai import playwright_crawler_strategy
+from crawl4ai.deadline import Deadline, DeadlineExceeded
+from crawl4ai.html_store import HtmlStore
+
+
+class FakeTimeoutError(Exception):
+    pass
+
+
+class FakeCDP:
+    def __init__(self, page):
+        self.page = page
+        self.commands = []
+
+    async def send(self, method, params=None):
+        self.commands.append((method, params))
+        return {"data": "aW1hZ2U="} if method == "Page.captureScreenshot" else {}
+
+
+class FakePage:
+    def __init__(self, browser):
+        self.browser = browser
+        self.url = "about:blank"
+        self.visited = []
+        self.extra_headers = {}
+
+    async def goto(self, url, **kwargs):
+        self.url = url
+        if url != "about:blank":
+            self.visited.append(url)
+            self.browser.in_flight += 1
+            self.browser.max_in_flight = max(self.browser.max_in_flight, self.browser.in_flight)
+            await asyncio.sleep(0.01)
+            self.browser.in_flight -= 1
+
+    async def evaluate(self, script, arg=None):
+        if "innerWidth" in script:
+            return [1280, 800, 1280, 3000]
+        if "Promise" in script:
+            return True
+        return None
+
+    async def content(self):
+        return f"<html><body>{self.url}</body></html>"
+
+    async def set_extra_http_headers(self, headers):
+        self.extra_headers = headers
+
+    async def set_viewport_size(self, size):
+        pass
+
+    def is_closed(self):
+        return False
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.cdp = None
+
+    async def new_page(self):
+        self.page = FakePage(self.browser)
+        return self.page
+
+    async def new_cdp_session(self, page):
+        self.cdp = FakeCDP(page)
+        return self.cdp
+
+    async def add_cookies(self, cookies):
+        pass
+
+    async def close(self):
+        self.browser.closed += 1
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+        self.closed = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def new_context(self, **kwargs):
+        self.contexts.append(FakeContext(self))
+        return self.contexts[-1]
+
+    def is_connected(self):
+        return True
+
+    async def close(self):
+        pass
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.chromium = self
+        self.browsers = []
+
+    async def launch(self, **kwargs):
+        self.browsers.append(FakeBrowser())
+        return self.browsers[-1]
+
+    async def start(self):
+        return self
+
+    async def stop(self):
+        pass
+
+
+class TestPlaywrightCrawlerStrategy(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.playwright = FakePlaywright()
+        patcher = patch.multiple(
+            playwright_crawler_strategy,
+            PLAYWRIGHT_AVAILABLE=True,
+            async_playwright=lambda: self.playwright,
+            Page=FakePage,
+            PlaywrightTimeoutError=FakeTimeoutError,
+            create=True,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def strategy(self, **kwargs):
+        strategy = playwright_crawler_strategy.PlaywrightCrawlerStrategy(html_store=HtmlStore(self.tmpdir), **kwargs)
+        self.addCleanup(strategy.quit)
+        return strategy
+
+    def test_one_browser_with_bounded_reused_contexts(self):
+        strategy = self.strategy(max_contexts=3)
+
+        async def crawl_all():
+            urls = [f"https://example.com/{n}" for n in range(10)]
+            return await asyncio.gather(*(strategy.afetch(url) for url in urls))
+
+        results = asyncio.run(crawl_all())
+        self.assertEqual(results[4], ("<html><body>https://example.com/4</body></html>", None))
+        self.assertEqual(len(self.playwright.browsers), 1)
+        browser = self.playwright.browsers[0]
+        self.assertLessEqual(browser.max_in_flight, 3)
+        self.assertLessEqual(len(browser.contexts), 3)
+        self.assertEqual(sum(len(context.page.visited) for context in browser.contexts), 10)
+
+        # The thread-bound path shares the same browser and contexts
+        html, screenshot = strategy.fetch("https://example.com/sync", True, screenshot_mode="viewport")
+        self.assertEqual(screenshot, "aW1hZ2U=")
+        self.assertEqual(len(self.playwright.browsers), 1)
+
+    def test_hooks_overrides_and_recycling(self):
+        strategy = self.strategy(max_contexts=1, max_pages_per_context=2, blocked_resources="fonts")
+        seen = []
+
+        async def before_return_html(page, html):
+            seen.append(("before_return_html", html))
+
+        strategy.set_hook("after_get_url", lambda page: seen.append(("after_get_url", page.url)))
+        strategy.set_hook("before_return_html", before_return_html)
+
+        strategy.fetch("https://example.com/a", headers={"Accept-Language": "fr"}, user_agent="Test/1.0")
+        self.assertEqual(seen, [
+            ("after_get_url", "https://example.com/a"),
+            ("before_return_html", "<html><body>https://example.com/a</body></html>"),
+        ])
+        context = self.playwright.browsers[0].contexts[0]
+        methods = [method for method, _ in context.cdp.commands]
+        self.assertIn("Network.setBlockedURLs", methods)
+        self.assertIn(("Network.setUserAgentOverride", {"userAgent": "Test/1.0"}), context.cdp.commands)
+        self.assertEqual(context.page.extra_headers, {"Accept-Language": "fr"})
+        # Raw HTML went to the store
+        self.assertEqual(HtmlStore(self.tmpdir).get("https://example.com/a"), "<html><body>https://example.com/a</body></html>")
+
+        strategy.fetch("https://example.com/b")
+        strategy.fetch("https://example.com/c")
+        # The context was replaced after two page loads
+        self.assertEqual(len(self.playwright.browsers[0].contexts), 2)
+        self.assertEqual(self.playwright.browsers[0].closed, 1)
+
+        with self.assertRaises(ValueError):
+            strategy.set_hook("on_page_created", print)
+
+    def test_devtools_session_follows_the_page_from_on_driver_created(self):
+        strategy = self.strategy(blocked_resources="fonts")
+        replacements = []
+
+        async def on_driver_created(page):
+            replacements.append(FakePage(page.browser))
+            return replacements[-1]
+
+        strategy.set_hook("on_driver_created", on_driver_created)
+        strategy.fetch("https://example.com/a", user_agent="Test/1.0")
+
+        cdp = self.playwright.browsers[0].contexts[0].cdp
+        self.assertIs(cdp.page, replacements[0])
+        self.assertEqual(replacements[0].visited, ["https://example.com/a"])
+        self.assertIn(("Network.setUserAgentOverride", {"userAgent": "Test/1.0"}), cdp.commands)
+
+    def test_no_navigation_once_the_deadline_expired(self):
+        strategy = self.strategy()
+
+        async def slow_hook(page):
+            await asyncio.sleep(0.1)
+
+        strategy.set_hook("before_get_url", slow_hook)
+        with self.assertRaises(DeadlineExceeded):
+            strategy.fetch("https://example.com/a", deadline=Deadline(0.05))
+        self.assertEqual(self.playwright.browsers[0].contexts[0].page.visited, [])
+
+    def test_waiting_for_a_busy_context_counts_against_the_deadline(self):
+        strategy = self.strategy(max_contexts=1)
+
+        async def hold_slow_pages(page):
+            if "slow" in page.url:
+                await asyncio.sleep(0.5)
+
+        strategy.set_hook("after_get_url", hold_slow_pages)
+
+        async def queued_crawl():
+            holder = asyncio.ensure_future(strategy.afetch("https://example.com/slow"))
+            await asyncio.sleep(0.1)
+            t = time.time()
+            with self.assertRaises(DeadlineExceeded):
+                await strategy.afetch("https://example.com/late", deadline=Deadline(0.1))
+            elapsed = time.time() - t
+            await holder
+            return elapsed
+
+        self.assertLess(asyncio.run(queued_crawl()), 0.35)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+from unittest import mock
+from crawl4ai import pipeline
+from tests import StubStrategy, TempDatabaseMixin
+
+ARTICLE = """<html><head><title>News</title></head><body>
+<div class="headline"><h1>Markets rally as investors weigh new data</h1></div>
+<article><p>""" + "Stocks closed higher on Tuesday after a volatile session. " * 10 + """</p></article>
+</body></html>"""
+
+
+class TestProcessingCache(TempDatabaseMixin, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.strategy = StubStrategy(ARTICLE)
+        self.crawler = self.make_crawler(self.strategy)
+        self.url = "https://example.com/article"
+        patcher = mock.patch.object(pipeline, "get_content_of_website_optimized", wraps=pipeline.get_content_of_website_optimized)
+        self.parse = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_new_parameters_reprocess_cached_html(self):
+        full = self.crawler.run(self.url, verbose=False)
+        headline = self.crawler.run(self.url, css_selector=".headline", verbose=False)
+        self.assertEqual(self.strategy.crawls, 1)
+        self.assertEqual(self.parse.call_count, 2)
+        self.assertIn("Stocks closed higher", full.markdown)
+        self.assertIn("Markets rally", headline.markdown)
+        self.assertNotIn("Stocks closed higher", headline.markdown)
+
+    def test_known_parameters_reuse_stored_variant(self):
+        full = self.crawler.run(self.url, verbose=False)
+        self.crawler.run(self.url, css_selector=".headline", verbose=False)
+        again = self.crawler.run(self.url, verbose=False)
+        # Served from the store: neither fetched nor parsed again
+        self.assertEqual(self.strategy.crawls, 1)
+        self.assertEqual(self.parse.call_count, 2)
+        self.assertEqual(again.markdown, full.markdown)
+        self.assertFalse(again.content_unchanged)
+
+    def test_unchanged_page_with_other_selector_is_not_reused(self):
+        self.crawler.run(self.url, verbose=False)
+        result = self.crawler.run(self.url, css_selector=".headline", bypass_cache=True, verbose=False)
+        self.assertEqual(self.strategy.crawls, 2)
+        self.assertFalse(result.content_unchanged)
+        self.assertNotIn("Stocks closed higher", result.markdown)
+
+        result = self.crawler.run(self.url, css_selector=".headline", bypass_cache=True, verbose=False)
+        self.assertTrue(result.content_unchanged)
+        self.assertEqual(self.parse.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
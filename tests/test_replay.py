@@ -0,0 +1,62 @@
+import os
+import json
+import unittest
+from crawl4ai.crawler_strategy import RecordingCrawlerStrategy, ReplayCrawlerStrategy
+from tests import StubStrategy, TempDatabaseMixin
+
+ARTICLE = """<html><head><title>News</title></head><body><article>
+<h1>Markets</h1><p>""" + "Markets rallied on Tuesday as investors weighed new data. " * 10 + """</p>
+</article></body></html>"""
+
+
+def live_strategy() -> StubStrategy:
+    # Each URL gets its own page
+    return StubStrategy(lambda url: ARTICLE.replace("Markets</h1>", f"Markets {url.rsplit('/', 1)[-1]}</h1>"), screenshot="c2NyZWVuc2hvdA==")
+
+
+class TestReplay(TempDatabaseMixin, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.archive_path = os.path.join(self.tmpdir.name, "crawl.har")
+        self.urls = [f"https://example.com/news/{n}" for n in range(3)]
+
+    def crawler(self, strategy, db_name):
+        self.use_database(db_name)
+        return self.make_crawler(strategy)
+
+    def test_replay_reproduces_recorded_crawl_offline(self):
+        live = live_strategy()
+        recorder = RecordingCrawlerStrategy(live, self.archive_path)
+        recorded = [self.crawler(recorder, "record.db").run(url, bypass_cache=True, screenshot=True, verbose=False) for url in self.urls]
+        recorder.save()
+
+        with open(self.archive_path, encoding="utf-8") as f:
+            har = json.load(f)
+        self.assertEqual(har["log"]["version"], "1.2")
+        self.assertEqual([entry["request"]["url"] for entry in har["log"]["entries"]], self.urls)
+
+        replay = ReplayCrawlerStrategy(self.archive_path)
+        crawler = self.crawler(replay, "replay.db")
+        for url, expected in zip(self.urls, recorded):
+            result = crawler.run(url + "#comments", bypass_cache=True, screenshot=True, verbose=False)
+            self.assertTrue(result.success)
+            self.assertEqual(result.markdown, expected.markdown)
+            self.assertEqual(result.content_hash, expected.content_hash)
+            self.assertEqual(result.screenshot, "c2NyZWVuc2hvdA==")
+        # Nothing went to the "network" during the replay
+        self.assertEqual(live.crawls, len(self.urls))
+
+    def test_missing_url_fails_without_retrying(self):
+        recorder = RecordingCrawlerStrategy(live_strategy(), self.archive_path)
+        recorder.crawl(self.urls[0])
+        recorder.save()
+
+        crawler = self.crawler(ReplayCrawlerStrategy(self.archive_path), "replay.db")
+        result = crawler.run("https://example.com/not-recorded", bypass_cache=True, verbose=False)
+        self.assertFalse(result.success)
+        self.assertIn("not in the replay archive", result.error_message)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from crawl4ai.crawler_strategy import LocalSeleniumCrawlerStrategy
+from tests import StubStrategy, TempDatabaseMixin
+
+
+class FakeDriver:
+    def __init__(self):
+        self.cdp_commands = []
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp_commands.append((cmd, params))
+
+
+class RecordingStrategy(StubStrategy):
+    supports_request_overrides = True
+
+    def __init__(self):
+        super().__init__()
+        self.crawl_kwargs = []
+        self.user_agent_updates = []
+
+    def crawl(self, url: str, **kwargs) -> str:
+        self.crawl_kwargs.append(kwargs)
+        return super().crawl(url, **kwargs)
+
+    def update_user_agent(self, user_agent: str):
+        self.user_agent_updates.append(user_agent)
+
+
+class TestRequestOverrides(TempDatabaseMixin, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.strategy = LocalSeleniumCrawlerStrategy(user_agent="Crawl4AI/1.0")
+
+    def _driver(self):
+        driver = FakeDriver()
+        self.strategy.driver = driver
+        return driver
+
+    def test_overrides_sent_only_when_they_change(self):
+        driver = self._driver()
+        self.strategy._apply_overrides()
+        self.assertEqual(driver.cdp_commands, [])
+
+        self.strategy._apply_overrides("NewsBot/2.0", {"X-Edition": "uk"}, (390, 844))
+        self.assertEqual(driver.cdp_commands, [
+            ("Network.setUserAgentOverride", {"userAgent": "NewsBot/2.0"}),
+            ("Network.enable", {}),
+            ("Network.setExtraHTTPHeaders", {"headers": {"X-Edition": "uk"}}),
+            ("Emulation.setDeviceMetricsOverride", {"width": 390, "height": 844, "deviceScaleFactor": 0, "mobile": False}),
+        ])
+
+        driver.cdp_commands.clear()
+        self.strategy._apply_overrides("NewsBot/2.0", {"X-Edition": "uk"}, {"width": 390, "height": 844})
+        self.assertEqual(driver.cdp_commands, [])
+
+        # A crawl without overrides puts the driver back to the defaults
+        self.strategy._apply_overrides()
+        self.assertEqual(driver.cdp_commands, [
+            ("Network.setUserAgentOverride", {"userAgent": "Crawl4AI/1.0"}),
+            ("Network.enable", {}),
+            ("Network.setExtraHTTPHeaders", {"headers": {}}),
+            ("Emulation.clearDeviceMetricsOverride", {}),
+        ])
+
+    def test_update_user_agent_does_not_relaunch(self):
+        driver = self._driver()
+        self.strategy.update_user_agent("NewsBot/3.0")
+        self.assertIs(self.strategy.driver, driver)
+        self.strategy._apply_overrides()
+        self.assertEqual(driver.cdp_commands, [("Network.setUserAgentOverride", {"userAgent": "NewsBot/3.0"})])
+
+    def test_web_crawler_passes_user_agent_to_the_crawl(self):
+        strategy = RecordingStrategy()
+        crawler = self.make_crawler(strategy)
+        crawler.run("https://example.com/a", user_agent="NewsBot/1.0", headers={"X-Edition": "uk"}, bypass_cache=True, verbose=False)
+        self.assertEqual(strategy.user_agent_updates, [])
+        self.assertEqual(strategy.crawl_kwargs[0]["user_agent"], "NewsBot/1.0")
+        self.assertEqual(strategy.crawl_kwargs[0]["headers"], {"X-Edition": "uk"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+from crawl4ai.crawler_strategy import LocalSeleniumCrawlerStrategy
+from crawl4ai.resource_blocking import BLOCKING_PROFILES, blocked_url_patterns
+
+
+class FakeDriver:
+    def __init__(self):
+        self.cdp_commands = []
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp_commands.append((cmd, params))
+
+
+class TestResourceBlocking(unittest.TestCase):
+
+    def test_profiles_and_patterns_combine(self):
+        patterns = blocked_url_patterns("images, trackers, */ads/*")
+        self.assertIn("*.jpg?*", patterns)
+        self.assertIn("*doubleclick.net*", patterns)
+        self.assertEqual(patterns[-1], "*/ads/*")
+        self.assertEqual(blocked_url_patterns(["fonts", "fonts"]), BLOCKING_PROFILES["fonts"])
+        self.assertEqual(blocked_url_patterns("none"), ())
+        with self.assertRaises(ValueError):
+            blocked_url_patterns("imagez")
+
+    def test_patterns_sent_per_domain_only_when_they_change(self):
+        strategy = LocalSeleniumCrawlerStrategy(blocked_resources="images", domain_blocked_resources={"www.example.org": "none"})
+        driver = FakeDriver()
+        strategy.driver = driver
+
+        strategy._block_resources("https://news.example.com/a")
+        strategy._block_resources("https://news.example.com/b")
+        self.assertEqual(driver.cdp_commands, [
+            ("Network.enable", {}),
+            ("Network.setBlockedURLs", {"urls": list(BLOCKING_PROFILES["images"])}),
+        ])
+
+        # The override also covers subdomains, and lifts the blocking on this driver
+        strategy._block_resources("https://live.example.org/")
+        self.assertEqual(driver.cdp_commands[-1], ("Network.setBlockedURLs", {"urls": []}))
+
+    def test_nothing_sent_without_blocking(self):
+        strategy = LocalSeleniumCrawlerStrategy(blocked_resources="none")
+        driver = FakeDriver()
+        strategy.driver = driver
+        strategy._block_resources("https://news.example.com/a")
+        self.assertEqual(driver.cdp_commands, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
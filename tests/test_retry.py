@@ -0,0 +1,120 @@
+import time
+import asyncio
+import unittest
+from crawl4ai.deadline import DeadlineExceeded
+from crawl4ai.retry import RetryPolicy, CircuitBreaker, CircuitOpenError
+from tests import StubStrategy, TempDatabaseMixin
+
+BACK_ONLINE = "<html><body><p>Back online</p></body></html>"
+
+
+class HangingStrategy(StubStrategy):
+    async def afetch(self, url, screenshot=False, **kwargs):
+        self.crawls += 1
+        await asyncio.sleep(60)
+
+
+def not_the_domains_fault(url):
+    if "slow" in url:
+        raise DeadlineExceeded("page load")
+    error = Exception("invalid argument: malformed URL")
+    error.retryable = False
+    raise error
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def test_backoff_is_bounded_and_jittered(self):
+        policy = RetryPolicy(base_delay=1, max_delay=5)
+        delays = [policy.delay(attempt) for attempt in range(1, 10) for _ in range(20)]
+        self.assertTrue(all(0 <= delay <= 5 for delay in delays))
+        self.assertEqual(RetryPolicy(base_delay=1, max_delay=5, jitter=False).delay(3), 4)
+
+    def test_should_retry(self):
+        policy = RetryPolicy(max_attempts=3, give_up_on=(ValueError,))
+        self.assertTrue(policy.should_retry(Exception("timeout"), 1))
+        self.assertFalse(policy.should_retry(Exception("timeout"), 3))
+        self.assertFalse(policy.should_retry(ValueError("bad selector"), 1))
+        self.assertFalse(policy.should_retry(CircuitOpenError("example.com", 10), 1))
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_opens_after_consecutive_failures_then_half_opens(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+        breaker.record_failure("example.com")
+        breaker.before("example.com")
+        breaker.record_failure("example.com")
+        with self.assertRaises(CircuitOpenError):
+            breaker.before("example.com")
+        breaker.before("other.com")
+
+        time.sleep(0.06)
+        breaker.before("example.com")  # the trial request
+        with self.assertRaises(CircuitOpenError):
+            breaker.before("example.com")
+        breaker.record_success("example.com")
+        breaker.before("example.com")
+
+    def test_abandoned_trial_lets_the_next_request_through(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure("example.com")
+        time.sleep(0.06)
+        breaker.before("example.com")
+        breaker.abandon("example.com")
+        breaker.before("example.com")
+
+
+class TestWebCrawlerRetries(TempDatabaseMixin, unittest.TestCase):
+
+    def _crawler(self, strategy, **kwargs):
+        return self.make_crawler(strategy, retry_policy=RetryPolicy(max_attempts=3, base_delay=0), **kwargs)
+
+    def test_transient_failures_are_retried(self):
+        strategy = StubStrategy(BACK_ONLINE, failures=2)
+        result = self._crawler(strategy).run("https://flaky.example.com/", bypass_cache=True, verbose=False)
+        self.assertTrue(result.success)
+        self.assertEqual(strategy.crawls, 3)
+
+    def test_open_circuit_fails_fast(self):
+        strategy = StubStrategy(BACK_ONLINE, failures=100)
+        crawler = self._crawler(strategy, circuit_breaker=CircuitBreaker(failure_threshold=3, reset_timeout=60))
+        first = crawler.run("https://down.example.com/1", bypass_cache=True, verbose=False)
+        second = crawler.run("https://down.example.com/2", bypass_cache=True, verbose=False)
+        self.assertFalse(first.success)
+        self.assertFalse(second.success)
+        self.assertIn("Circuit open", second.error_message)
+        self.assertEqual(strategy.crawls, 3)
+
+    def test_cancelled_trial_does_not_keep_the_circuit_open(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure("down.example.com")
+        time.sleep(0.06)
+        strategy = HangingStrategy()
+        crawler = self._crawler(strategy, circuit_breaker=breaker)
+
+        async def cancel_trial():
+            task = asyncio.ensure_future(crawler.arun("https://down.example.com/1", bypass_cache=True, verbose=False))
+            while not strategy.crawls:
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_trial())
+        # The next request is let through as the new trial
+        breaker.before("down.example.com")
+
+    def test_errors_that_cannot_be_retried_do_not_open_the_circuit(self):
+        strategy = StubStrategy(not_the_domains_fault)
+        crawler = self._crawler(strategy, circuit_breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60))
+        for url in ("https://news.example.com/slow", "https://news.example.com/%%", "https://news.example.com/slow"):
+            result = crawler.run(url, bypass_cache=True, verbose=False)
+            self.assertFalse(result.success)
+            self.assertNotIn("Circuit open", result.error_message)
+        self.assertEqual(strategy.crawls, 3)
+        self.assertFalse(crawler.circuit_breaker.is_open("news.example.com"))
+
+
+if __name__ == "__main__":
+    unittest.main()
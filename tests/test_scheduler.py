@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from crawl4ai.scheduler import DomainScheduler, TokenBucket, domain_of
+
+
+class TestDomainScheduler(unittest.TestCase):
+
+    def test_interleave_round_robin_across_domains(self):
+        urls = ["https://a.com/1", "https://a.com/2", "https://a.com/3", "https://www.b.com/1", "https://c.com/1", "https://b.com/2"]
+        ordered = list(DomainScheduler().interleave(urls))
+        self.assertEqual([domain_of(url) for url in ordered], ["a.com", "b.com", "c.com", "a.com", "b.com", "a.com"])
+        self.assertEqual(sorted(ordered), sorted(urls))
+
+    def test_interleave_window_reads_lazily(self):
+        consumed = []
+
+        def urls():
+            for i in range(100):
+                consumed.append(i)
+                yield f"https://site{i % 3}.com/{i}"
+
+        ordered = DomainScheduler().interleave(urls(), window=6)
+        first = [next(ordered) for _ in range(3)]
+        self.assertEqual(len({domain_of(url) for url in first}), 3)
+        self.assertLessEqual(len(consumed), 9)
+
+    def test_token_bucket_limits_rate(self):
+        bucket = TokenBucket(rate=20, burst=1)
+        start = time.monotonic()
+        for _ in range(5):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 4 / 20 - 0.01)
+
+    def test_token_bucket_timeout_takes_nothing(self):
+        bucket = TokenBucket(rate=10, burst=1)
+        self.assertTrue(bucket.acquire(timeout=0))
+        self.assertFalse(bucket.acquire(timeout=0.01))
+        # The refused caller did not push the next one further back
+        self.assertAlmostEqual(bucket.reserve(), 0.1, delta=0.02)
+
+    def test_per_domain_concurrency_cap_and_override(self):
+        scheduler = DomainScheduler(max_concurrency=2, rate=0, overrides={"slow.com": {"max_concurrency": 1}})
+        in_flight, peak, lock = {}, {}, threading.Lock()
+
+        def fetch(url):
+            domain = domain_of(url)
+            with scheduler.slot(url):
+                with lock:
+                    in_flight[domain] = in_flight.get(domain, 0) + 1
+                    peak[domain] = max(peak.get(domain, 0), in_flight[domain])
+                time.sleep(0.02)
+                with lock:
+                    in_flight[domain] -= 1
+
+        urls = [f"https://fast.com/{i}" for i in range(8)] + [f"https://news.slow.com/{i}" for i in range(4)]
+        with ThreadPoolExecutor(max_workers=12) as executor:
+            list(executor.map(fetch, urls))
+        self.assertEqual(peak["fast.com"], 2)
+        self.assertEqual(peak["news.slow.com"], 1)
+
+    def test_async_slot(self):
+        scheduler = DomainScheduler(max_concurrency=1, rate=0)
+        order = []
+
+        async def fetch(i):
+            async with scheduler.aslot("https://a.com/"):
+                order.append(("start", i))
+                await asyncio.sleep(0.01)
+                order.append(("end", i))
+
+        async def main():
+            await asyncio.gather(fetch(0), fetch(1))
+
+        asyncio.run(main())
+        asyncio.run(main())
+        self.assertEqual(order[:4], [("start", 0), ("end", 0), ("start", 1), ("end", 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
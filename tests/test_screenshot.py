@@ -0,0 +1,65 @@
+import unittest
+from crawl4ai.crawler_strategy import LocalSeleniumCrawlerStrategy
+from crawl4ai.screenshot import PAGE_METRICS_JS, capture_params
+
+# innerWidth, innerHeight, scrollWidth, scrollHeight
+METRICS = [1280, 800, 1280, 12000]
+
+
+class FakeDriver:
+    def __init__(self):
+        self.cdp_commands = []
+
+    def execute_script(self, script, *args):
+        assert script == PAGE_METRICS_JS
+        return METRICS
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp_commands.append((cmd, params))
+        return {"data": "aW1hZ2U="}
+
+    def set_window_size(self, width, height):
+        raise AssertionError("the window must not be resized for a screenshot")
+
+
+class TestScreenshot(unittest.TestCase):
+
+    def test_capture_params_per_mode(self):
+        full = capture_params("full", "jpeg", 85, METRICS, 4000, 320)
+        self.assertEqual(full["clip"], {"x": 0, "y": 0, "width": 1280, "height": 12000, "scale": 1})
+        self.assertTrue(full["captureBeyondViewport"])
+        self.assertEqual(full["quality"], 85)
+
+        self.assertEqual(capture_params("clip", "jpeg", 85, METRICS, 4000, 320)["clip"]["height"], 4000)
+
+        viewport = capture_params("viewport", "webp", 70, METRICS, 4000, 320)
+        self.assertEqual(viewport, {"format": "webp", "quality": 70, "captureBeyondViewport": False})
+
+        thumbnail = capture_params("thumbnail", "png", 85, METRICS, 4000, 320)
+        self.assertEqual(thumbnail["clip"], {"x": 0, "y": 0, "width": 1280, "height": 800, "scale": 0.25})
+        self.assertNotIn("quality", thumbnail)
+
+        with self.assertRaises(ValueError):
+            capture_params("fullpage", "jpeg", 85, METRICS, 4000, 320)
+
+    def test_per_crawl_options_override_defaults(self):
+        strategy = LocalSeleniumCrawlerStrategy(screenshot_mode="viewport", screenshot_format="webp")
+        driver = FakeDriver()
+        strategy.driver = driver
+        strategy.crawl = lambda url, **kwargs: "<html></html>"
+
+        html, screenshot = strategy.fetch("https://example.com", True)
+        self.assertEqual(screenshot, "aW1hZ2U=")
+        self.assertEqual(driver.cdp_commands[-1], ("Page.captureScreenshot", {"format": "webp", "quality": 85, "captureBeyondViewport": False}))
+
+        strategy.driver = driver
+        strategy.fetch("https://example.com", True, screenshot_mode="thumbnail", screenshot_quality=60)
+        cmd, params = driver.cdp_commands[-1]
+        self.assertEqual((params["format"], params["quality"], params["clip"]["scale"]), ("webp", 60, 0.25))
+
+        with self.assertRaises(ValueError):
+            strategy.take_screenshot(format="gif")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import asyncio
+import unittest
+from itertools import count
+from contextlib import aclosing
+from crawl4ai.models import UrlModel
+from crawl4ai.scheduler import DomainScheduler
+from tests import SlowStubStrategy, TempDatabaseMixin, later_first
+
+
+class TestStreaming(TempDatabaseMixin, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.urls = [f"https://example.com/news/{n}" for n in range(8)]
+        self.pulled = 0
+
+    def crawler(self, delay):
+        self.strategy = SlowStubStrategy(delay)
+        return self.make_crawler(self.strategy, scheduler=DomainScheduler(max_concurrency=100, rate=0))
+
+    def endless_urls(self):
+        # Counts how far the crawler read ahead
+        for n in count():
+            self.pulled += 1
+            yield f"https://example.com/news/{n}"
+
+    def test_fetch_pages_stream_yields_in_completion_order(self):
+        crawler = self.crawler(later_first)
+        results = list(crawler.fetch_pages_stream([UrlModel(url=url) for url in self.urls], concurrency=8, verbose=False))
+        self.assertEqual([result.url for result in results], self.urls[::-1])
+        self.assertTrue(all(result.success for result in results))
+
+    def test_fetch_pages_stream_bounds_concurrency_and_reads_lazily(self):
+        crawler = self.crawler(lambda url: 0.02)
+        stream = crawler.fetch_pages_stream((UrlModel(url=url) for url in self.endless_urls()), concurrency=2, verbose=False)
+        results = [next(stream) for _ in range(3)]
+        stream.close()
+        self.assertEqual(len(results), 3)
+        self.assertEqual(self.strategy.max_in_flight, 2)
+        # At most the look-ahead window (4 * concurrency) and the crawls in flight
+        self.assertLessEqual(self.pulled, 4 * 2 + 2 + 3)
+
+    def test_arun_stream_yields_in_completion_order(self):
+        crawler = self.crawler(later_first)
+
+        async def stream():
+            return [result async for result in crawler.arun_stream(self.urls, concurrency=8, verbose=False)]
+
+        results = asyncio.run(stream())
+        self.assertEqual([result.url for result in results], self.urls[::-1])
+
+    def test_arun_stream_bounds_concurrency_and_reads_lazily(self):
+        crawler = self.crawler(lambda url: 0.02)
+
+        async def first_results():
+            results = []
+            async with aclosing(crawler.arun_stream(self.endless_urls(), concurrency=2, verbose=False)) as stream:
+                async for result in stream:
+                    results.append(result)
+                    if len(results) == 3:
+                        break
+            return results
+
+        self.assertEqual(len(asyncio.run(first_results())), 3)
+        self.assertEqual(self.strategy.max_in_flight, 2)
+        self.assertLessEqual(self.pulled, 4 * 2 + 2 + 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import asyncio
+import unittest
+from crawl4ai.extraction_strategy import NoExtractionStrategy
+from tests import ARTICLE, TempDatabaseMixin
+
+
+class TestCrawlTimings(TempDatabaseMixin, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.crawler = self.make_crawler()
+
+    def assertSizes(self, result):
+        self.assertEqual(result.timings.html_bytes, len(ARTICLE.encode("utf-8")))
+        self.assertEqual(result.timings.markdown_bytes, len(result.markdown.encode("utf-8")))
+        self.assertGreater(result.timings.cleaned_html_bytes, 0)
+
+    def test_every_stage_of_a_crawl_is_timed(self):
+        result = self.crawler.run("https://example.com/news/1", extraction_strategy=NoExtractionStrategy(), verbose=False)
+        timings = result.timings
+        for stage in ("cache_read", "fetch", "parse", "markdown", "chunking", "extraction", "cache_write"):
+            self.assertGreater(getattr(timings, stage), 0, stage)
+        # The stub strategy has no browser to wait for
+        self.assertEqual(timings.wait_for_load, 0)
+        self.assertSizes(result)
+
+    def test_cached_crawl_is_not_fetched(self):
+        self.crawler.run("https://example.com/news/1", verbose=False)
+        result = self.crawler.run("https://example.com/news/1", verbose=False)
+        self.assertGreater(result.timings.cache_read, 0)
+        self.assertEqual(result.timings.fetch, 0)
+        self.assertSizes(result)
+
+    def test_async_crawl_is_timed(self):
+        result = asyncio.run(self.crawler.arun("https://example.com/news/2", verbose=False))
+        for stage in ("cache_read", "fetch", "parse", "markdown", "cache_write"):
+            self.assertGreater(getattr(result.timings, stage), 0, stage)
+        self.assertSizes(result)
+
+
+if __name__ == "__main__":
+    unittest.main()
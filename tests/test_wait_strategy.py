@@ -0,0 +1,85 @@
+import time
+import unittest
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from crawl4ai.deadline import Deadline
+from crawl4ai.wait_strategy import WaitStrategy, DomStabilityWait, NetworkIdleWait, SelectorWait, JsPredicateWait, wait_strategies, DOM_QUIET_JS
+
+
+class FakeDriver:
+    def __init__(self, ready_after: float = 0, settles: bool = True):
+        self.ready_at = time.time() + ready_after
+        self.settles = settles
+        self.async_calls = []
+        self.script_timeout = None
+
+    def set_script_timeout(self, timeout):
+        self.script_timeout = timeout
+
+    def execute_async_script(self, script, *args):
+        self.async_calls.append(args)
+        return self.settles
+
+    def execute_script(self, script, *args):
+        return time.time() >= self.ready_at
+
+    def find_element(self, by, value):
+        if time.time() < self.ready_at:
+            raise NoSuchElementException(value)
+        return object()
+
+
+class TestWaitStrategies(unittest.TestCase):
+
+    def test_dom_stability_runs_in_page(self):
+        driver = FakeDriver()
+        self.assertTrue(DomStabilityWait(quiet_ms=300, timeout=2).wait(driver, Deadline()))
+        self.assertEqual(driver.async_calls, [(300, 2000)])
+        self.assertGreater(driver.script_timeout, 2)
+
+    def test_dom_stability_ignores_attribute_changes(self):
+        self.assertIn("childList: true", DOM_QUIET_JS)
+        self.assertNotIn("attributes", DOM_QUIET_JS)
+
+    def test_strategies_must_support_both_drivers(self):
+        class SeleniumOnly(WaitStrategy):
+            def wait(self, driver, deadline, stage="page load"):
+                return True
+
+        with self.assertRaises(TypeError):
+            SeleniumOnly()
+
+    def test_in_page_wait_is_capped_by_the_deadline(self):
+        driver = FakeDriver(settles=False)
+        deadline = Deadline(0.5)
+        NetworkIdleWait(idle_ms=500, timeout=10).wait(driver, deadline)
+        self.assertLessEqual(driver.async_calls[0][1], 500)
+
+        # Nothing runs once the budget is gone, and the stage is recorded as cut short
+        driver, deadline = FakeDriver(), Deadline(0)
+        self.assertFalse(DomStabilityWait().wait(driver, deadline))
+        self.assertEqual(driver.async_calls, [])
+        self.assertEqual(deadline.skipped, ["page load"])
+
+    def test_selector_and_predicate_return_when_ready(self):
+        t = time.time()
+        self.assertTrue(SelectorWait("#article", timeout=2).wait(FakeDriver(ready_after=0.2), Deadline()))
+        self.assertTrue(JsPredicateWait("window.ready", timeout=2).wait(FakeDriver(ready_after=0.2), Deadline()))
+        self.assertLess(time.time() - t, 1.5)
+
+    def test_selector_timeout_raises_unless_deadline_expired(self):
+        with self.assertRaises(TimeoutException):
+            SelectorWait("#missing", timeout=0.2).wait(FakeDriver(ready_after=60), Deadline())
+        deadline = Deadline(0.2)
+        self.assertFalse(SelectorWait("#missing", timeout=5).wait(FakeDriver(ready_after=60), deadline, "js_code"))
+        self.assertEqual(deadline.skipped, ["js_code"])
+
+    def test_wait_strategies_normalizes_input(self):
+        self.assertIsInstance(wait_strategies(None)[0], DomStabilityWait)
+        selector = SelectorWait("#a")
+        self.assertEqual(wait_strategies(selector), [selector])
+        with self.assertRaises(ValueError):
+            wait_strategies(["#a"])
+
+
+if __name__ == '__main__':
+    unittest.main()
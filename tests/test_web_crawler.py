@@ -1,4 +1,4 @@
-import unittest, os
+import unittest, os, time
 from crawl4ai.web_crawler import WebCrawler
 from crawl4ai.chunking_strategy import RegexChunking, FixedLengthWordChunking, SlidingWindowChunking
 from crawl4ai.extraction_strategy import CosineStrategy, LLMExtractionStrategy, TopicExtractionStrategy, NoExtractionStrategy
@@ -11,6 +11,13 @@ class TestWebCrawler(unittest.TestCase):
     def test_warmup(self):
         self.crawler.warmup()
         self.assertTrue(self.crawler.ready, "WebCrawler failed to warm up")
+
+    def test_startup_time_budget(self):
+        # Constructing and warming up a crawler must not wait for a browser or the network
+        t = time.time()
+        crawler = WebCrawler()
+        crawler.warmup()
+        self.assertLess(time.time() - t, 1.0, "WebCrawler startup exceeded its 1 second budget")
     
     def test_run_default_strategies(self):
         result = self.crawler.run(